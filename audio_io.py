@@ -0,0 +1,246 @@
+import os
+import hashlib
+import tempfile
+from urllib.parse import parse_qsl
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Tuple, Union
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# --- Audio Buffers ---
+# An uploaded recording is read once, in chunks, straight off the request
+# body into an AudioBuffer (see read_entry_form). Small
+# recordings stay in memory as a single immutable bytes object; larger ones
+# spill to a temp file. Every consumer (storage upload, transcription) gets
+# its own view via source() without copying the data, and the sha256 used by
+# the inference cache is computed while the upload streams in.
+AUDIO_SPOOL_BYTES = int(os.getenv("AUDIO_SPOOL_BYTES", str(1024 * 1024)))
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+AUDIO_CHUNK_BYTES = 64 * 1024
+
+# Room for the text fields and multipart framing around the recording
+MAX_FORM_FIELD_BYTES = int(os.getenv("MAX_FORM_FIELD_BYTES", str(256 * 1024)))
+MAX_FORM_OVERHEAD_BYTES = 4 * MAX_FORM_FIELD_BYTES
+
+class AudioTooLarge(Exception):
+    """Raised when an upload exceeds MAX_AUDIO_BYTES."""
+
+class InvalidForm(ValueError):
+    """Raised when an upload is not a well-formed multipart form."""
+
+class AudioBuffer:
+    def __init__(self, spool_bytes: int = AUDIO_SPOOL_BYTES, max_bytes: int = MAX_AUDIO_BYTES):
+        self.spool_bytes = spool_bytes
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._memory: Optional[bytearray] = bytearray()
+        self._data: Optional[bytes] = None
+        self._file = None
+        self.path: Optional[str] = None
+        self.content_type = "audio/wav"
+        self.extension = ".wav"
+
+    @classmethod
+    def from_bytes(cls, data: bytes, content_type: str = "audio/wav", extension: str = ".wav") -> "AudioBuffer":
+        buffer = cls(spool_bytes=len(data), max_bytes=len(data))
+        buffer.size = len(data)
+        buffer._hash.update(data)
+        buffer._data = bytes(data)
+        buffer._memory = None
+        buffer.content_type = content_type
+        buffer.extension = extension
+        return buffer
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise AudioTooLarge(f"Audio exceeds the {self.max_bytes // (1024 * 1024)} MB limit.")
+        self._hash.update(chunk)
+        if self._file is None and self.size > self.spool_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="remotesync-audio-", suffix=".wav", delete=False)
+            self.path = self._file.name
+            self._file.write(self._memory)
+            self._memory = None
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._memory += chunk
+
+    def finish(self) -> "AudioBuffer":
+        if self._file is not None:
+            self._file.close()
+        else:
+            self._data = bytes(self._memory)
+            self._memory = None
+        return self
+
+    @property
+    def sha256(self) -> bytes:
+        return self._hash.digest()
+
+    def source(self) -> Union[bytes, BinaryIO]:
+        """
+        Returns the audio for one consumer: the shared bytes object when held
+        in memory, otherwise a fresh read handle on the temp file.
+        """
+        if self.path is not None:
+            return open(self.path, "rb")
+        return self._data
+
+    def read(self) -> bytes:
+        if self.path is not None:
+            with open(self.path, "rb") as f:
+                return f.read()
+        return self._data
+
+    def close(self):
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._data = None
+
+# --- Streaming Form Uploads ---
+# Starlette's form parser spools every file part to a temp file before the
+# endpoint runs, so a recording was stored in full (and then copied into an
+# AudioBuffer) before its size could be checked. The entry form is parsed here
+# as the body streams in instead: the file part is written to one AudioBuffer
+# and the upload is refused as soon as it passes the limit.
+
+class _EntryForm:
+    """python-multipart callbacks collecting text fields and one file part."""
+
+    def __init__(self, file_field: str, spool_bytes: int, max_bytes: int):
+        self.file_field = file_field
+        self.spool_bytes = spool_bytes
+        self.max_bytes = max_bytes
+        self.fields: Dict[str, str] = {}
+        self.audio: Optional[AudioBuffer] = None
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name: Optional[str] = None
+        self._value: Optional[bytearray] = None
+        self._file: Optional[AudioBuffer] = None
+        self._open_part = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field_data,
+            "on_header_value": self._header_value_data,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self):
+        self._headers = {}
+        self._name, self._value, self._file = None, None, None
+        self._open_part = True
+
+    def _header_field_data(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _header_value_data(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field, self._header_value = b"", b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise InvalidForm("Form part without a name.")
+        self._name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" not in options:
+            self._value = bytearray()
+        elif self._name == self.file_field and self.audio is None:
+            self._file = AudioBuffer(spool_bytes=self.spool_bytes, max_bytes=self.max_bytes)
+            self.audio = self._file
+        # Other files are skipped without being stored
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._file is not None:
+            self._file.write(data[start:end])
+        elif self._value is not None:
+            self._value += data[start:end]
+            if len(self._value) > MAX_FORM_FIELD_BYTES:
+                raise InvalidForm(f"Form field '{self._name}' is too long.")
+
+    def _part_end(self):
+        if self._file is not None:
+            self._file.finish()
+        elif self._value is not None:
+            self.fields[self._name] = self._value.decode("utf-8", errors="replace")
+        self._open_part = False
+
+async def _read_urlencoded(body: AsyncIterator[bytes], content_length: Optional[str]) -> Dict[str, str]:
+    too_long = "The form is too long."
+    if content_length and content_length.isdigit() and int(content_length) > MAX_FORM_OVERHEAD_BYTES:
+        raise InvalidForm(too_long)
+    data = bytearray()
+    async for chunk in body:
+        data += chunk
+        if len(data) > MAX_FORM_OVERHEAD_BYTES:
+            raise InvalidForm(too_long)
+    return dict(parse_qsl(data.decode("latin-1"), keep_blank_values=True, encoding="utf-8", errors="replace"))
+
+async def read_entry_form(
+    body: AsyncIterator[bytes],
+    content_type: str,
+    content_length: Optional[str] = None,
+    file_field: str = "audio",
+    spool_bytes: int = AUDIO_SPOOL_BYTES,
+    max_bytes: int = MAX_AUDIO_BYTES,
+) -> Tuple[Dict[str, str], Optional[AudioBuffer]]:
+    """
+    Parses a multipart/form-data (or urlencoded, text only) body from its
+    chunks. Returns the text fields and the `file_field` recording (None if
+    absent or empty). Raises AudioTooLarge, before reading anything when
+    Content-Length already says so, or InvalidForm.
+    """
+    mime, options = parse_options_header(content_type or "")
+    if mime == b"application/x-www-form-urlencoded":
+        return await _read_urlencoded(body, content_length), None
+    max_body = max_bytes + MAX_FORM_OVERHEAD_BYTES
+    too_large = f"Audio exceeds the {max_bytes // (1024 * 1024)} MB limit."
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        raise AudioTooLarge(too_large)
+    if mime != b"multipart/form-data" or not options.get(b"boundary"):
+        raise InvalidForm("Expected a multipart/form-data body.")
+
+    form = _EntryForm(file_field, spool_bytes, max_bytes)
+    parser = multipart.MultipartParser(options[b"boundary"], form.callbacks())
+    received = 0
+    try:
+        async for chunk in body:
+            received += len(chunk)
+            # Chunked bodies have no Content-Length to check up front
+            if received > max_body:
+                raise AudioTooLarge(too_large)
+            parser.write(chunk)
+        parser.finalize()
+        if form._open_part or received == 0:
+            raise InvalidForm("The form upload ended early.")
+    except multipart.exceptions.MultipartParseError as e:
+        if form.audio is not None:
+            form.audio.close()
+        raise InvalidForm(f"Malformed form upload: {e}")
+    except Exception:
+        if form.audio is not None:
+            form.audio.close()
+        raise
+    if form.audio is not None and form.audio.size == 0:
+        form.audio.close()
+        form.audio = None
+    return form.fields, form.audio
@@ -0,0 +1,366 @@
+import io
+import os
+import wave
+import tempfile
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# --- Audio Normalization ---
+# Whisper only needs 16 kHz mono, so recordings are downmixed, resampled and
+# trimmed of leading/trailing silence before they are stored or transcribed.
+# Everything is vectorized NumPy on float32 arrays. The pipeline streams
+# through the recording in blocks (normalize_wav_stream) so a worker never
+# holds a whole decoded upload; the whole-array functions serve the local
+# transcription backend and the benchmarks.
+TARGET_SAMPLE_RATE = 16000
+SILENCE_THRESHOLD_DB = float(os.getenv("AUDIO_SILENCE_THRESHOLD_DB", "-45"))
+SILENCE_PAD_MS = 200
+FRAME_MS = 20
+RESAMPLE_TAPS = 63
+
+class UnsupportedAudio(Exception):
+    """Raised for input that is not an uncompressed WAV file."""
+
+def _wav_chunks(data: bytes):
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], "little")
+        yield chunk_id, memoryview(data)[pos + 8:pos + 8 + size]
+        pos += 8 + size + (size & 1)
+
+class WavFormat(NamedTuple):
+    tag: int
+    channels: int
+    rate: int
+    width: int
+
+def _parse_fmt(fmt) -> WavFormat:
+    tag = int.from_bytes(fmt[0:2], "little")
+    channels = int.from_bytes(fmt[2:4], "little")
+    rate = int.from_bytes(fmt[4:8], "little")
+    bits = int.from_bytes(fmt[14:16], "little")
+    if tag == 0xFFFE and len(fmt) >= 26:
+        # WAVE_FORMAT_EXTENSIBLE: the real format is the start of the sub-format GUID
+        tag = int.from_bytes(fmt[24:26], "little")
+    width = bits // 8
+    if not channels or not width:
+        raise UnsupportedAudio("Invalid WAV header.")
+    if not (tag == 3 and width in (4, 8)) and not (tag == 1 and width in (1, 2, 3, 4)):
+        raise UnsupportedAudio(f"Unsupported WAV encoding (format {tag}, {bits}-bit).")
+    return WavFormat(tag, channels, rate, width)
+
+def _decode_samples(body, fmt: WavFormat) -> np.ndarray:
+    """Decodes whole frames of PCM/float data into float32 of shape (frames, channels)."""
+    body = body[:len(body) - len(body) % (fmt.channels * fmt.width)]
+    tag, width = fmt.tag, fmt.width
+    if tag == 3:
+        samples = np.frombuffer(body, dtype="<f4" if width == 4 else "<f8").astype(np.float32)
+    elif width == 1:
+        samples = (np.frombuffer(body, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(body, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(ints & 0x800000, ints - 0x1000000, ints).astype(np.float32) / 8388608.0
+    else:
+        samples = np.frombuffer(body, dtype="<i4").astype(np.float32) / 2147483648.0
+    return samples.reshape(-1, fmt.channels)
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decodes PCM (8/16/24/32-bit) or float WAV into a float32 array of shape (frames, channels)."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise UnsupportedAudio("Not a RIFF/WAVE file.")
+    fmt = body = None
+    for chunk_id, chunk in _wav_chunks(data):
+        if chunk_id == b"fmt ":
+            fmt = chunk
+        elif chunk_id == b"data":
+            body = chunk
+            break
+    if fmt is None or body is None:
+        raise UnsupportedAudio("WAV file is missing its fmt or data chunk.")
+    fmt = _parse_fmt(fmt)
+    return _decode_samples(body, fmt), fmt.rate
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    channels = samples.shape[1]
+    if channels == 1:
+        return samples[:, 0]
+    # A matrix-vector product is much faster than mean(axis=1) on interleaved frames
+    return samples @ np.full(channels, 1.0 / channels, dtype=np.float32)
+
+def _lowpass_taps(cutoff: float) -> np.ndarray:
+    n = np.arange(RESAMPLE_TAPS) - (RESAMPLE_TAPS - 1) / 2
+    taps = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(RESAMPLE_TAPS)).astype(np.float32)
+    return taps / taps.sum()
+
+def resample(signal: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Anti-aliased resampling: windowed-sinc low-pass (when downsampling) then decimation or interpolation."""
+    if src_rate == dst_rate or signal.size == 0:
+        return signal.astype(np.float32, copy=False)
+    if dst_rate < src_rate:
+        taps = _lowpass_taps(dst_rate / src_rate / 2 * 0.95)
+        half = RESAMPLE_TAPS // 2
+        padded = np.pad(signal.astype(np.float32, copy=False), (half, half))
+        if src_rate % dst_rate == 0:
+            # Integer ratio (48k/32k -> 16k): evaluate the filter only at the
+            # kept samples, as one strided matrix-vector product
+            windows = np.lib.stride_tricks.sliding_window_view(padded, RESAMPLE_TAPS)[::src_rate // dst_rate]
+            return windows @ taps[::-1]
+        signal = np.convolve(padded, taps, mode="valid")
+    out_len = int(round(signal.size * dst_rate / src_rate))
+    positions = np.arange(out_len, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(signal.size), signal).astype(np.float32)
+
+def trim_silence(signal: np.ndarray, rate: int, threshold_db: float = SILENCE_THRESHOLD_DB, pad_ms: int = SILENCE_PAD_MS) -> np.ndarray:
+    """Cuts leading/trailing frames whose RMS is below threshold_db (dBFS), keeping pad_ms around speech."""
+    frame = max(1, rate * FRAME_MS // 1000)
+    n_frames = signal.size // frame
+    if n_frames == 0:
+        return signal
+    frames = signal[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    loud = np.flatnonzero(20 * np.log10(rms) > threshold_db)
+    if loud.size == 0:
+        return signal
+    pad = rate * pad_ms // 1000
+    start = max(0, loud[0] * frame - pad)
+    end = min(signal.size, (loud[-1] + 1) * frame + pad)
+    return signal[start:end]
+
+def split_on_silence(signal: np.ndarray, rate: int, max_seconds: float = 30.0, search_seconds: float = 5.0) -> List[np.ndarray]:
+    """
+    Splits a mono signal into segments of at most max_seconds, cutting at the
+    quietest frame in the last search_seconds before each limit so words are
+    not cut in half. Returns views into `signal` (no copies).
+    """
+    limit = int(max_seconds * rate)
+    if signal.size <= limit:
+        return [signal]
+    frame = max(1, rate * FRAME_MS // 1000)
+    n_frames = signal.size // frame
+    frames = signal[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.mean(frames * frames, axis=1)
+
+    search = max(1, int(search_seconds * rate) // frame)
+    cuts = [0]
+    while signal.size - cuts[-1] > limit:
+        last_frame = (cuts[-1] + limit) // frame
+        first_frame = max(cuts[-1] // frame + 1, last_frame - search)
+        quietest = first_frame + int(np.argmin(energy[first_frame:last_frame])) if last_frame > first_frame else last_frame
+        cuts.append(quietest * frame)
+    cuts.append(signal.size)
+    return [signal[start:end] for start, end in zip(cuts, cuts[1:])]
+
+def encode_wav(signal: np.ndarray, rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767.0).astype("<i2")
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return out.getvalue()
+
+def encode_flac(signal: np.ndarray, rate: int = TARGET_SAMPLE_RATE) -> Optional[bytes]:
+    """Lossless FLAC via the optional `soundfile` package; None when it is not installed."""
+    try:
+        import soundfile  # type: ignore
+    except ImportError:
+        return None
+    out = io.BytesIO()
+    soundfile.write(out, signal, rate, format="FLAC", subtype="PCM_16")
+    return out.getvalue()
+
+def normalize_audio(data: bytes, codec: str = "wav") -> Tuple[bytes, str, str]:
+    """
+    Decodes a WAV upload and returns (encoded bytes, content type, file
+    extension) for 16 kHz mono audio with silence trimmed. codec is 'wav' or
+    'flac' (falls back to WAV when soundfile is unavailable).
+    """
+    out = io.BytesIO()
+    content_type, extension = normalize_wav_stream(io.BytesIO(data), out, codec=codec)
+    return out.getvalue(), content_type, extension
+
+# --- Streaming Normalization ---
+# Same result as normalize_audio, in blocks of NORMALIZE_BLOCK_SECONDS. Pass
+# one decodes, downmixes and resamples each block into 16-bit PCM in a temp
+# file and keeps per-frame loudness; pass two writes the non-silent span to
+# the output. A worker holds a few seconds of samples, not the recording.
+NORMALIZE_BLOCK_SECONDS = 10
+
+def read_wav_format(f: BinaryIO) -> Tuple[WavFormat, int]:
+    """Reads a WAV header up to the data chunk; returns its format and the data size, leaving `f` at the samples."""
+    header = f.read(12)
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise UnsupportedAudio("Not a RIFF/WAVE file.")
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            raise UnsupportedAudio("WAV file is missing its fmt or data chunk.")
+        chunk_id, size = chunk[:4], int.from_bytes(chunk[4:8], "little")
+        if chunk_id == b"data":
+            if fmt is None:
+                raise UnsupportedAudio("WAV file is missing its fmt or data chunk.")
+            return _parse_fmt(fmt), size
+        if chunk_id == b"fmt ":
+            fmt = f.read(size)
+            f.seek(size & 1, 1)
+        else:
+            f.seek(size + (size & 1), 1)
+
+class StreamResampler:
+    """resample() over consecutive blocks of one signal, with the same output as resampling it whole."""
+
+    def __init__(self, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE):
+        self.ratio = src_rate / dst_rate
+        self.passthrough = src_rate == dst_rate
+        self.taps = _lowpass_taps(dst_rate / src_rate / 2 * 0.95) if dst_rate < src_rate else None
+        self.step = src_rate // dst_rate if self.taps is not None and src_rate % dst_rate == 0 else None
+        # Filter input not consumed yet; starts as resample()'s leading zero padding
+        self._history = np.zeros(RESAMPLE_TAPS // 2, dtype=np.float32)
+        self._filtered = 0  # filter outputs passed so far (integer ratios)
+        # Interpolation input from global index _pending_start on, and outputs emitted so far
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pending_start = 0
+        self._emitted = 0
+
+    def _filter(self, block: np.ndarray, final: bool) -> np.ndarray:
+        if self.taps is None:
+            return block
+        parts = [self._history, block]
+        if final:
+            parts.append(np.zeros(RESAMPLE_TAPS // 2, dtype=np.float32))
+        x = np.concatenate(parts)
+        if x.size < RESAMPLE_TAPS:
+            self._history = x
+            return np.zeros(0, dtype=np.float32)
+        count = x.size - RESAMPLE_TAPS + 1
+        self._history = x[count:]
+        if self.step is not None:
+            # Only the kept samples, as in resample(): every step-th filter output by global index
+            first = (-self._filtered) % self.step
+            self._filtered += count
+            windows = np.lib.stride_tricks.sliding_window_view(x, RESAMPLE_TAPS)[first::self.step]
+            return windows @ self.taps[::-1]
+        return np.convolve(x, self.taps, mode="valid")
+
+    def _interpolate(self, signal: np.ndarray, final: bool) -> np.ndarray:
+        self._pending = np.concatenate([self._pending, signal])
+        end = self._pending_start + self._pending.size
+        if final:
+            count = int(round(end / self.ratio)) - self._emitted
+        else:
+            # Outputs whose right neighbour has arrived (np.interp clamps only at the very end)
+            count = max(0, int(np.ceil((end - 1) / self.ratio)) - self._emitted)
+        positions = np.arange(self._emitted, self._emitted + count, dtype=np.float64) * self.ratio
+        out = np.interp(positions, np.arange(self._pending_start, end), self._pending).astype(np.float32) if count > 0 else np.zeros(0, dtype=np.float32)
+        self._emitted += count
+        keep_from = min(int(self._emitted * self.ratio), end) - self._pending_start
+        if keep_from > 0:
+            self._pending = self._pending[keep_from:]
+            self._pending_start += keep_from
+        return out
+
+    def process(self, block: np.ndarray, final: bool = False) -> np.ndarray:
+        if self.passthrough:
+            return block.astype(np.float32, copy=False)
+        filtered = self._filter(block.astype(np.float32, copy=False), final)
+        if self.step is not None:
+            return filtered
+        return self._interpolate(filtered, final)
+
+def wav_header(frames: int, rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """A 44-byte header for 16-bit mono PCM, as encode_wav writes it."""
+    data_size = frames * 2
+    return b"".join([
+        b"RIFF", (36 + data_size).to_bytes(4, "little"), b"WAVE",
+        b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"), (1).to_bytes(2, "little"),
+        rate.to_bytes(4, "little"), (rate * 2).to_bytes(4, "little"), (2).to_bytes(2, "little"), (16).to_bytes(2, "little"),
+        b"data", data_size.to_bytes(4, "little"),
+    ])
+
+def _copy(src: BinaryIO, dst, size: int, block: int = 1 << 20):
+    while size > 0:
+        chunk = src.read(min(block, size))
+        if not chunk:
+            break
+        dst.write(chunk)
+        size -= len(chunk)
+
+def normalize_wav_stream(src: BinaryIO, dst, codec: str = "wav") -> Tuple[str, str]:
+    """
+    Reads a WAV file from `src` and writes its 16 kHz mono, silence-trimmed
+    version to `dst` (anything with write()). Returns (content type, file
+    extension); codec is as for normalize_audio.
+    """
+    fmt, data_size = read_wav_format(src)
+    frame_bytes = fmt.channels * fmt.width
+    block_bytes = max(1, int(NORMALIZE_BLOCK_SECONDS * fmt.rate)) * frame_bytes
+    resampler = StreamResampler(fmt.rate)
+    frame = TARGET_SAMPLE_RATE * FRAME_MS // 1000
+    carry = np.zeros(0, dtype=np.float32)  # samples short of a whole loudness frame
+    loud: List[np.ndarray] = []
+    total = 0
+
+    def measure(signal: np.ndarray):
+        nonlocal carry
+        signal = np.concatenate([carry, signal])
+        n_frames = signal.size // frame
+        frames = signal[:n_frames * frame].reshape(n_frames, frame)
+        rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+        loud.append(20 * np.log10(rms) > SILENCE_THRESHOLD_DB)
+        carry = signal[n_frames * frame:]
+
+    with tempfile.TemporaryFile(prefix="remotesync-pcm-") as pcm:
+        remaining = data_size
+        while True:
+            body = src.read(min(block_bytes, remaining) if remaining else block_bytes)
+            remaining = max(0, remaining - len(body))
+            final = len(body) < frame_bytes or (data_size and remaining == 0)
+            samples = _decode_samples(body, fmt)
+            signal = resampler.process(to_mono(samples) if samples.size else np.zeros(0, dtype=np.float32), final=bool(final))
+            measure(signal)
+            pcm.write((np.clip(signal, -1.0, 1.0) * 32767.0).astype("<i2").tobytes())
+            total += signal.size
+            if final:
+                break
+
+        # Same span as trim_silence() on the whole signal
+        flags = np.concatenate(loud) if loud else np.zeros(0, dtype=bool)
+        hits = np.flatnonzero(flags)
+        start, end = 0, total
+        if hits.size:
+            pad = TARGET_SAMPLE_RATE * SILENCE_PAD_MS // 1000
+            start = max(0, int(hits[0]) * frame - pad)
+            end = min(total, (int(hits[-1]) + 1) * frame + pad)
+
+        pcm.seek(start * 2)
+        if codec == "flac" and _write_flac(pcm, dst, end - start):
+            return "audio/flac", ".flac"
+        pcm.seek(start * 2)
+        dst.write(wav_header(end - start))
+        _copy(pcm, dst, (end - start) * 2)
+    return "audio/wav", ".wav"
+
+def _write_flac(pcm: BinaryIO, dst, frames: int) -> bool:
+    """Encodes 16-bit PCM to FLAC with the optional `soundfile`; False when it is not installed."""
+    try:
+        import soundfile  # type: ignore
+    except ImportError:
+        return False
+    block = NORMALIZE_BLOCK_SECONDS * TARGET_SAMPLE_RATE
+    with tempfile.TemporaryFile(prefix="remotesync-flac-") as out:
+        with soundfile.SoundFile(out, "w", TARGET_SAMPLE_RATE, 1, "PCM_16", format="FLAC") as flac:
+            while frames > 0:
+                data = np.frombuffer(pcm.read(min(block, frames) * 2), dtype="<i2")
+                if not data.size:
+                    break
+                flac.write(data)
+                frames -= data.size
+        out.seek(0)
+        _copy(out, dst, os.fstat(out.fileno()).st_size)
+    return True
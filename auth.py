@@ -1,34 +1,172 @@
 import os
-from fastapi import Depends, HTTPException, Header
+import time
+import asyncio
+import jwt
+from typing import Optional
+from fastapi import Depends, HTTPException, Header, Query
+from starlette.concurrency import run_in_threadpool
 from models import User
-from utils import clerk # Import the initialized client
+from cache import TTLCache
+from http_client import ProviderClient
+from metrics import span
+from utils import get_clerk, CLERK_SECRET_KEY
 
-async def get_current_user(authorization: str = Header(None)) -> User:
+# --- Session Token Verification ---
+# Clerk session tokens are RS256 JWTs, so they can be checked locally against
+# the instance's JWKS instead of calling the Clerk API on every request.
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL", "https://api.clerk.com/v1/jwks")
+CLERK_AUTHORIZED_PARTIES = [p for p in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if p]
+JWKS_REFRESH_SECONDS = int(os.getenv("JWKS_REFRESH_SECONDS", "3600"))
+JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "5"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "5000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+
+class JWKSCache:
+    """
+    Holds the signing keys by `kid`. They are fetched at startup and then
+    refreshed on the event loop through the async ProviderClient, so verifying
+    a token never blocks the loop on the network.
+    """
+    # Don't hammer the JWKS endpoint when tokens with unknown kids show up
+    MIN_FORCED_REFRESH_INTERVAL = 30
+
+    def __init__(self, url: str, refresh_seconds: int, client: ProviderClient):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.client = client
+        self._keys = {}
+        self._last_fetch = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        resp = await self.client.aget(self.url)
+        resp.raise_for_status()
+        keys = {}
+        for jwk in resp.json().get("keys", []):
+            keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+        self._keys = keys
+        self._last_fetch = time.monotonic()
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing Clerk JWKS: {e}")
+
+    async def start(self):
+        """Prefetches the keys and starts the periodic refresh. A failed prefetch is retried on first use."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Error fetching Clerk JWKS: {e}")
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+        await self.client.aclose()
+
+    async def get_key(self, kid: str):
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown kid: the keys may have been rotated since the last
+            # refresh. One request refetches; concurrent ones wait for it.
+            async with self._refresh_lock:
+                key = self._keys.get(kid)
+                if key is None and (not self._last_fetch or time.monotonic() - self._last_fetch > self.MIN_FORCED_REFRESH_INTERVAL):
+                    await self.refresh()
+                    key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+clerk_api = ProviderClient(
+    "clerk",
+    headers={"Authorization": f"Bearer {CLERK_SECRET_KEY}"},
+    timeout=5.0,
+    max_concurrency=2,
+    max_retries=1,
+)
+jwks = JWKSCache(CLERK_JWKS_URL, JWKS_REFRESH_SECONDS, clerk_api)
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, name="auth_users")
+
+async def verify_session_token(token: str) -> dict:
+    """Verifies a Clerk session token locally and returns its claims."""
+    header = jwt.get_unverified_header(token)
+    key = await jwks.get_key(header.get("kid"))
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        leeway=JWT_LEEWAY_SECONDS,
+        options={"require": ["sub", "exp", "iat"]},
+    )
+    if CLERK_AUTHORIZED_PARTIES and claims.get("azp") not in CLERK_AUTHORIZED_PARTIES:
+        raise jwt.InvalidTokenError("Token issued for an unauthorized party")
+    return claims
+
+def fetch_user(user_id: str) -> User:
+    """Fetches the full user object from Clerk (cache miss path)."""
+    with span("clerk.get_user"):
+        clerk_user = get_clerk().users.get_user(user_id)
+
+    primary_email_id = clerk_user.primary_email_address_id
+    primary_email_obj = next((e for e in clerk_user.email_addresses if e.id == primary_email_id), None)
+
+    if not primary_email_obj:
+        raise HTTPException(status_code=404, detail="Primary email not found for user")
+
+    return User(
+        id=clerk_user.id,
+        first_name=clerk_user.first_name,
+        last_name=clerk_user.last_name,
+        email=primary_email_obj.email_address,
+        image_url=clerk_user.image_url
+    )
+
+def cache_stats() -> dict:
+    return user_cache.stats()
+
+async def authenticate(authorization: Optional[str]) -> User:
+    """Resolves a `Bearer <token>` value to the signed-in user."""
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header missing")
-    
+
     try:
         token = authorization.split(" ")[1]
-        # Clerk's SDK has built-in verification that raises its own exceptions
-        session_claims = clerk.sessions.verify_token(token)
+        with span("auth.verify_token"):
+            session_claims = await verify_session_token(token)
         user_id = session_claims['sub']
-        
-        # Fetch the full user object from Clerk
-        clerk_user = clerk.users.get_user(user_id)
-        
-        primary_email_id = clerk_user.primary_email_address_id
-        primary_email_obj = next((e for e in clerk_user.email_addresses if e.id == primary_email_id), None)
-        
-        if not primary_email_obj:
-            raise HTTPException(status_code=404, detail="Primary email not found for user")
-
-        return User(
-            id=clerk_user.id,
-            first_name=clerk_user.first_name,
-            last_name=clerk_user.last_name,
-            email=primary_email_obj.email_address,
-            image_url=clerk_user.image_url
-        )
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await run_in_threadpool(fetch_user, user_id)
+            user_cache.set(user_id, user)
+        return user
+    except HTTPException:
+        raise
     except Exception as e:
-        # Catch potential errors from the SDK (e.g., token expired, invalid)
-        raise HTTPException(status_code=401, detail=f"Invalid token: {e}") 
\ No newline at end of file
+        # Catch verification errors (expired, bad signature, unknown key) and SDK errors
+        raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
+
+async def get_current_user(authorization: str = Header(None)) -> User:
+    return await authenticate(authorization)
+
+async def get_stream_user(authorization: str = Header(None), token: Optional[str] = Query(None)) -> User:
+    """
+    For EventSource endpoints: browsers cannot set headers on an EventSource,
+    so the session token may come as `?token=` instead. Clerk session tokens
+    expire within minutes, which limits what a logged URL gives away.
+    """
+    if not authorization and token:
+        authorization = f"Bearer {token}"
+    return await authenticate(authorization)
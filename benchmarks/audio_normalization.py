@@ -0,0 +1,89 @@
+"""
+Cost and payoff of the audio normalization stage (audio_processing.py).
+
+Uses test_audio.wav from the repo root as the fixture. The checked-in file
+is only a placeholder, so when it is not a decodable WAV a 48 kHz stereo
+recording with speech-like bursts and leading/trailing silence is
+synthesized instead (--seconds long). Reports per-stage timings and how many
+bytes storage upload and transcription have to move before and after.
+
+    python benchmarks/audio_normalization.py --seconds 300 --uplink-mbps 20
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import audio_processing as ap  # noqa: E402
+import synthetic_audio  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "test_audio.wav")
+
+
+def synthesize(seconds: float, rate: int = 48000) -> bytes:
+    # Syllable-rate bursts, 3 s of near silence before and 4 s after, in stereo
+    signal = synthetic_audio.synthesize(seconds, rate, gate_hz=2.5, gate_level=-0.2, lead_silence=3, trail_silence=4)
+    return synthetic_audio.to_wav(np.stack([signal, 0.9 * signal], axis=1), rate)
+
+
+def load_fixture(seconds: float) -> tuple:
+    with open(FIXTURE, "rb") as f:
+        data = f.read()
+    try:
+        ap.decode_wav(data)
+        return data, "test_audio.wav"
+    except ap.UnsupportedAudio:
+        return synthesize(seconds), f"synthetic {seconds:.0f}s 48 kHz stereo (test_audio.wav is not a decodable WAV)"
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        result = fn()
+        best = min(best, perf_counter() - started)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0, help="bandwidth used to estimate upload time")
+    args = parser.parse_args()
+
+    data, source = load_fixture(args.seconds)
+    print(f"fixture: {source}, {len(data) / 1e6:.2f} MB")
+
+    (samples, rate), t_decode = timed(lambda: ap.decode_wav(data), args.repeat)
+    mono, t_mono = timed(lambda: ap.to_mono(samples), args.repeat)
+    resampled, t_resample = timed(lambda: ap.resample(mono, rate), args.repeat)
+    trimmed, t_trim = timed(lambda: ap.trim_silence(resampled, ap.TARGET_SAMPLE_RATE), args.repeat)
+    wav_bytes, t_wav = timed(lambda: ap.encode_wav(trimmed), args.repeat)
+    flac_bytes, t_flac = timed(lambda: ap.encode_flac(trimmed), args.repeat)
+
+    print(f"\ninput: {samples.shape[1]} ch @ {rate} Hz, {samples.shape[0] / rate:.1f}s")
+    print(f"output: 1 ch @ {ap.TARGET_SAMPLE_RATE} Hz, {trimmed.size / ap.TARGET_SAMPLE_RATE:.1f}s after trimming\n")
+    for name, seconds in [("decode", t_decode), ("downmix", t_mono), ("resample", t_resample),
+                          ("trim silence", t_trim), ("encode wav", t_wav), ("encode flac", t_flac)]:
+        print(f"{name:14} {seconds * 1000:9.1f} ms")
+    total = t_decode + t_mono + t_resample + t_trim + t_wav
+    print(f"{'total (wav)':14} {total * 1000:9.1f} ms")
+
+    print(f"\n{'payload':10} {'bytes':>12} {'ratio':>8} {'upload @ %.0f Mbps' % args.uplink_mbps:>20}")
+    outputs = [("original", data), ("wav 16k", wav_bytes)]
+    if flac_bytes is not None:
+        outputs.append(("flac 16k", flac_bytes))
+    else:
+        print("(flac skipped: soundfile is not installed)")
+    for name, payload in outputs:
+        upload_s = len(payload) * 8 / (args.uplink_mbps * 1e6)
+        print(f"{name:10} {len(payload):12,} {len(data) / len(payload):7.1f}x {upload_s:19.2f}s")
+
+
+if __name__ == "__main__":
+    main()
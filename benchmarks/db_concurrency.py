@@ -0,0 +1,113 @@
+"""
+Database access from request handlers: sync calls on the event loop vs the
+threadpool vs the async engine (`fn.aio`, utils.db_function).
+
+Seeds one team with entries, then fires --requests concurrent handler-like
+coroutines that each insert an entry and read back its status, in three
+modes:
+
+  blocking    sync utils functions called directly from the coroutine (what
+              create_entry used to do)
+  threadpool  the same sync functions via anyio.to_thread
+  async       the `.aio` variants on the async engine
+
+For each mode it reports throughput, p50/p95 request latency, the worst
+event-loop stall (a 1 ms ticker runs alongside), and peak pool usage.
+
+    BENCH_DATABASE_URL=postgresql://localhost/remotesync_bench \\
+        DB_ASYNC_POOL_SIZE=20 python benchmarks/db_concurrency.py --requests 2000 --concurrency 200
+
+SQLite URLs work for a smoke run, but SQLite serializes writers, so only
+the loop stall column is meaningful there. The other variables from .env
+(SUPABASE_*, CLERK_SECRET_KEY) must be set because utils.py is imported.
+The target database's tables are created if missing and entries are added
+to a scratch team: never point it at real data.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from time import perf_counter
+
+import anyio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_mode(utils, mode: str, team_id: str, requests: int, concurrency: int) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    stall = {"max": 0.0}
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = perf_counter()
+            await asyncio.sleep(0.001)
+            stall["max"] = max(stall["max"], perf_counter() - started - 0.001)
+
+    async def handler(i: int):
+        async with slots:
+            started = perf_counter()
+            if mode == "blocking":
+                entry = utils.log_to_db("bench-user", f"update {i}", "", None, team_id, processing_status="queued")
+                utils.get_entry_status(entry.id, "bench-user")
+            elif mode == "threadpool":
+                entry = await anyio.to_thread.run_sync(utils.log_to_db, "bench-user", f"update {i}", "", None, team_id, "queued")
+                await anyio.to_thread.run_sync(utils.get_entry_status, entry.id, "bench-user")
+            else:
+                entry = await utils.log_to_db.aio("bench-user", f"update {i}", "", None, team_id, processing_status="queued")
+                await utils.get_entry_status.aio(entry.id, "bench-user")
+            latencies.append(perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    started = perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = perf_counter() - started
+    done.set()
+    await tick
+    return {
+        "rps": requests / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "stall": stall["max"],
+    }
+
+
+async def main_async(args):
+    import utils
+    from models import TeamCreate
+
+    utils.init_schema()
+    team = utils.create_team_in_db(TeamCreate(name="db-concurrency-bench", settings={}), "bench-user")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    print(f"{'mode':11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'loop stall ms':>14} {'peak conns':>11}")
+    for mode in args.modes or ["blocking", "threadpool", "async"]:
+        for stats in utils.db_pool_stats.values():
+            stats["peak_in_use"] = stats["in_use"]
+        result = await run_mode(utils, mode, team.id, args.requests, args.concurrency)
+        pool = "async" if mode == "async" else "sync"
+        peak = utils.db_pool_stats.get(pool, {}).get("peak_in_use", 0)
+        print(f"{mode:11} {result['rps']:8.0f} {result['p50'] * 1000:8.1f} {result['p95'] * 1000:8.1f} {result['stall'] * 1000:14.1f} {peak:11}")
+    await utils.dispose_async_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=40, help="threadpool size for the threadpool mode")
+    parser.add_argument("--modes", action="append", choices=["blocking", "threadpool", "async"])
+    args = parser.parse_args()
+    if os.getenv("BENCH_DATABASE_URL"):
+        os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
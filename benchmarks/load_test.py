@@ -0,0 +1,517 @@
+"""
+Offline load test: drives the API and the scheduled jobs at 10 to 10k teams
+with local stand-ins for Clerk, Hugging Face, Supabase storage and Resend,
+so nothing leaves the machine.
+
+Each stand-in sleeps for its configured mean latency (uniform +/-50%) and
+fails with the configured error rate:
+
+  clerk        users.get_user / users.get_user_list (in-process fake client)
+  huggingface  Whisper and Mixtral, via an httpx mock transport on the
+               `huggingface` ProviderClient (failures are HTTP 500)
+  supabase     storage uploads (in-process fake client; failures raise)
+  resend       /emails and /emails/batch, via an httpx mock transport
+
+Requests go through the real ASGI app (auth included: session tokens are
+RS256 JWTs signed with a key generated for the run), in-process over
+httpx.ASGITransport. Scenarios, run at every --teams scale:
+
+  entry_text   POST /api/entry with text, then poll its status to completion
+  entry_audio  the same with a generated WAV recording
+  dashboard    GET /api/dashboard?team_id=...
+  members      GET /api/teams/{id}/members
+  jobs         run_scheduled_jobs() with every team's daily and weekly report due
+
+For each scenario it reports throughput and p50/p95/p99 latency. For the
+entry scenarios that is the POST and also the time until the entry
+completes. For jobs it is per team report plus the whole run. --json
+writes the same numbers for comparison between builds.
+
+    python benchmarks/load_test.py --teams 10 --teams 100 --teams 1000 --requests 500 --concurrency 50
+    python benchmarks/load_test.py --teams 10000 --scenario jobs --hf-latency-ms 800 --error-rate 0.01
+    python benchmarks/load_test.py --database-url postgresql://localhost/remotesync_load --json load.json
+
+By default the database is a fresh SQLite file in a temp directory. SQLite
+serializes writers, so use a scratch Postgres database for numbers that
+matter. The harness creates its tables and seeds `bench_team_*` teams
+there: never point it at real data. The application's own log output is
+discarded unless --verbose is set.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+from datetime import datetime, timedelta
+from io import BytesIO
+from time import perf_counter
+from types import SimpleNamespace
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SERVICES = ("clerk", "huggingface", "supabase", "resend")
+SCENARIOS = ("entry_text", "entry_audio", "dashboard", "members", "jobs")
+SUMMARY = "- Completed: wired up the export endpoint\n- In Progress: load tests\n- Blocked: None"
+UPDATE_WORDS = "shipped fixed reviewed deployed migrated profiled benchmarked refactored tested documented the export endpoint pagination cache scheduler reports dashboard waiting on review blocked by staging".split()
+SEED_CHUNK = 5000
+
+# --- Fake Services ---
+class FakeService:
+    """Latency (uniform +/-50% around the mean) and an error rate for one stand-in service."""
+
+    def __init__(self, name: str, latency_ms: float, error_rate: float):
+        self.name = name
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def call(self) -> bool:
+        """Waits out the latency; returns False if this call should fail."""
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        if random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors}
+
+def hugging_face_transport(service: FakeService) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        if not service.call():
+            return httpx.Response(500, json={"error": "injected failure"})
+        if "whisper" in request.url.path:
+            return httpx.Response(200, json={"text": random_update(random.Random())})
+        # Like TGI, the text-generation endpoint takes exactly one prompt
+        prompt = json.loads(request.content)["inputs"]
+        if not isinstance(prompt, str):
+            return httpx.Response(422, json={"error": "Input validation error: `inputs` must be a string"})
+        updates = len(re.findall(r"^Update \d+:$", prompt, re.M))
+        if updates:
+            # A micro-batch prompt (utils.BATCH_SUMMARY_PROMPT) asks for a JSON array
+            text = json.dumps([{"id": i, "summary": SUMMARY} for i in range(1, updates + 1)])
+            return httpx.Response(200, json=[{"generated_text": text}])
+        return httpx.Response(200, json=[{"generated_text": SUMMARY}])
+    return httpx.MockTransport(handle)
+
+def resend_transport(service: FakeService) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        if not service.call():
+            return httpx.Response(500, json={"message": "injected failure"})
+        if request.url.path.endswith("/batch"):
+            return httpx.Response(200, json={"data": [{"id": f"email_{i}"} for i, _ in enumerate(json.loads(request.content))]})
+        return httpx.Response(200, json={"id": "email_0"})
+    return httpx.MockTransport(handle)
+
+def clerk_user(user_id: str) -> SimpleNamespace:
+    email = SimpleNamespace(id=f"idn_{user_id}", email_address=f"{user_id}@bench.local")
+    return SimpleNamespace(
+        id=user_id, first_name="Bench", last_name=user_id, image_url=None,
+        primary_email_address_id=email.id, email_addresses=[email],
+    )
+
+class FakeClerkUsers:
+    def __init__(self, service: FakeService):
+        self.service = service
+
+    def get_user(self, user_id: str):
+        if not self.service.call():
+            raise RuntimeError("Clerk: injected failure")
+        return clerk_user(user_id)
+
+    def get_user_list(self, user_id: list, limit: int = 10):
+        if not self.service.call():
+            raise RuntimeError("Clerk: injected failure")
+        return [clerk_user(uid) for uid in user_id[:limit]]
+
+class FakeStorageBucket:
+    def __init__(self, service: FakeService):
+        self.service = service
+
+    def from_(self, bucket: str):
+        return self
+
+    def upload(self, path: str, source, options: dict):
+        if hasattr(source, "read"):
+            source.read()
+        if not self.service.call():
+            raise RuntimeError("Supabase storage: injected failure")
+        return SimpleNamespace(error=None, path=path)
+
+def install_fakes(utils, auth, args) -> dict:
+    services = {
+        name: FakeService(name, getattr(args, f"{name}_latency_ms"), args.error_rate)
+        for name in SERVICES
+    }
+    utils.huggingface._client = httpx.Client(headers=utils.huggingface.headers, transport=hugging_face_transport(services["huggingface"]))
+    utils.resend._client = httpx.Client(base_url=utils.resend.base_url, headers=utils.resend.headers, transport=resend_transport(services["resend"]))
+    utils._clerk = SimpleNamespace(users=FakeClerkUsers(services["clerk"]))
+    utils._supabase = SimpleNamespace(storage=FakeStorageBucket(services["supabase"]))
+    return services
+
+class TokenSigner:
+    """Signs Clerk-style session tokens with a key that auth.jwks is told about."""
+
+    def __init__(self, auth):
+        import jwt
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        self._jwt = jwt
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        auth.jwks._keys = {"bench": self._key.public_key()}
+        auth.jwks._last_fetch = time.monotonic()
+        self._tokens = {}
+
+    def header(self, user_id: str) -> dict:
+        token = self._tokens.get(user_id)
+        if token is None:
+            now = int(time.time())
+            token = self._tokens[user_id] = self._jwt.encode(
+                {"sub": user_id, "iat": now, "exp": now + 24 * 3600}, self._key, algorithm="RS256", headers={"kid": "bench"}
+            )
+        return {"Authorization": f"Bearer {token}"}
+
+# --- Data ---
+def team_id(i: int) -> str:
+    return f"bench_team_{i}"
+
+def member_id(i: int, j: int) -> str:
+    return f"bench_user_{i}_{j}"
+
+def random_update(rng: random.Random) -> str:
+    return " ".join(rng.choice(UPDATE_WORDS) for _ in range(rng.randint(12, 40))) + "."
+
+def make_wav(seconds: float, rng: random.Random, rate: int = 16000) -> bytes:
+    """A tone with some noise; a different one per call so the inference cache never hits."""
+    frequency = rng.uniform(120, 480)
+    frames = struct.pack(
+        f"<{int(seconds * rate)}h",
+        *(int(8000 * math.sin(2 * math.pi * frequency * n / rate) + rng.randint(-300, 300)) for n in range(int(seconds * rate)))
+    )
+    out = BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return out.getvalue()
+
+def seed_teams(utils, start: int, stop: int, members: int, days: int, submit_ratio: float, rng: random.Random):
+    """
+    Adds teams start..stop-1, with their members and `days` days of completed
+    entries (each member posts on a day with probability submit_ratio) and the
+    matching digest rows. Bulk inserts, so 10k teams take seconds.
+    """
+    from sqlalchemy import func, insert
+    now = datetime.utcnow()
+    teams, memberships, entries, digests = [], [], [], {}
+    with utils.SessionLocal() as session:
+        next_entry_id = (session.query(func.max(utils.StandupEntry.id)).scalar() or 0) + 1
+    for i in range(start, stop):
+        owner = member_id(i, 0)
+        teams.append({
+            "id": team_id(i), "name": f"Bench Team {i}", "owner_id": owner, "settings": {},
+            "report_recipients": [f"{owner}@bench.local"], "invite_token": f"bench-invite-{i}",
+            "next_daily_report_at": now + timedelta(days=1), "next_weekly_report_at": now + timedelta(days=7),
+            "created_at": now - timedelta(days=days),
+        })
+        for j in range(members):
+            memberships.append({"team_id": team_id(i), "user_id": member_id(i, j), "role": "owner" if j == 0 else "member", "created_at": now})
+        for day in range(days):
+            for j in range(members):
+                if rng.random() >= submit_ratio:
+                    continue
+                created_at = now - timedelta(days=day, minutes=rng.randint(1, 600)) if day else now - timedelta(seconds=rng.randint(1, 60))
+                fields = {
+                    "id": next_entry_id, "user_id": member_id(i, j), "team_id": team_id(i), "text": random_update(rng),
+                    "summary": SUMMARY, "audio_url": None, "processing_status": "completed", "created_at": created_at,
+                }
+                next_entry_id += 1
+                entries.append(fields)
+                digest = digests.setdefault((team_id(i), created_at.date()), {"fragments": [], "participants": []})
+                digest["fragments"].append(utils.render_digest_fragment(utils.StandupEntry(**fields)))
+                if fields["user_id"] not in digest["participants"]:
+                    digest["participants"].append(fields["user_id"])
+    digest_rows = []
+    for (tid, day), digest in digests.items():
+        digest["fragments"].sort(key=lambda f: (f["created_at"], f["entry_id"]))
+        digest_rows.append({
+            "team_id": tid, "day": day, "entry_count": len(digest["fragments"]), "participants": digest["participants"],
+            "fragments": digest["fragments"], "updated_at": now,
+        })
+    with utils.SessionLocal() as session:
+        for model, rows in ((utils.Team, teams), (utils.TeamMember, memberships), (utils.StandupEntry, entries), (utils.TeamDailyDigest, digest_rows)):
+            for k in range(0, len(rows), SEED_CHUNK):
+                session.execute(insert(model), rows[k:k + SEED_CHUNK])
+        session.commit()
+    return len(entries)
+
+def seeded_team_count(utils) -> int:
+    with utils.SessionLocal() as session:
+        return session.query(utils.Team).filter(utils.Team.id.like("bench_team_%")).count()
+
+def make_all_reports_due(utils):
+    due = datetime.utcnow() - timedelta(minutes=1)
+    with utils.SessionLocal() as session:
+        session.query(utils.Team).filter(utils.Team.id.like("bench_team_%")).update(
+            {utils.Team.next_daily_report_at: due, utils.Team.next_weekly_report_at: due}, synchronize_session=False
+        )
+        session.commit()
+
+# --- Measurement ---
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    result = {"count": len(latencies), "errors": errors, "per_second": len(latencies) / elapsed if elapsed else 0.0}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        result[name] = percentile(latencies, q) if latencies else None
+    return result
+
+async def drive(requests: int, concurrency: int, one_request) -> dict:
+    """
+    Runs `one_request(i)` `requests` times, `concurrency` at a time. Each call
+    returns {metric: seconds} for what it completed and raises to count an error.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    latencies: dict = {}
+    errors: dict = {}
+
+    async def run(i: int):
+        async with slots:
+            try:
+                timings = await one_request(i)
+            except Exception as e:
+                metric = getattr(e, "metric", "request")
+                errors[metric] = errors.get(metric, 0) + 1
+                return
+            for metric, seconds in timings.items():
+                latencies.setdefault(metric, []).append(seconds)
+
+    started = perf_counter()
+    await asyncio.gather(*(run(i) for i in range(requests)))
+    elapsed = perf_counter() - started
+    return {metric: summarize(latencies.get(metric, []), errors.get(metric, 0), elapsed) for metric in sorted(set(latencies) | set(errors))}
+
+class RequestFailed(Exception):
+    def __init__(self, metric: str, detail: str):
+        super().__init__(detail)
+        self.metric = metric
+
+def check(response: httpx.Response, metric: str = "request"):
+    if response.status_code >= 400:
+        raise RequestFailed(metric, f"{response.status_code} {response.text[:200]}")
+
+# --- Scenarios ---
+async def entry_scenario(client, signer, teams: int, members: int, args, audio: bool) -> dict:
+    rng = random.Random(args.seed)
+    recordings = [make_wav(args.audio_seconds, rng) for _ in range(min(args.requests, 50))] if audio else []
+
+    async def one_request(i: int) -> dict:
+        t, m = rng.randrange(teams), rng.randrange(members)
+        headers = signer.header(member_id(t, m))
+        started = perf_counter()
+        if audio:
+            # Vary the bytes so repeated recordings do not hit the inference cache
+            data = recordings[i % len(recordings)] + i.to_bytes(4, "little")
+            response = await client.post("/api/entry", data={"team_id": team_id(t)}, files={"audio": ("update.wav", data, "audio/wav")}, headers=headers)
+        else:
+            response = await client.post("/api/entry", data={"team_id": team_id(t), "text": f"{random_update(rng)} ({i})"}, headers=headers)
+        check(response)
+        accepted = perf_counter()
+        job_id = response.json()["job_id"]
+        deadline = accepted + args.completion_timeout
+        while perf_counter() < deadline:
+            await asyncio.sleep(args.poll_interval)
+            status = await client.get(f"/api/entries/{job_id}/status", headers=headers)
+            check(status, "completed")
+            state = status.json()["processing_status"]
+            if state == "completed":
+                return {"request": accepted - started, "completed": perf_counter() - started}
+            if state == "failed":
+                raise RequestFailed("completed", status.json().get("processing_error") or "failed")
+        raise RequestFailed("completed", f"entry {job_id} still processing after {args.completion_timeout}s")
+
+    return await drive(args.requests, args.concurrency, one_request)
+
+async def dashboard_scenario(client, signer, teams: int, members: int, args) -> dict:
+    rng = random.Random(args.seed)
+
+    async def one_request(i: int) -> dict:
+        t, m = rng.randrange(teams), rng.randrange(members)
+        started = perf_counter()
+        response = await client.get("/api/dashboard", params={"team_id": team_id(t)}, headers=signer.header(member_id(t, m)))
+        check(response)
+        return {"request": perf_counter() - started}
+
+    return await drive(args.requests, args.concurrency, one_request)
+
+async def members_scenario(client, signer, teams: int, members: int, args) -> dict:
+    rng = random.Random(args.seed)
+
+    async def one_request(i: int) -> dict:
+        t, m = rng.randrange(teams), rng.randrange(members)
+        started = perf_counter()
+        response = await client.get(f"/api/teams/{team_id(t)}/members", headers=signer.header(member_id(t, m)))
+        check(response)
+        if len(response.json()) != members:
+            raise RequestFailed("request", f"expected {members} members, got {len(response.json())}")
+        return {"request": perf_counter() - started}
+
+    return await drive(args.requests, args.concurrency, one_request)
+
+def jobs_scenario(utils) -> dict:
+    """One run_scheduled_jobs() with every bench team's daily and weekly report due."""
+    make_all_reports_due(utils)
+    timings = {"daily": [], "weekly": []}
+    errors = {"daily": 0, "weekly": 0}
+    originals = {"daily": utils.send_daily_report, "weekly": utils.send_weekly_report}
+    lock = threading.Lock()
+
+    def probe(kind):
+        def send(team):
+            started = perf_counter()
+            try:
+                originals[kind](team)
+            except Exception:
+                with lock:
+                    errors[kind] += 1
+                raise
+            with lock:
+                timings[kind].append(perf_counter() - started)
+        return send
+
+    utils.send_daily_report, utils.send_weekly_report = probe("daily"), probe("weekly")
+    try:
+        started = perf_counter()
+        outcome = utils.run_scheduled_jobs()
+        elapsed = perf_counter() - started
+    finally:
+        utils.send_daily_report, utils.send_weekly_report = originals["daily"], originals["weekly"]
+    reminders = outcome.get("reminders") or {}
+    return {
+        "daily_report": summarize(timings["daily"], errors["daily"], elapsed),
+        "weekly_report": summarize(timings["weekly"], errors["weekly"], elapsed),
+        "run": {**summarize([elapsed], 0, elapsed), "reminders_sent": reminders.get("sent"), "reminders_failed": reminders.get("failed")},
+    }
+
+# --- Runner ---
+def configure_environment(args):
+    """utils.py reads its configuration at import, so this runs before anything from the app is imported."""
+    if not args.database_url:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='remotesync-load-'), 'load.db')}"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["AUTO_CREATE_SCHEMA"] = "true"
+    os.environ["TRANSCRIPTION_BACKEND"] = "remote"
+    os.environ["EMAIL_INGEST_MODE"] = "poll"
+    # Empty rather than unset, so a local .env cannot point the reminder job at a real inbox
+    for name in ("IMAP_SERVER", "IMAP_USERNAME", "IMAP_PASSWORD"):
+        os.environ[name] = ""
+    for name, value in (("SUPABASE_URL", "https://bench.supabase.local"), ("SUPABASE_SERVICE_KEY", "bench"),
+                        ("CLERK_SECRET_KEY", "bench"), ("RESEND_API_KEY", "bench"), ("HF_TOKEN", "bench")):
+        os.environ[name] = value
+
+def print_results(out, scale: int, scenario: str, results: dict):
+    for metric, r in results.items():
+        cells = [f"{r[q] * 1000:8.1f}" if r[q] is not None else f"{'-':>8}" for q in ("p50", "p95", "p99")]
+        print(f"{scale:>6} {scenario:12} {metric:14} {r['count']:7} {r['errors']:6} {r['per_second']:9.1f} {' '.join(cells)}", file=out, flush=True)
+
+async def run(args, out):
+    import anyio
+    import auth
+    import main as api
+    import pipeline
+    import utils
+
+    utils.init_schema()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = api.API_THREADPOOL_SIZE
+    services = install_fakes(utils, auth, args)
+    signer = TokenSigner(auth)
+    rng = random.Random(args.seed)
+    report = {"database_url": utils.engine.url.render_as_string(hide_password=True), "args": vars(args), "runs": []}
+
+    print(f"{'teams':>6} {'scenario':12} {'metric':14} {'n':>7} {'errors':>6} {'per sec':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", file=out)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scale in sorted(args.teams or [10, 100, 1000]):
+            existing = seeded_team_count(utils)
+            if existing < scale:
+                started = perf_counter()
+                entries = seed_teams(utils, existing, scale, args.members, args.days, args.submit_ratio, rng)
+                print(f"# seeded teams {existing}..{scale - 1} ({entries} entries) in {perf_counter() - started:.1f}s", file=out, flush=True)
+            for scenario in args.scenario or SCENARIOS:
+                if args.cold_caches:
+                    auth.user_cache.clear()
+                    utils.profile_cache.clear()
+                before = {name: service.stats() for name, service in services.items()}
+                if scenario == "jobs":
+                    results = await anyio.to_thread.run_sync(jobs_scenario, utils)
+                elif scenario == "dashboard":
+                    results = await dashboard_scenario(client, signer, scale, args.members, args)
+                elif scenario == "members":
+                    results = await members_scenario(client, signer, scale, args.members, args)
+                else:
+                    results = await entry_scenario(client, signer, scale, args.members, args, audio=scenario == "entry_audio")
+                calls = {name: {k: v - before[name][k] for k, v in service.stats().items()} for name, service in services.items()}
+                print_results(out, scale, scenario, results)
+                report["runs"].append({"teams": scale, "scenario": scenario, "results": results, "service_calls": calls})
+
+    pipeline.shutdown(wait=True)
+    utils.report_executor.shutdown(wait=True)
+    utils.transcriber.close()
+    utils.summary_router.shutdown()
+    await auth.jwks.stop()
+    await utils.dispose_async_engine()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"# wrote {args.json}", file=out)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, action="append", help="team counts to run at, ascending (default 10, 100, 1000)")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="default: all")
+    parser.add_argument("--requests", type=int, default=200, help="requests per API scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--members", type=int, default=5, help="members per team")
+    parser.add_argument("--days", type=int, default=7, help="days of seeded entries")
+    parser.add_argument("--submit-ratio", type=float, default=0.6, help="chance a member posted on a seeded day")
+    parser.add_argument("--audio-seconds", type=float, default=3.0)
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="seconds between status polls")
+    parser.add_argument("--completion-timeout", type=float, default=120.0)
+    for name, latency in (("clerk", 40), ("huggingface", 300), ("supabase", 80), ("resend", 60)):
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=latency)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="failure probability for every fake service call")
+    parser.add_argument("--cold-caches", action="store_true", help="clear the auth and Clerk profile caches before each scenario")
+    parser.add_argument("--database-url", help="default: a fresh SQLite file in a temp directory")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the application's log output")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    out = sys.stdout
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with quiet:
+        asyncio.run(run(args, out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Query plans for the standup_entries hot queries before and after migration 0004.
+
+Builds the schema up to revision 0003 on a scratch database, seeds it, runs
+EXPLAIN on the dashboard / report / reminder / membership queries, applies
+0004 (the composite indexes) and runs them again.
+
+    BENCH_DATABASE_URL=postgresql://localhost/remotesync_bench \\
+        python benchmarks/query_plans.py --rows 10000000 --teams 20000
+
+The 10M-row numbers are meant for Postgres. SQLite URLs work for a quick
+smoke run (--rows 20000 --teams 200); its pre-index anti-join is quadratic.
+The target database is dropped and recreated: never point it at real data.
+The other variables from .env (SUPABASE_*, CLERK_SECRET_KEY) must be set
+because the migrations import the models from utils.py.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+QUERIES = {
+    "dashboard (teams of a user, last 7 days)": """
+        SELECT * FROM standup_entries
+        WHERE team_id IN (SELECT team_id FROM team_members WHERE user_id = :user_id)
+          AND created_at >= :week_ago
+        ORDER BY created_at DESC
+    """,
+    "daily report (one team, last 24h)": """
+        SELECT * FROM standup_entries
+        WHERE team_id = :team_id AND created_at >= :day_ago
+        ORDER BY created_at ASC
+    """,
+    "user submitted today (one team)": """
+        SELECT id FROM standup_entries
+        WHERE team_id = :team_id AND user_id = :user_id AND created_at >= :today
+        LIMIT 1
+    """,
+    "reminders anti-join (all teams)": """
+        SELECT tm.user_id, tm.team_id FROM team_members tm
+        WHERE NOT EXISTS (
+            SELECT 1 FROM standup_entries se
+            WHERE se.team_id = tm.team_id AND se.user_id = tm.user_id AND se.created_at >= :today
+        )
+    """,
+}
+
+
+def migrate(url: str, revision: str):
+    from alembic import command
+    from alembic.config import Config
+
+    os.environ["DATABASE_URL"] = url
+    root = os.path.join(os.path.dirname(__file__), "..")
+    cfg = Config(os.path.join(root, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(root, "migrations"))
+    command.upgrade(cfg, revision)
+
+
+def seed_postgres(conn, rows: int, teams: int, members: int, days: int):
+    conn.execute(text("""
+        INSERT INTO teams (id, name, owner_id, settings, report_recipients, invite_token, created_at)
+        SELECT 'team_' || t, 'Team ' || t, 'user_' || (t * :m), '{}', '[]', 'tok_' || t, now()
+        FROM generate_series(1, :teams) t
+    """), {"teams": teams, "m": members})
+    conn.execute(text("""
+        INSERT INTO team_members (team_id, user_id, role, created_at)
+        SELECT 'team_' || t, 'user_' || (t * :m + u), 'member', now()
+        FROM generate_series(1, :teams) t, generate_series(0, :m - 1) u
+    """), {"teams": teams, "m": members})
+    conn.execute(text("""
+        INSERT INTO standup_entries (user_id, team_id, text, summary, audio_url, processing_status, created_at)
+        SELECT 'user_' || ((1 + g % :teams) * :m + (g / :teams) % :m), 'team_' || (1 + g % :teams),
+               repeat('update ', 40), '- Completed: ...', NULL, 'completed',
+               now() - random() * make_interval(days => :days)
+        FROM generate_series(1, :rows) g
+    """), {"rows": rows, "teams": teams, "m": members, "days": days})
+    conn.execute(text("ANALYZE"))
+
+
+def seed_generic(conn, rows: int, teams: int, members: int, days: int, batch: int = 50_000):
+    now = datetime.utcnow()
+    conn.execute(text(
+        "INSERT INTO teams (id, name, owner_id, settings, report_recipients, invite_token, created_at) "
+        "VALUES (:id, :name, :owner, '{}', '[]', :tok, :now)"
+    ), [{"id": f"team_{t}", "name": f"Team {t}", "owner": f"user_{t * members}", "tok": f"tok_{t}", "now": now} for t in range(1, teams + 1)])
+    conn.execute(text(
+        "INSERT INTO team_members (team_id, user_id, role, created_at) VALUES (:team, :user, 'member', :now)"
+    ), [{"team": f"team_{t}", "user": f"user_{t * members + u}", "now": now} for t in range(1, teams + 1) for u in range(members)])
+    insert = text(
+        "INSERT INTO standup_entries (user_id, team_id, text, summary, audio_url, processing_status, created_at) "
+        "VALUES (:user, :team, :text, '- Completed: ...', NULL, 'completed', :created)"
+    )
+    for start in range(0, rows, batch):
+        params = []
+        for g in range(start, min(start + batch, rows)):
+            t = 1 + g % teams
+            params.append({
+                "user": f"user_{t * members + (g // teams) % members}",
+                "team": f"team_{t}",
+                "text": "update " * 40,
+                "created": now - timedelta(seconds=random.random() * days * 86400),
+            })
+        conn.execute(insert, params)
+    conn.execute(text("ANALYZE"))
+
+
+def explain(conn, sql: str, params: dict) -> tuple:
+    if conn.dialect.name == "postgresql":
+        plan = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).scalars().all()
+    else:
+        plan = [" | ".join(str(c) for c in row) for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+    started = perf_counter()
+    conn.execute(text(sql), params).fetchall()
+    return plan, perf_counter() - started
+
+
+def report(conn, label: str, params: dict) -> dict:
+    print(f"\n===== {label} =====")
+    timings = {}
+    for name, sql in QUERIES.items():
+        plan, seconds = explain(conn, sql, params)
+        timings[name] = seconds
+        print(f"\n--- {name}: {seconds * 1000:.1f} ms")
+        for line in plan:
+            print(f"    {line}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--teams", type=int, default=20_000)
+    parser.add_argument("--members", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        sys.exit("Set BENCH_DATABASE_URL to a scratch database.")
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for table in ("alembic_version", "standup_entries", "team_members", "teams"):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+    migrate(url, "0003")
+    started = perf_counter()
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            seed_postgres(conn, args.rows, args.teams, args.members, args.days)
+        else:
+            seed_generic(conn, args.rows, args.teams, args.members, args.days)
+    print(f"Seeded {args.rows:,} entries across {args.teams:,} teams in {perf_counter() - started:.1f}s")
+
+    now = datetime.utcnow()
+    params = {
+        "user_id": f"user_{args.members + 1}",
+        "team_id": "team_1",
+        "week_ago": now - timedelta(days=7),
+        "day_ago": now - timedelta(days=1),
+        "today": now.replace(hour=0, minute=0, second=0, microsecond=0),
+    }
+    with engine.connect() as conn:
+        before = report(conn, "before 0004 (no composite indexes)", params)
+
+    started = perf_counter()
+    migrate(url, "0004")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"\nApplied 0004 in {perf_counter() - started:.1f}s")
+
+    with engine.connect() as conn:
+        after = report(conn, "after 0004", params)
+
+    print("\n===== summary =====")
+    print(f"{'query':45} {'before ms':>12} {'after ms':>12} {'speedup':>9}")
+    for name in QUERIES:
+        b, a = before[name] * 1000, after[name] * 1000
+        print(f"{name:45} {b:12.1f} {a:12.1f} {b / a if a else float('inf'):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
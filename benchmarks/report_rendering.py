@@ -0,0 +1,84 @@
+"""
+Report rendering: the previous `html_content +=` builder vs the template
+renderer in reports.py, for weekly reports of 10, 100 and 1000 entries.
+
+Entries are synthetic (LLM-sized summaries, a third with audio links) spread
+over 5 days. The legacy builder is reproduced here as it was in utils.py.
+It does no escaping, and CPython usually extends a uniquely referenced str
+in place on `+=`, so in CPython its raw time stays roughly linear. The
+renderer's costs are escaping and per-template dispatch. What it adds is
+correct output in three formats and a bounded first chunk when streamed.
+The renderer is also timed for text and Slack output, and for streaming
+(time to the first chunk).
+
+    python benchmarks/report_rendering.py --repeat 50
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from reports import Report, render_report, stream_report  # noqa: E402
+
+SUMMARY = "- Completed: shipped the export endpoint & fixed <pagination>\n- In Progress: load tests\n- Blocked: None"
+
+
+def make_sections(entries: int) -> list:
+    sections = []
+    per_day = max(1, entries // 5)
+    for i in range(entries):
+        if i % per_day == 0:
+            day = date(2026, 10, 12) + timedelta(days=len(sections))
+            sections.append((day.strftime("%Y-%m-%d %A"), []))
+        sections[-1][1].append({
+            "name": f"Teammate {i}",
+            "summary": SUMMARY,
+            "audio_url": f"https://example.supabase.co/storage/v1/object/public/audio/{i}.wav" if i % 3 == 0 else None,
+        })
+    return sections
+
+
+def legacy_weekly(sections: list) -> str:
+    html_content = "<h1>Weekly Standup Summary</h1><p>A summary of all updates from the past week.</p><hr>"
+    for day, items in sections:
+        html_content += f"<h2>{day}</h2>"
+        for item in items:
+            html_content += f"<h3>{item['name']}</h3><blockquote>{item['summary'].replace(chr(10), '<br>')}</blockquote>"
+        html_content += "<hr>"
+    return html_content
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, action="append", help="report sizes (default 10, 100, 1000)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'legacy ms':>10} {'html ms':>9} {'text ms':>9} {'slack ms':>9} {'1st chunk ms':>13} {'html KB':>8}")
+    for entries in args.entries or [10, 100, 1000]:
+        sections = make_sections(entries)
+        report = Report("Weekly Standup Summary", sections, intro="A summary of all updates from the past week.",
+                        show_audio=False, divide="sections")
+        t_legacy = timed(lambda: legacy_weekly(sections), args.repeat)
+        t_html = timed(lambda: render_report(report, "html"), args.repeat)
+        t_text = timed(lambda: render_report(report, "text"), args.repeat)
+        t_slack = timed(lambda: render_report(report, "slack"), args.repeat)
+        t_first = timed(lambda: next(stream_report(report, "html")), args.repeat)
+        size = len(render_report(report, "html")) / 1024
+        print(f"{entries:8} {t_legacy * 1000:10.3f} {t_html * 1000:9.3f} {t_text * 1000:9.3f} {t_slack * 1000:9.3f} {t_first * 1000:13.3f} {size:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
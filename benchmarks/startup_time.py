@@ -0,0 +1,79 @@
+"""
+API cold start: time to `import main`, to run the startup hooks, and to
+serve the first request, each measured in a fresh interpreter.
+
+The first request is GET /api/entries/1/status with authentication stubbed
+out, so it includes creating the async database engine. --top N also lists
+the N slowest top-level imports (from `python -X importtime`).
+
+    python benchmarks/startup_time.py --runs 10 --top 15
+
+Uses the DATABASE_URL and service variables from the environment / .env.
+Nothing is sent to Supabase, Clerk or Hugging Face.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CHILD = r"""
+import json, sys
+from time import perf_counter
+started = perf_counter()
+import main
+imported = perf_counter()
+from fastapi.testclient import TestClient
+from models import User
+main.app.dependency_overrides[main.get_current_user] = lambda: User(id="startup-bench", email="bench@example.com")
+with TestClient(main.app) as client:
+    ready = perf_counter()
+    response = client.get("/api/entries/1/status")
+    first = perf_counter()
+print(json.dumps({"import": imported - started, "startup": ready - imported, "first_request": first - ready, "status": response.status_code}))
+"""
+
+
+def run_once() -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest top-level imports")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    print(f"{'phase':15} {'median ms':>10} {'max ms':>9}")
+    for phase in ("import", "startup", "first_request"):
+        values = [r[phase] * 1000 for r in results]
+        print(f"{phase:15} {statistics.median(values):10.1f} {max(values):9.1f}")
+    total = [sum(r[p] for p in ("import", "startup", "first_request")) * 1000 for r in results]
+    print(f"{'total':15} {statistics.median(total):10.1f} {max(total):9.1f}")
+
+    if args.top:
+        print(f"\n{'module':40} {'ms':>8}")
+        for micros, name in slowest_imports(args.top):
+            print(f"{name:40} {micros / 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
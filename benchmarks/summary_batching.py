@@ -0,0 +1,95 @@
+"""
+Throughput and per-entry latency of LLM summarization: one request per entry
+versus the MicroBatcher used by utils.llm_summary, which sends each batch as
+one multi-update prompt (utils.BATCH_SUMMARY_PROMPT).
+
+The inference endpoint is simulated in-process: each request costs
+--base-ms plus --per-item-ms for every update in its prompt, and at most
+--concurrency requests run at once (the provider's rate limit). Entries
+arrive at --rate per second, like a morning peak.
+
+    python benchmarks/summary_batching.py --entries 500 --rate 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from summarizer import MicroBatcher  # noqa: E402
+
+
+def make_endpoint(base_ms: float, per_item_ms: float, concurrency: int):
+    slots = threading.Semaphore(concurrency)
+    calls = {"requests": 0}
+
+    def endpoint(updates):
+        # One request whose prompt lists every update; generation time grows with the answer
+        with slots:
+            calls["requests"] += 1
+            time.sleep((base_ms + per_item_ms * len(updates)) / 1000)
+        return [f"- Completed: {u[:20]}" for u in updates]
+
+    return endpoint, calls
+
+
+def run(label: str, summarize, entries: int, rate: float, calls: dict) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        started = time.perf_counter()
+        summarize(f"update {i}: finished the API, working on the dashboard, blocked on review")
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=256) as pool:
+        for i in range(entries):
+            pool.submit(one, i)
+            time.sleep(random.expovariate(rate))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    result = {
+        "label": label,
+        "throughput": entries / elapsed,
+        "p50": q[49] * 1000,
+        "p95": q[94] * 1000,
+        "p99": q[98] * 1000,
+        "requests": calls["requests"],
+    }
+    print(f"{label:28} {result['throughput']:9.1f}/s  p50 {result['p50']:8.0f} ms  p95 {result['p95']:8.0f} ms  "
+          f"p99 {result['p99']:8.0f} ms  {result['requests']:5} requests")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=50.0, help="arrivals per second")
+    parser.add_argument("--base-ms", type=float, default=400.0)
+    parser.add_argument("--per-item-ms", type=float, default=40.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    endpoint, calls = make_endpoint(args.base_ms, args.per_item_ms, args.concurrency)
+    run("one request per entry", lambda text: endpoint([text])[0], args.entries, args.rate, calls)
+
+    endpoint, calls = make_endpoint(args.base_ms, args.per_item_ms, args.concurrency)
+    batcher = MicroBatcher(endpoint, max_batch_size=args.batch_size, max_wait=args.wait_ms / 1000,
+                           max_concurrent_batches=args.concurrency)
+    run(f"micro-batched (<= {args.batch_size})", batcher, args.entries, args.rate, calls)
+    print(f"average batch size: {batcher.stats()['avg_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
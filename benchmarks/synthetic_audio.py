@@ -0,0 +1,40 @@
+"""
+Speech-like test audio shared by the audio benchmarks: two tones plus a
+little noise, gated on and off like syllables or phrases, and written out
+as 16-bit PCM WAV.
+"""
+import io
+import wave
+
+import numpy as np
+
+
+def synthesize(seconds: float, rate: int, gate_hz: float, gate_level: float,
+               lead_silence: float = 0.0, trail_silence: float = 0.0) -> np.ndarray:
+    """
+    Mono float32 audio, voiced while sin(2*pi*gate_hz*t) > gate_level, with
+    optional near-silent stretches (in seconds) at either end.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    voice = 0.25 * np.sin(2 * np.pi * 180 * t) + 0.1 * np.sin(2 * np.pi * 540 * t) + 0.02 * rng.standard_normal(t.size)
+    gate = (np.sin(2 * np.pi * gate_hz * t) > gate_level).astype(np.float32)
+    signal = (voice * gate).astype(np.float32)
+    lead, trail = int(lead_silence * rate), int(trail_silence * rate)
+    if lead:
+        signal[:lead] = 0.001 * rng.standard_normal(lead)
+    if trail:
+        signal[-trail:] = 0.001 * rng.standard_normal(trail)
+    return signal
+
+
+def to_wav(signal: np.ndarray, rate: int) -> bytes:
+    """Encodes (frames,) or (frames, channels) float audio as 16-bit PCM WAV."""
+    frames = signal.reshape(len(signal), -1)
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(frames.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.clip(frames, -1, 1) * 32767).astype("<i2").tobytes())
+    return out.getvalue()
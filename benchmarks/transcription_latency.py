@@ -0,0 +1,111 @@
+"""
+End-to-end transcription latency for 1-, 5- and 15-minute recordings
+(transcription.py).
+
+The input is --input (a WAV file, tiled/truncated to each duration) or, by
+default, synthesized speech-like audio with short pauses. For the local
+backend the silence-split step is timed separately, and --workers can be
+given several times to compare sequential and parallel segment decoding.
+The remote backend needs HF_TOKEN and hits the hosted Whisper model, so
+results include network and cold-start time. The local backend needs the
+optional `faster-whisper` package.
+
+    python benchmarks/transcription_latency.py --backend local --workers 1 --workers 4
+    python benchmarks/transcription_latency.py --backend remote --minutes 1 --minutes 5
+"""
+import argparse
+import importlib.util
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import audio_processing as ap  # noqa: E402
+from audio_io import AudioBuffer  # noqa: E402
+from http_client import ProviderClient  # noqa: E402
+from transcription import LocalWhisperBackend, RemoteWhisperBackend  # noqa: E402
+import synthetic_audio  # noqa: E402
+
+WHISPER_URL = "https://api-inference.huggingface.co/models/openai/whisper-large-v2"
+
+
+def load_signal(path: str, seconds: float) -> np.ndarray:
+    if not path:
+        # ~3 s phrases separated by ~0.6 s pauses
+        return synthetic_audio.synthesize(seconds, ap.TARGET_SAMPLE_RATE, gate_hz=1 / 3.6, gate_level=-0.55)
+    with open(path, "rb") as f:
+        samples, rate = ap.decode_wav(f.read())
+    signal = ap.resample(ap.to_mono(samples), rate)
+    needed = int(seconds * ap.TARGET_SAMPLE_RATE)
+    return np.tile(signal, -(-needed // signal.size))[:needed]
+
+
+def to_buffer(signal: np.ndarray) -> AudioBuffer:
+    return AudioBuffer.from_bytes(synthetic_audio.to_wav(signal, ap.TARGET_SAMPLE_RATE))
+
+
+def run_local(audio: AudioBuffer, seconds: float, args):
+    if importlib.util.find_spec("faster_whisper") is None:
+        segments = LocalWhisperBackend(segment_seconds=args.segment_seconds).segments(audio)
+        print(f"{seconds / 60:6.0f} {'local':8} {'-':>7} {len(segments):8}  (faster-whisper is not installed; only the split was run)")
+        return
+    for workers in args.workers or [LocalWhisperBackend().workers]:
+        backend = LocalWhisperBackend(model_size=args.model, workers=workers, segment_seconds=args.segment_seconds)
+        try:
+            # Start the workers (and load the model) before timing
+            list(backend.pool.map(int, range(workers * 2)))
+            started = perf_counter()
+            segments = backend.segments(audio)
+            t_split = perf_counter() - started
+            started = perf_counter()
+            text = backend.transcribe(audio)
+            total = perf_counter() - started
+        finally:
+            backend.close()
+        print(f"{seconds / 60:6.0f} {'local':8} {workers:7} {len(segments):8} {t_split * 1000:10.1f} {total:9.2f} {total / seconds:7.3f} {len(text):7}")
+
+
+def run_remote(audio: AudioBuffer, seconds: float, args):
+    client = ProviderClient("huggingface", headers={"Authorization": f"Bearer {os.getenv('HF_TOKEN', '')}"}, timeout=600, max_retries=0)
+    backend = RemoteWhisperBackend(client, WHISPER_URL)
+    try:
+        started = perf_counter()
+        try:
+            text = backend.transcribe(audio)
+        except Exception as e:
+            text = ""
+            print(f"  remote call failed: {e}")
+        total = perf_counter() - started
+    finally:
+        client.close()
+    print(f"{seconds / 60:6.0f} {'remote':8} {'-':>7} {1:8} {0.0:10.1f} {total:9.2f} {total / seconds:7.3f} {len(text):7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "remote"], default="local")
+    parser.add_argument("--minutes", type=float, action="append", help="input lengths (default 1, 5, 15)")
+    parser.add_argument("--input", default="", help="WAV file to tile to each length (default: synthetic)")
+    parser.add_argument("--workers", type=int, action="append", help="local process-pool sizes to compare")
+    parser.add_argument("--model", default=os.getenv("LOCAL_WHISPER_MODEL", "base"))
+    parser.add_argument("--segment-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(f"{'min':>6} {'backend':8} {'workers':>7} {'segments':>8} {'split ms':>10} {'total s':>9} {'RTF':>7} {'chars':>7}")
+    for minutes in args.minutes or [1, 5, 15]:
+        seconds = minutes * 60
+        audio = to_buffer(load_signal(args.input, seconds))
+        try:
+            if args.backend == "local":
+                run_local(audio, seconds, args)
+            else:
+                run_remote(audio, seconds, args)
+        finally:
+            audio.close()
+
+
+if __name__ == "__main__":
+    main()
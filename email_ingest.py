@@ -0,0 +1,81 @@
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from utils import IMAP_FOLDER, IMAP_PASSWORD, IMAP_SERVER, IMAP_USERNAME, ingest_mailbox
+
+# --- Email Reply Ingestion ---
+# One long-lived IMAP connection per process. After catching up from the UID
+# checkpoint it sits in IDLE, so the server pushes new mail and replies are
+# logged within seconds. IDLE is re-issued every EMAIL_IDLE_TIMEOUT seconds
+# (servers drop idle sessions after ~30 min), which doubles as a safety poll.
+# Every API process runs one, but only the holder of the ingest lease
+# (utils.acquire_ingest_lease) fetches and summarizes on a wake-up; the
+# others skip it. The compare-and-set on the checkpoint
+# (utils.save_ingest_checkpoint) still lets only one store each batch.
+EMAIL_IDLE_TIMEOUT = float(os.getenv("EMAIL_IDLE_TIMEOUT", "300"))
+EMAIL_RECONNECT_MAX_SECONDS = float(os.getenv("EMAIL_RECONNECT_MAX_SECONDS", "300"))
+
+class EmailIngestWorker:
+    def __init__(self, idle_timeout: float = EMAIL_IDLE_TIMEOUT, reconnect_max: float = EMAIL_RECONNECT_MAX_SECONDS):
+        self.idle_timeout = idle_timeout
+        self.reconnect_max = reconnect_max
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.entries = 0
+        self.last_ingest_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(IMAP_SERVER and IMAP_USERNAME and IMAP_PASSWORD)
+
+    def start(self):
+        if not self.enabled:
+            print("IMAP credentials are not set. Email ingestion worker not started.")
+            return
+        self._thread = threading.Thread(target=self._run, name="email-ingest-idle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # The IDLE wait returns within idle_timeout; the thread is a daemon, so do not block shutdown on it
+        self._stop.set()
+
+    def _ingest(self, mailbox):
+        created = ingest_mailbox(mailbox)
+        self.entries += created
+        self.last_ingest_at = datetime.utcnow()
+
+    def _run(self):
+        from imap_tools.mailbox import MailBox
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                with MailBox(IMAP_SERVER).login(IMAP_USERNAME, IMAP_PASSWORD, IMAP_FOLDER) as mailbox:
+                    self.connected = True
+                    delay = 1.0
+                    print("Email ingestion worker connected; waiting for new mail.")
+                    self._ingest(mailbox)
+                    while not self._stop.is_set():
+                        mailbox.idle.wait(timeout=self.idle_timeout)
+                        self._ingest(mailbox)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Email ingestion error: {e}. Reconnecting in {delay:.0f}s")
+            finally:
+                self.connected = False
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.reconnect_max)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "entries": self.entries,
+            "last_ingest_at": self.last_ingest_at.isoformat() if self.last_ingest_at else None,
+            "last_error": self.last_error,
+        }
+
+worker = EmailIngestWorker()
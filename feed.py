@@ -0,0 +1,279 @@
+import os
+import json
+import queue
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from metrics import counter, register_collector
+
+load_dotenv()
+
+# --- Live Team Feed ---
+# Entry changes are pushed to subscribed clients over Server-Sent Events
+# instead of clients polling /api/dashboard. Writers queue events on their
+# session and they are published after commit (utils.queue_feed_event). A
+# broker carries them to every API worker. Each worker's FeedHub then hands
+# them to its subscribers of that team.
+#
+#   local     in-process only: right for a single uvicorn worker
+#   postgres  LISTEN/NOTIFY on the app database: works across workers and
+#             hosts with no extra service (uses asyncpg, already required)
+FEED_BROKER = os.getenv("FEED_BROKER", "local")
+FEED_SUBSCRIBER_BUFFER = int(os.getenv("FEED_SUBSCRIBER_BUFFER", "100"))
+FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+# Streams end after this long and the client reconnects (SSE retry). This
+# keeps a shutdown or deploy from waiting on idle clients, and reconnects
+# spread subscribers over the current workers.
+FEED_MAX_STREAM_SECONDS = float(os.getenv("FEED_MAX_STREAM_SECONDS", "300"))
+FEED_CHANNEL = "remotesync_feed"
+# NOTIFY payloads are capped at 8000 bytes; larger events go out without the summary
+MAX_NOTIFY_BYTES = 7900
+
+feed_events = counter("remotesync_feed_events_total", "Feed events, by stage (published, delivered, dropped).", ("stage",))
+
+class LocalBroker:
+    """Delivers published events straight to this process's hub."""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[dict], None]] = None
+
+    async def start(self, deliver: Callable[[dict], None]):
+        self._deliver = deliver
+
+    def publish(self, events: List[dict]):
+        deliver = self._deliver
+        if deliver is None:
+            return  # no API running in this process, so nobody is subscribed
+        for event in events:
+            deliver(event)
+
+    async def stop(self):
+        self._deliver = None
+
+class PostgresBroker:
+    """
+    Publishes with NOTIFY from a sender thread, so writers never wait on it,
+    and receives on one LISTEN connection per worker, reconnecting with backoff.
+    """
+    QUEUE_LIMIT = 10000
+
+    def __init__(self, database_url: str, channel: str = FEED_CHANNEL):
+        from sqlalchemy.engine import make_url
+        self.database_url = database_url
+        # asyncpg takes a plain libpq-style URL
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._outbox: "queue.Queue[dict]" = queue.Queue(maxsize=self.QUEUE_LIMIT)
+        self._sender: Optional[threading.Thread] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def publish(self, events: List[dict]):
+        if self._sender is None:
+            with self._lock:
+                if self._sender is None:
+                    self._sender = threading.Thread(target=self._send_loop, name="feed-notify", daemon=True)
+                    self._sender.start()
+        for event in events:
+            try:
+                self._outbox.put_nowait(event)
+            except queue.Full:
+                feed_events.inc(stage="dropped")
+
+    def _payload(self, event: dict) -> str:
+        payload = json.dumps(event, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            entry = {**event.get("entry", {}), "summary": None, "truncated": True}
+            payload = json.dumps({**event, "entry": entry}, default=str)
+        return payload
+
+    def _send_loop(self):
+        from sqlalchemy import create_engine, text
+        engine = create_engine(self.database_url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        notify = text("SELECT pg_notify(:channel, :payload)")
+        while True:
+            batch = [self._outbox.get()]
+            while len(batch) < 100 and not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            try:
+                with engine.begin() as conn:
+                    for event in batch:
+                        conn.execute(notify, {"channel": self.channel, "payload": self._payload(event)})
+            except Exception as e:
+                feed_events.inc(len(batch), stage="dropped")
+                print(f"Error publishing {len(batch)} feed events: {e}")
+
+    async def start(self, deliver: Callable[[dict], None]):
+        self._listener = asyncio.create_task(self._listen(deliver))
+
+    async def _listen(self, deliver: Callable[[dict], None]):
+        import asyncpg
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, lambda _conn, _pid, _channel, payload: deliver(json.loads(payload)))
+                print(f"Feed listening on '{self.channel}'.")
+                delay = 1.0
+                await lost.wait()
+                print("Feed LISTEN connection lost.")
+            except asyncio.CancelledError:
+                if conn is not None:
+                    await conn.close()
+                raise
+            except Exception as e:
+                print(f"Feed LISTEN error: {e}. Reconnecting in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+BROKERS: Dict[str, Callable[[], object]] = {
+    "local": LocalBroker,
+    "postgres": lambda: PostgresBroker(os.getenv("DATABASE_URL")),
+}
+
+class Subscriber:
+    """One open feed connection. Its buffer is bounded: a client that falls behind gets a 'resync' event instead."""
+
+    def __init__(self, team_id: str, buffer: int):
+        self.team_id = team_id
+        self.queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue(maxsize=buffer)
+        self.dropped = 0
+
+    def offer(self, event: Optional[dict]):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop what the client has not read yet; it refetches the dashboard instead
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += dropped
+            feed_events.inc(dropped, stage="dropped")
+            self.queue.put_nowait({"type": "resync", "team_id": self.team_id})
+            if event is None and not self.queue.full():
+                self.queue.put_nowait(None)  # shutdown still ends the stream
+
+class FeedHub:
+    """
+    Fans events out to this process's subscribers. publish() may be called
+    from any thread; everything else runs on the event loop.
+    """
+
+    def __init__(self, broker_name: str = FEED_BROKER, buffer: int = FEED_SUBSCRIBER_BUFFER):
+        if broker_name not in BROKERS:
+            raise ValueError(f"Unknown FEED_BROKER '{broker_name}' (expected one of {', '.join(BROKERS)}).")
+        self.broker_name = broker_name
+        self.buffer = buffer
+        self._broker = None
+        self._broker_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+
+    @property
+    def broker(self):
+        # Built on first use, so importing this module opens no connections
+        if self._broker is None:
+            with self._broker_lock:
+                if self._broker is None:
+                    self._broker = BROKERS[self.broker_name]()
+        return self._broker
+
+    def publish(self, events: List[dict]):
+        feed_events.inc(len(events), stage="published")
+        self.broker.publish(events)
+
+    def _deliver_threadsafe(self, event: dict):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: dict):
+        for subscriber in list(self._subscribers.get(event.get("team_id"), ())):
+            subscriber.offer(event)
+            feed_events.inc(stage="delivered")
+
+    def subscribe(self, team_id: str) -> Subscriber:
+        subscriber = Subscriber(team_id, self.buffer)
+        self._subscribers.setdefault(team_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.team_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.team_id]
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._deliver_threadsafe)
+
+    async def stop(self):
+        await self.broker.stop()
+        # Ends every open stream so shutdown does not wait on idle clients
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                subscriber.offer(None)
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "broker": self.broker_name,
+            "teams": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+    def samples(self):
+        yield ("remotesync_feed_subscribers", "gauge", "Open live feed connections in this worker.", {}, self.stats()["subscribers"])
+
+hub = FeedHub()
+register_collector(hub.samples)
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+async def stream(
+    team_id: str,
+    prepare: Callable[[dict], Awaitable[dict]],
+    heartbeat: float = FEED_HEARTBEAT_SECONDS,
+    max_seconds: float = FEED_MAX_STREAM_SECONDS,
+):
+    """
+    The SSE body for one client of `team_id`. `prepare` enriches each event
+    (e.g. with user info) before it is sent. Comment lines keep idle
+    connections open through proxies.
+    """
+    subscriber = hub.subscribe(team_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            yield format_sse(await prepare(event))
+    finally:
+        hub.unsubscribe(subscriber)
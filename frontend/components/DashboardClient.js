@@ -1,25 +1,215 @@
 'use client';
 
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
+import { useAuth } from '@clerk/nextjs';
 import TeamSelector from './TeamSelector';
 import StandupFeed from './StandupFeed';
 import SubmissionForm from './SubmissionForm';
 
+// The API pages the feed newest first; `next_cursor` fetches the page after it.
+const PAGE_SIZE = 20;
+// Entries are processed in the background. Changes arrive on the team's
+// live feed (/api/teams/{id}/feed); if the stream keeps failing, unsettled
+// cards are polled from /api/entries/{id}/status and the first page is
+// refetched instead.
+const SETTLED = ['completed', 'failed'];
+const STATUS_POLL_MS = 3000;
+const FEED_POLL_MS = 30000;
+const FEED_RETRY_MS = 5000;
+const FEED_MAX_FAILURES = 3;
+
+async function fetchFeedPage(teamId, cursor, getToken) {
+  const token = await getToken();
+  const params = new URLSearchParams({ team_id: teamId, limit: String(PAGE_SIZE) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`/api/dashboard?${params}`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  });
+  if (!response.ok) {
+    const errData = await response.json();
+    throw new Error(errData.detail || 'Failed to fetch updates.');
+  }
+  return response.json();
+}
+
+async function fetchEntryStatus(entryId, getToken) {
+  const token = await getToken();
+  const response = await fetch(`/api/entries/${entryId}/status`, {
+    headers: { 'Authorization': `Bearer ${token}` }
+  });
+  if (!response.ok) throw new Error('Failed to fetch entry status.');
+  return response.json();
+}
+
+function updateEntry(feeds, teamId, entryId, changes) {
+  const feed = feeds[teamId];
+  if (!feed || !feed.entries.some(entry => entry.id === entryId)) return feeds;
+  const entries = feed.entries.map(entry => (entry.id === entryId ? { ...entry, ...changes } : entry));
+  return { ...feeds, [teamId]: { ...feed, entries } };
+}
+
+function addEntry(feeds, teamId, newEntry) {
+  const feed = feeds[teamId];
+  // A team's feed is filled by its first page; the form and the stream both report new entries
+  if (!feed || feed.entries.some(entry => entry.id === newEntry.id)) return feeds;
+  return { ...feeds, [teamId]: { ...feed, entries: [newEntry, ...feed.entries] } };
+}
+
+function initialFeeds(initialData) {
+  // With a single team, the initial (all teams) page is that team's first page
+  const teams = initialData.teams || [];
+  if (teams.length !== 1) return {};
+  return { [teams[0].id]: { entries: initialData.entries || [], nextCursor: initialData.next_cursor || null } };
+}
+
 export default function DashboardClient({ initialData }) {
+  const { getToken } = useAuth();
   const [teams, setTeams] = useState(initialData.teams || []);
-  const [entries, setEntries] = useState(initialData.entries || []);
+  // Loaded pages per team: { [teamId]: { entries, nextCursor } }
+  const [feeds, setFeeds] = useState(() => initialFeeds(initialData));
   const [selectedTeamId, setSelectedTeamId] = useState(teams.length > 0 ? teams[0].id : null);
+  const [isLoading, setIsLoading] = useState(false);
+  const [error, setError] = useState(null);
+  // 'connecting' | 'live' | 'failed'; polling only runs once the stream has failed
+  const [streamState, setStreamState] = useState('connecting');
+
+  const loadPage = async (teamId, cursor) => {
+    setIsLoading(true);
+    setError(null);
+    try {
+      const data = await fetchFeedPage(teamId, cursor, getToken);
+      setFeeds(current => {
+        const loaded = cursor && current[teamId] ? current[teamId].entries : [];
+        return { ...current, [teamId]: { entries: [...loaded, ...data.entries], nextCursor: data.next_cursor } };
+      });
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  useEffect(() => {
+    // A team's first page is fetched the first time it is selected
+    if (selectedTeamId && !feeds[selectedTeamId]) {
+      loadPage(selectedTeamId, null);
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedTeamId]);
 
   const handleTeamChange = (teamId) => {
     setSelectedTeamId(teamId);
   };
-  
+
   const onNewEntry = (newEntry) => {
-    // Add the new entry to the top of the feed for immediate feedback
-    setEntries([newEntry, ...entries]);
+    // Add the new entry to the top of its team's feed for immediate feedback
+    setFeeds(current => addEntry(current, newEntry.team_id, newEntry));
   };
 
-  const filteredEntries = entries.filter(entry => entry.team_id === selectedTeamId);
+  useEffect(() => {
+    // Live feed for the selected team. EventSource cannot send headers, so
+    // the token goes in the URL; it expires quickly, so every reconnect is
+    // made here with a fresh one rather than by the browser.
+    if (!selectedTeamId) return undefined;
+    const teamId = selectedTeamId;
+    let source = null;
+    let retry = null;
+    let stopped = false;
+    let opened = false;
+    let failures = 0;
+
+    const refreshEntry = async (entry) => {
+      // Large events can arrive without their summary
+      if (!entry.truncated) {
+        setFeeds(current => updateEntry(current, teamId, entry.id, entry));
+        return;
+      }
+      try {
+        const { processing_status, processing_error, summary, audio_url } = await fetchEntryStatus(entry.id, getToken);
+        setFeeds(current => updateEntry(current, teamId, entry.id, { processing_status, processing_error, summary, audio_url }));
+      } catch (err) {
+        // Picked up by the next resync
+      }
+    };
+
+    const connect = async () => {
+      let token = '';
+      try {
+        token = await getToken();
+      } catch (err) {
+        // The stream is refused and retried below
+      }
+      if (stopped) return;
+      source = new EventSource(`/api/teams/${teamId}/feed?token=${encodeURIComponent(token || '')}`);
+      source.onopen = () => {
+        failures = 0;
+        setStreamState('live');
+        // Events sent while disconnected were missed
+        if (opened) loadPage(teamId, null);
+        opened = true;
+      };
+      source.addEventListener('entry.created', (event) => {
+        const { entry } = JSON.parse(event.data);
+        setFeeds(current => addEntry(current, teamId, entry));
+      });
+      source.addEventListener('entry.updated', (event) => {
+        refreshEntry(JSON.parse(event.data).entry);
+      });
+      source.addEventListener('resync', () => loadPage(teamId, null));
+      source.onerror = () => {
+        // Also fires when the server ends the stream after a few minutes
+        source.close();
+        failures += 1;
+        setStreamState(failures >= FEED_MAX_FAILURES ? 'failed' : 'connecting');
+        retry = setTimeout(connect, failures >= FEED_MAX_FAILURES ? FEED_POLL_MS : FEED_RETRY_MS);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      if (source) source.close();
+      setStreamState('connecting');
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedTeamId]);
+
+  useEffect(() => {
+    // Without the stream, new entries from teammates show up by refetching the first page
+    if (!selectedTeamId || streamState !== 'failed') return undefined;
+    const teamId = selectedTeamId;
+    const timer = setInterval(() => loadPage(teamId, null), FEED_POLL_MS);
+    return () => clearInterval(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedTeamId, streamState]);
+
+  const feed = feeds[selectedTeamId];
+  const pendingIds = (feed ? feed.entries : [])
+    .filter(entry => entry.processing_status && !SETTLED.includes(entry.processing_status))
+    .map(entry => entry.id)
+    .join(',');
+
+  useEffect(() => {
+    // Without the stream, poll the selected team's unsettled entries until they complete or fail
+    if (!pendingIds || streamState !== 'failed') return undefined;
+    const teamId = selectedTeamId;
+    const timer = setInterval(() => {
+      pendingIds.split(',').forEach(async (id) => {
+        try {
+          const status = await fetchEntryStatus(id, getToken);
+          if (SETTLED.includes(status.processing_status)) {
+            const { processing_status, processing_error, summary, audio_url } = status;
+            setFeeds(current => updateEntry(current, teamId, Number(id), { processing_status, processing_error, summary, audio_url }));
+          }
+        } catch (err) {
+          // Transient; tried again on the next tick
+        }
+      });
+    }, STATUS_POLL_MS);
+    return () => clearInterval(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedTeamId, pendingIds, streamState]);
 
   return (
     <div className="container mx-auto p-4 md:p-8 grid grid-cols-1 lg:grid-cols-3 gap-8">
@@ -27,18 +217,29 @@ export default function DashboardClient({ initialData }) {
         <div className="flex justify-between items-center mb-6">
             <h1 className="text-3xl font-bold text-gray-800">Dashboard</h1>
             {teams.length > 1 && (
-                <TeamSelector 
-                    teams={teams} 
-                    selectedTeamId={selectedTeamId} 
-                    onTeamChange={handleTeamChange} 
+                <TeamSelector
+                    teams={teams}
+                    selectedTeamId={selectedTeamId}
+                    onTeamChange={handleTeamChange}
                 />
             )}
         </div>
-        <StandupFeed entries={filteredEntries} />
+        {feed ? <StandupFeed entries={feed.entries} /> : isLoading && <p>Loading updates...</p>}
+        {error && <p className="text-red-500 mt-4">{error}</p>}
+        {feed && feed.nextCursor && (
+          <button
+            type="button"
+            onClick={() => loadPage(selectedTeamId, feed.nextCursor)}
+            disabled={isLoading}
+            className="w-full bg-white text-gray-700 p-3 rounded-md shadow hover:bg-gray-50 disabled:text-gray-400"
+          >
+            {isLoading ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
       <div className="lg:col-span-1">
         <SubmissionForm selectedTeamId={selectedTeamId} onNewEntry={onNewEntry} />
       </div>
     </div>
   );
-} 
\ No newline at end of file
+}
\ No newline at end of file
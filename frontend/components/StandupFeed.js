@@ -1,8 +1,15 @@
 'use client';
 
 function StandupCard({ entry }) {
-    const { user_info, summary, created_at } = entry;
+    // Entries just submitted have no user_info until the feed reloads
+    const { user_info = {}, summary, created_at, processing_status, processing_error } = entry;
     const date = new Date(created_at).toLocaleString();
+    let body = <p>{summary}</p>;
+    if (processing_status === 'failed') {
+        body = <p className="text-red-500">{processing_error || 'This update could not be processed.'}</p>;
+    } else if (processing_status && processing_status !== 'completed') {
+        body = <p className="text-gray-500 italic">Processing your update...</p>;
+    }
 
     return (
         <div className="bg-white p-4 rounded-lg shadow mb-4">
@@ -18,7 +25,7 @@ function StandupCard({ entry }) {
                 </div>
             </div>
             <div className="prose prose-sm max-w-none">
-                <p>{summary}</p>
+                {body}
             </div>
         </div>
     );
@@ -0,0 +1,155 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+
+from metrics import counter, span
+
+# --- Outbound HTTP ---
+# One ProviderClient per external API (Hugging Face, Resend, ...). Each keeps
+# its own keep-alive connection pool, timeout, concurrency cap and retry
+# policy. Worker threads use the sync calls; code on the event loop (the
+# Clerk JWKS refresh in auth.py) uses arequest/aget, whose client is only
+# created on first use.
+RETRY_STATUSES = {429, 503}
+MAX_BACKOFF_SECONDS = float(os.getenv("HTTP_MAX_BACKOFF_SECONDS", "30"))
+
+provider_responses = counter("remotesync_provider_responses_total", "Responses from external APIs, by provider and status (retries included).", ("provider", "status"))
+
+class ProviderClient:
+    def __init__(
+        self,
+        name: str,
+        base_url: str = "",
+        headers: Optional[dict] = None,
+        timeout: float = 30.0,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(base_url=self.base_url, headers=self.headers, timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers, timeout=self.timeout, limits=self.limits)
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        delay = self.backoff * (2 ** attempt)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            elif response.status_code == 503:
+                # Hugging Face reports how long a cold model needs to load
+                try:
+                    delay = max(delay, float(response.json().get("estimated_time", 0)))
+                except Exception:
+                    pass
+        return min(delay, MAX_BACKOFF_SECONDS) * random.uniform(0.8, 1.2)
+
+    def _should_retry(self, attempt: int, response: Optional[httpx.Response]) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in RETRY_STATUSES
+
+    @staticmethod
+    def _rewind(kwargs: dict):
+        # File uploads are consumed by each attempt; start retries from the top
+        for value in (kwargs.get("files") or {}).values():
+            fileobj = value[1] if isinstance(value, tuple) else value
+            if hasattr(fileobj, "seek"):
+                fileobj.seek(0)
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = None
+            if attempt:
+                self._rewind(kwargs)
+            try:
+                with self._slots, span(f"{self.name}.request"):
+                    response = self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # The request never reached the server, so retrying cannot duplicate it
+                provider_responses.inc(provider=self.name, status="connect_error")
+                if not self._should_retry(attempt, None):
+                    raise
+            if response is not None:
+                provider_responses.inc(provider=self.name, status=response.status_code)
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+            delay = self._retry_delay(attempt, response)
+            print(f"[{self.name}] {method} {url} failed ({response.status_code if response is not None else 'connect error'}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.async_client
+        attempt = 0
+        while True:
+            response = None
+            if attempt:
+                self._rewind(kwargs)
+            try:
+                async with self._async_slots:
+                    with span(f"{self.name}.request"):
+                        response = await client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                provider_responses.inc(provider=self.name, status="connect_error")
+                if not self._should_retry(attempt, None):
+                    raise
+            if response is not None:
+                provider_responses.inc(provider=self.name, status=response.status_code)
+            if response is not None and not self._should_retry(attempt, response):
+                return response
+            delay = self._retry_delay(attempt, response)
+            print(f"[{self.name}] {method} {url} failed ({response.status_code if response is not None else 'connect error'}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
@@ -1,29 +1,61 @@
 import os
-from fastapi import FastAPI, UploadFile, Form, Depends, HTTPException, Request
+import secrets
+import anyio
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.executors.pool import ThreadPoolExecutor as JobThreadPool
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES
 from typing import Optional
 from datetime import datetime
+from time import perf_counter
 
 # Import from our refactored, centralized modules
 from models import User, TeamCreate, TeamInvite, AcceptInvite, TeamSettingsUpdate
-from auth import get_current_user
+from auth import get_current_user, get_stream_user, jwks, cache_stats as auth_cache_stats
+from metrics import counter, histogram, register_collector, render_prometheus
 from utils import (
-    summarize_text, 
     log_to_db, 
-    upload_audio_to_supabase,
     create_team_in_db, 
     invite_users_to_team, 
     process_daily_reminders, 
-    get_dashboard_data,
+    dashboard_etag,
+    get_cached_dashboard,
+    dashboard_cache,
     accept_invite,
-    run_scheduled_jobs,
+    run_due_reports,
     update_team_settings_in_db,
     remove_member_from_team,
-    get_team_members
+    members_etag,
+    get_cached_team_members,
+    members_cache,
+    is_team_member,
+    EntryExport,
+    ExportBusy,
+    with_user_info,
+    get_entry_status,
+    get_entry_detail,
+    update_entry_processing,
+    profile_cache,
+    inference_cache_summary,
+    summary_batcher,
+    summary_router,
+    huggingface,
+    resend,
+    report_executor,
+    transcriber,
+    EMAIL_INGEST_MODE,
+    pool_summary,
+    init_schema,
+    dispose_async_engine,
 )
+from audio_io import AudioTooLarge, InvalidForm, read_entry_form
+import pipeline
+import email_ingest
+import feed
 
 load_dotenv()
 
@@ -43,41 +75,104 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Request Metrics ---
+# Plain ASGI middleware (no per-request task or body buffering). Requests are
+# labelled with the route template, e.g. /api/entries/{entry_id}/status.
+http_request_seconds = histogram("remotesync_http_request_seconds", "API request duration, by method, route and status.", ("method", "route", "status"))
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                perf_counter() - started,
+                method=scope["method"], route=getattr(route, "path", "unmatched"), status=status["code"],
+            )
+
+app.add_middleware(RequestMetricsMiddleware)
+
 # --- API Endpoints ---
-@app.post("/api/entry", status_code=201)
-async def create_entry(
-    team_id: str = Form(...),
-    text: Optional[str] = Form(None),
-    audio: Optional[UploadFile] = None,
-    current_user: User = Depends(get_current_user)
-):
-    if not text and not audio:
-        raise HTTPException(status_code=400, detail="Either text or an audio file is required.")
+# Handlers that only touch the database are async and use the async engine
+# (`fn.aio`). The rest still call sync Clerk/Resend clients and run on the
+# threadpool, sized here (Starlette's default is 40).
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "40"))
 
-    audio_url, summary = None, ""
-    text_content = "" # Ensure text_content is always a string
+@app.post("/api/entry", status_code=202)
+async def create_entry(request: Request, current_user: User = Depends(get_current_user)):
+    """
+    Multipart form: `team_id`, and `text` and/or an `audio` file. Saves the raw
+    entry and hands transcription/summarization to the background pipeline.
+    Poll /api/entries/{job_id}/status for progress.
+    """
+    # Parsed off the body as it arrives, so an oversized recording is refused
+    # without being stored first (see audio_io.read_entry_form)
+    try:
+        fields, audio_buffer = await read_entry_form(
+            request.stream(), request.headers.get("content-type"), request.headers.get("content-length"),
+        )
+    except AudioTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidForm as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if audio:
-        audio_bytes = await audio.read()
+    team_id, text = fields.get("team_id"), fields.get("text")
+    if not team_id or (not text and not audio_buffer):
+        if audio_buffer is not None:
+            audio_buffer.close()
+        detail = "team_id is required." if not team_id else "Either text or an audio file is required."
+        raise HTTPException(status_code=400, detail=detail)
+
+    filename = None
+    if audio_buffer is not None:
         filename = f"{current_user.id}_{team_id}_{int(datetime.utcnow().timestamp())}.wav"
-        audio_url = upload_audio_to_supabase(audio_bytes, filename)
-        
-        transcription = summarize_text(audio_bytes, is_audio=True)
-        text_content = str(transcription)
-        summary = str(summarize_text(text_content, summarize=True) or "Summary could not be generated.")
-    elif text:
-        text_content = text
-        summary = str(summarize_text(text_content, summarize=True) or "Summary could not be generated.")
-
-    entry = log_to_db(current_user.id, text_content, summary, audio_url, team_id)
-    # Assuming log_to_db returns a SQLAlchemy model, we convert it to a dict
+
+    # An audio entry's text is its transcript, stored once transcribed; until
+    # then the text stays empty (recover_stalled_entries relies on this)
+    entry = await log_to_db.aio(current_user.id, "" if audio_buffer else text, "", None, team_id, processing_status='queued')
+    try:
+        pipeline.submit_entry(entry.id, text=text, audio=audio_buffer, filename=filename)
+    except pipeline.PipelineFull as e:
+        if audio_buffer is not None:
+            audio_buffer.close()
+        await update_entry_processing.aio(entry.id, 'failed', processing_error=str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+
     entry_dict = {c.name: getattr(entry, c.name) for c in entry.__table__.columns}
-    return {"status": "success", "entry": entry_dict, "summary": summary}
+    return {"status": "accepted", "job_id": entry.id, "entry": entry_dict}
+
+@app.get("/api/entries/{entry_id}")
+def get_entry(entry_id: int, current_user: User = Depends(get_current_user)):
+    try:
+        return get_entry_detail(entry_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/api/entries/{entry_id}/status")
+async def get_entry_processing_status(entry_id: int, current_user: User = Depends(get_current_user)):
+    try:
+        return await get_entry_status.aio(entry_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @app.post("/api/teams", status_code=201)
-def create_team(team_data: TeamCreate, current_user: User = Depends(get_current_user)):
+async def create_team(team_data: TeamCreate, current_user: User = Depends(get_current_user)):
     try:
-        new_team = create_team_in_db(team_data, current_user.id)
+        new_team = await create_team_in_db.aio(team_data, current_user.id)
         return new_team
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create team: {e}")
@@ -91,20 +186,53 @@ def invite_to_team(team_id: str, invite_data: TeamInvite, current_user: User = D
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Conditional Requests ---
+# The dashboard and member list carry an ETag derived from per-team version
+# counters. "no-cache" makes browsers revalidate every time, so an unchanged
+# page costs one version query and a 304 with no body.
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: proxies may have added W/
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **CACHE_HEADERS})
+
 @app.get("/api/dashboard")
-def get_user_dashboard(current_user: User = Depends(get_current_user)):
+def get_user_dashboard(
+    request: Request,
+    response: Response,
+    team_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
     try:
-        return get_dashboard_data(current_user.id)
+        etag = dashboard_etag(current_user.id, team_id=team_id, cursor=cursor, limit=limit)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        data = get_cached_dashboard(etag, current_user.id, team_id=team_id, cursor=cursor, limit=limit)
+        response.headers.update({"ETag": etag, **CACHE_HEADERS})
+        return data
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch dashboard data: {e}")
 
 @app.post("/api/invites/accept", status_code=200)
-def accept_team_invite(invite_data: AcceptInvite, current_user: User = Depends(get_current_user)):
+async def accept_team_invite(invite_data: AcceptInvite, current_user: User = Depends(get_current_user)):
     """
     Endpoint for a user to accept a team invitation using a token.
     """
     try:
-        team = accept_invite(invite_data.token, current_user.id)
+        team = await accept_invite.aio(invite_data.token, current_user.id)
         # Convert the SQLAlchemy Team object to a dictionary for the response
         team_dict = {c.name: getattr(team, c.name) for c in team.__table__.columns}
         return {"status": "success", "team": team_dict}
@@ -114,13 +242,13 @@ def accept_team_invite(invite_data: AcceptInvite, current_user: User = Depends(g
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
 @app.put("/api/teams/{team_id}/settings")
-def update_team_settings(
+async def update_team_settings(
     team_id: str,
     settings_data: TeamSettingsUpdate,
     current_user: User = Depends(get_current_user)
 ):
     try:
-        updated_team = update_team_settings_in_db(team_id, settings_data, current_user.id)
+        updated_team = await update_team_settings_in_db.aio(team_id, settings_data, current_user.id)
         team_dict = {c.name: getattr(updated_team, c.name) for c in updated_team.__table__.columns}
         return {"status": "success", "team": team_dict}
     except PermissionError as e:
@@ -131,22 +259,79 @@ def update_team_settings(
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
 @app.get("/api/teams/{team_id}/members")
-def get_members_of_team(team_id: str, current_user: User = Depends(get_current_user)):
+def get_members_of_team(team_id: str, request: Request, response: Response, current_user: User = Depends(get_current_user)):
     # Optional: Add a check here to ensure the current_user is part of the team
     try:
-        members = get_team_members(team_id)
+        etag = members_etag(team_id)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        members = get_cached_team_members(etag, team_id)
+        response.headers.update({"ETag": etag, **CACHE_HEADERS})
         return members
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch members: {e}")
 
+@app.get("/api/teams/{team_id}/feed")
+async def stream_team_feed(team_id: str, current_user: User = Depends(get_stream_user)):
+    """
+    Server-Sent Events: `entry.created` / `entry.updated` (entry as in the
+    dashboard feed) and `resync` when the client fell behind and should
+    refetch /api/dashboard. EventSource cannot set headers, so the session
+    token may be passed as `?token=`. Streams close after
+    FEED_MAX_STREAM_SECONDS; reconnect with a fresh token and refetch the
+    dashboard.
+    """
+    if not await is_team_member.aio(team_id, current_user.id):
+        raise HTTPException(status_code=403, detail="You are not a member of this team.")
+
+    async def prepare(event: dict) -> dict:
+        return await anyio.to_thread.run_sync(with_user_info, event)
+
+    return StreamingResponse(
+        feed.stream(team_id, prepare),
+        media_type="text/event-stream",
+        # Proxies (nginx) must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/teams/{team_id}/entries/export")
+async def export_team_entries(
+    team_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streams a team's entries with `since` <= created_at < `until` (UTC; both
+    optional), oldest first, as NDJSON or CSV. Every row has a `cursor`: if
+    the download breaks, repeat the request with the last complete row's
+    cursor to get the rows after it (CSV resumes without the header row).
+    """
+    if not await is_team_member.aio(team_id, current_user.id):
+        raise HTTPException(status_code=403, detail="You are not a member of this team.")
+    try:
+        export = EntryExport(team_id, format, since=since, until=until, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    filename = f"standups-{team_id}-{datetime.utcnow():%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        export,
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
 @app.delete("/api/teams/{team_id}/members/{member_id}")
-def remove_team_member(
+async def remove_team_member(
     team_id: str,
     member_id: str,
     current_user: User = Depends(get_current_user)
 ):
     try:
-        result = remove_member_from_team(team_id, member_id, current_user.id)
+        result = await remove_member_from_team.aio(team_id, member_id, current_user.id)
         return result
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
@@ -155,20 +340,144 @@ def remove_team_member(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {e}")
 
+# --- Internal Endpoints ---
+# Operational stats and /metrics are not for end users. They need
+# `Authorization: Bearer $INTERNAL_API_TOKEN` (set the same token in the
+# Prometheus scrape config) and answer 404 while it is unset.
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN", "")
+
+def require_internal_token(authorization: Optional[str] = Header(None)):
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid internal API token")
+
+@app.get("/api/internal/cache-stats", dependencies=[Depends(require_internal_token)])
+def get_cache_stats():
+    return {
+        "auth_users": auth_cache_stats(),
+        "clerk_profiles": profile_cache.stats(),
+        "dashboard_responses": dashboard_cache.stats(),
+        "members_responses": members_cache.stats(),
+        "inference": inference_cache_summary(),
+        "summary_batches": summary_batcher.stats(),
+        "summaries": summary_router.stats(),
+    }
+
+def runtime_samples():
+    """Pool, cache and summarizer counters owned by other modules, read at scrape time."""
+    for name, stats in pool_summary().items():
+        yield ("remotesync_db_connections_in_use", "gauge", "Checked-out database connections, by engine.", {"engine": name}, stats.get("in_use", 0))
+        yield ("remotesync_db_checkouts_total", "counter", "Database connection checkouts, by engine.", {"engine": name}, stats.get("checkouts", 0))
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    yield ("remotesync_threadpool_in_use", "gauge", "Threads busy running sync endpoints.", {}, limiter.borrowed_tokens)
+    for kind, stats in inference_cache_summary().items():
+        for result in ("hits", "misses"):
+            yield ("remotesync_inference_cache_lookups_total", "counter", "Inference cache lookups, by kind and result.", {"kind": kind, "result": result}, stats[result])
+    for tier, served in summary_router.stats()["served"].items():
+        yield ("remotesync_summaries_total", "counter", "Summaries served, by tier.", {"tier": tier}, served)
+
+register_collector(runtime_samples)
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+async def get_metrics():
+    # async so the collectors run on the event loop (the anyio limiter lives there)
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/internal/db-stats", dependencies=[Depends(require_internal_token)])
+async def get_db_stats():
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "pools": pool_summary(),
+        "threadpool": {"size": limiter.total_tokens, "in_use": limiter.borrowed_tokens},
+    }
+
 # --- Scheduler ---
-scheduler = AsyncIOScheduler()
+# Jobs are plain sync functions run on the scheduler's own thread pool, never
+# on the event loop. max_instances=1 skips a tick while the previous run of
+# the same job is still going; coalesce collapses missed ticks into one.
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+scheduler = AsyncIOScheduler(
+    executors={"default": JobThreadPool(SCHEDULER_WORKERS)},
+    job_defaults={"max_instances": 1, "coalesce": True},
+)
+job_runs = {}
+job_seconds = histogram("remotesync_job_seconds", "Scheduled job run duration, by job and status.", ("job", "status"))
+job_runs_total = counter("remotesync_job_runs_total", "Scheduled job runs, by job and status.", ("job", "status"))
 
-@scheduler.scheduled_job(IntervalTrigger(minutes=60))
-async def scheduled_tasks():
+def run_timed(name: str, job):
+    started = perf_counter()
+    status = "success"
+    result = None
+    try:
+        result = job()
+    except Exception as e:
+        status = "error"
+        print(f"Scheduled job {name} failed: {e}")
+    finally:
+        duration = perf_counter() - started
+        job_seconds.observe(duration, job=name, status=status)
+        job_runs_total.inc(job=name, status=status)
+        runs = job_runs.get(name, {}).get("runs", 0) + 1
+        job_runs[name] = {
+            "last_status": status, "last_finished_at": datetime.utcnow().isoformat(),
+            "last_duration_seconds": round(duration, 3), "runs": runs,
+            # per-phase / per-team timings reported by the job itself
+            "last_result": result,
+        }
+        print(f"Scheduled job {name} finished ({status}) in {duration:.2f}s")
+
+def on_job_skipped(event):
+    print(f"Skipped scheduled job {event.job_id}: previous run is still in progress.")
+
+scheduler.add_listener(on_job_skipped, EVENT_JOB_MAX_INSTANCES)
+
+@scheduler.scheduled_job(IntervalTrigger(minutes=60), id="reminders")
+def scheduled_tasks():
     print(f"[{datetime.now()}] Running scheduled jobs...")
-    run_scheduled_jobs()
+    run_timed("reminders", process_daily_reminders)
+
+# Reports are due at minute precision; each tick only queries the due teams
+@scheduler.scheduled_job(IntervalTrigger(minutes=1), id="reports")
+def scheduled_reports():
+    run_timed("reports", run_due_reports)
+
+# Requeues entries orphaned by a crash or deploy; also run once at startup
+@scheduler.scheduled_job(IntervalTrigger(minutes=5), id="entry-recovery")
+def scheduled_entry_recovery():
+    run_timed("entry-recovery", pipeline.recover_stalled_entries)
+
+@app.get("/api/internal/jobs", dependencies=[Depends(require_internal_token)])
+def get_job_runs():
+    return {**job_runs, "email_ingest": email_ingest.worker.stats(), "feed": feed.hub.stats()}
 
 @app.on_event("startup")
 async def startup_event():
+    init_schema()
+    # Fetch the signing keys now rather than on the first authenticated request
+    await jwks.start()
+    # Sync endpoints (those still calling Clerk/Resend) run on this pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    await feed.hub.start()
     scheduler.start()
+    scheduler.get_job("entry-recovery").modify(next_run_time=datetime.now())
     print("Scheduler started.")
+    if EMAIL_INGEST_MODE == "idle":
+        email_ingest.worker.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await feed.hub.stop()
     scheduler.shutdown()
-    print("Scheduler shut down.") 
\ No newline at end of file
+    report_executor.shutdown(wait=True)
+    print("Scheduler shut down.")
+    await jwks.stop()
+    email_ingest.worker.stop()
+    pipeline.shutdown(wait=True)
+    print("Entry pipeline shut down.")
+    transcriber.close()
+    summary_router.shutdown()
+    await dispose_async_engine()
+    await huggingface.aclose()
+    await resend.aclose() 
\ No newline at end of file
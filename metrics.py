@@ -0,0 +1,177 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# --- Metrics ---
+# In-process counters and latency histograms, rendered in the Prometheus text
+# format by GET /metrics. Recording is a dict lookup, a bisect and two adds
+# under a per-metric lock; nothing is exported or aggregated until a scrape.
+# Label values should stay low-cardinality (stage, provider, route, job):
+# never put user or team ids in labels.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_registry: Dict[str, "Metric"] = {}
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, dict, float]]]] = []
+_registry_lock = threading.Lock()
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self, **labels) -> Optional[dict]:
+        """Count, sum and approximate p50/p95/p99 (bucket upper bounds) for one label set."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return None
+            counts, total, count = list(state[0]), state[1], state[2]
+        bounds = self.buckets + (float("inf"),)
+        summary = {"count": count, "sum": round(total, 6)}
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            seen = 0
+            for bound, bucket_count in zip(bounds, counts):
+                seen += bucket_count
+                if seen >= q * count:
+                    summary[name] = bound
+                    break
+        return summary
+
+    def _render_value(self, key, value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+def _register(metric: Metric) -> Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+def counter(name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labels))
+
+def histogram(name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labels, buckets))
+
+def register_collector(collect: Callable[[], Iterable[Tuple[str, str, str, dict, float]]]):
+    """
+    Adds a callback that reports values owned elsewhere (pool usage, cache
+    hit counts) at scrape time, as (name, type, help, labels, value) tuples.
+    """
+    _collectors.append(collect)
+
+# --- Stage Spans ---
+stage_seconds = histogram("remotesync_stage_seconds", "Duration of each external call, DB function and pipeline stage.", ("stage",))
+stage_errors = counter("remotesync_stage_errors_total", "Stages that raised, by stage.", ("stage",))
+
+@contextmanager
+def span(stage: str):
+    """
+    Times the block into remotesync_stage_seconds{stage=...}, counting
+    exceptions as errors. Cancellation, GeneratorExit and interpreter exits
+    (BaseException) are timed but not counted.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+def render_prometheus() -> str:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    # A family's samples must be contiguous, so group collected samples by name
+    families: Dict[str, List[str]] = {}
+    for collect in _collectors:
+        try:
+            samples = list(collect())
+        except Exception as e:
+            print(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+            continue
+        for name, kind, help, labels, value in samples:
+            family = families.get(name)
+            if family is None:
+                family = families[name] = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            names = tuple(labels)
+            family.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+    for family in families.values():
+        lines.extend(family)
+    return "\n".join(lines) + "\n"
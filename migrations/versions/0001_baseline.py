@@ -0,0 +1,58 @@
+"""Baseline schema as created by the original Base.metadata.create_all()
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'teams',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('owner_id', sa.String(), nullable=False),
+        sa.Column('settings', sa.JSON()),
+        sa.Column('report_recipients', sa.JSON()),
+        sa.Column('invite_token', sa.String(), unique=True),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'team_members',
+        sa.Column('team_id', sa.String(), sa.ForeignKey('teams.id'), primary_key=True),
+        sa.Column('user_id', sa.String(), primary_key=True),
+        sa.Column('role', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'standup_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('team_id', sa.String(), sa.ForeignKey('teams.id'), nullable=False),
+        sa.Column('text', sa.String()),
+        sa.Column('summary', sa.String()),
+        sa.Column('audio_url', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_standup_entries_id', 'standup_entries', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_standup_entries_id', table_name='standup_entries')
+    op.drop_table('standup_entries')
+    op.drop_table('team_members')
+    op.drop_table('teams')
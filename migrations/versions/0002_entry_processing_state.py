@@ -0,0 +1,32 @@
+"""Add processing state to standup entries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows were processed synchronously, so they are already complete
+    op.add_column('standup_entries', sa.Column('processing_status', sa.String(), nullable=False, server_default='completed'))
+    op.add_column('standup_entries', sa.Column('processing_error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('standup_entries') as batch_op:
+        batch_op.drop_column('processing_error')
+        batch_op.drop_column('processing_status')
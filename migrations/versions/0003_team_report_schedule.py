@@ -0,0 +1,36 @@
+"""Add indexed next report times to teams
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Left NULL here; the scheduler backfills them (utils.schedule_unscheduled_teams)
+    op.add_column('teams', sa.Column('next_daily_report_at', sa.DateTime(), nullable=True))
+    op.add_column('teams', sa.Column('next_weekly_report_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_teams_next_daily_report_at', 'teams', ['next_daily_report_at'])
+    op.create_index('ix_teams_next_weekly_report_at', 'teams', ['next_weekly_report_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_teams_next_weekly_report_at', table_name='teams')
+    op.drop_index('ix_teams_next_daily_report_at', table_name='teams')
+    with op.batch_alter_table('teams') as batch_op:
+        batch_op.drop_column('next_weekly_report_at')
+        batch_op.drop_column('next_daily_report_at')
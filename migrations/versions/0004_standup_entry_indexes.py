@@ -0,0 +1,39 @@
+"""Composite indexes for the standup_entries hot queries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_standup_entries_team_created', 'standup_entries', ['team_id', 'created_at']),
+    ('ix_standup_entries_team_user_created', 'standup_entries', ['team_id', 'user_id', 'created_at']),
+    ('ix_team_members_user_id', 'team_members', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On Postgres build the indexes CONCURRENTLY so a large production table
+    # keeps taking writes; that cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,73 @@
+"""Per-team, per-day digests of completed entries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Reports look back at most 7 days, so older entries do not need digests
+BACKFILL_DAYS = 8
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    digests = op.create_table(
+        'team_daily_digests',
+        sa.Column('team_id', sa.String(), sa.ForeignKey('teams.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.Column('participants', sa.JSON()),
+        sa.Column('fragments', sa.JSON()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+
+    # Same fragment shape as utils.render_digest_fragment
+    entries = sa.table(
+        'standup_entries',
+        sa.column('id', sa.Integer()), sa.column('user_id', sa.String()), sa.column('team_id', sa.String()),
+        sa.column('summary', sa.String()), sa.column('audio_url', sa.String()),
+        sa.column('processing_status', sa.String()), sa.column('created_at', sa.DateTime()),
+    )
+    since = datetime.utcnow() - timedelta(days=BACKFILL_DAYS)
+    rows = op.get_bind().execute(
+        sa.select(entries.c.id, entries.c.user_id, entries.c.team_id, entries.c.summary, entries.c.audio_url, entries.c.created_at)
+        .where(entries.c.created_at >= since, entries.c.processing_status == 'completed')
+        .order_by(entries.c.team_id, entries.c.created_at, entries.c.id)
+    )
+    by_day = {}
+    for entry_id, user_id, team_id, summary, audio_url, created_at in rows:
+        digest = by_day.setdefault((team_id, created_at.date()), {"participants": [], "fragments": []})
+        if user_id not in digest["participants"]:
+            digest["participants"].append(user_id)
+        digest["fragments"].append({
+            "entry_id": entry_id,
+            "user_id": user_id,
+            "created_at": created_at.isoformat(),
+            "summary": summary or "",
+            "audio_url": audio_url,
+        })
+    if by_day:
+        now = datetime.utcnow()
+        op.bulk_insert(digests, [
+            {"team_id": team_id, "day": day, "entry_count": len(d["fragments"]), "participants": d["participants"],
+             "fragments": d["fragments"], "updated_at": now}
+            for (team_id, day), d in by_day.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('team_daily_digests')
@@ -0,0 +1,31 @@
+"""Per-team version counters for dashboard and member-list ETags
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('teams', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('teams', sa.Column('members_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('teams') as batch_op:
+        batch_op.drop_column('members_version')
+        batch_op.drop_column('data_version')
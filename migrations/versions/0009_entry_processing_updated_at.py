@@ -0,0 +1,38 @@
+"""Track when each entry last changed processing state
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('standup_entries', sa.Column('processing_updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE standup_entries SET processing_updated_at = created_at")
+    # Same as 0004: build it CONCURRENTLY on Postgres so the table keeps taking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_standup_entries_status_updated', 'standup_entries', ['processing_status', 'processing_updated_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_standup_entries_status_updated', table_name='standup_entries', postgresql_concurrently=True, if_exists=True)
+    with op.batch_alter_table('standup_entries') as batch_op:
+        batch_op.drop_column('processing_updated_at')
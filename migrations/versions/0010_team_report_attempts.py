@@ -0,0 +1,31 @@
+"""Count send attempts of each team's pending daily and weekly report
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('teams', sa.Column('daily_report_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('teams', sa.Column('weekly_report_attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('teams') as batch_op:
+        batch_op.drop_column('weekly_report_attempts')
+        batch_op.drop_column('daily_report_attempts')
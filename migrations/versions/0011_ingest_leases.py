@@ -0,0 +1,31 @@
+"""Lease on each ingest source, so one process reads it at a time
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingest_checkpoints', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('ingest_checkpoints', sa.Column('leased_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ingest_checkpoints') as batch_op:
+        batch_op.drop_column('leased_until')
+        batch_op.drop_column('lease_owner')
@@ -0,0 +1,153 @@
+import io
+import os
+import threading
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional
+
+from audio_io import AudioBuffer
+from metrics import span, stage_seconds
+from utils import claim_stalled_entries, summarize_text, touch_entries, upload_audio_to_supabase, update_entry_processing
+
+# --- Entry Processing Pipeline ---
+# Entries are saved by the request handler in the 'queued' state and the slow
+# work (storage upload, Whisper, Mixtral) happens here, off the request path.
+# Workers mostly wait on the network (and on summary batches), so this can be
+# well above the CPU count.
+ENTRY_WORKERS = int(os.getenv("ENTRY_WORKERS", "16"))
+ENTRY_QUEUE_LIMIT = int(os.getenv("ENTRY_QUEUE_LIMIT", "200"))
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "true").lower() == "true"
+AUDIO_STORAGE_CODEC = os.getenv("AUDIO_STORAGE_CODEC", "wav")  # 'wav' or 'flac' (needs soundfile)
+# An entry whose state has not changed for this long is treated as orphaned
+# (its process died); well above the slowest normal transcription. Live
+# processes refresh the entries they hold on every recovery run (5 min).
+ENTRY_STALE_SECONDS = float(os.getenv("ENTRY_STALE_SECONDS", "1800"))
+
+executor = ThreadPoolExecutor(max_workers=ENTRY_WORKERS, thread_name_prefix="entry-worker")
+# Storage uploads run here, alongside the transcription in the entry worker
+upload_executor = ThreadPoolExecutor(max_workers=ENTRY_WORKERS, thread_name_prefix="entry-upload")
+# Caps queued + running jobs so a burst cannot pile up unbounded audio in memory
+_slots = threading.BoundedSemaphore(ENTRY_QUEUE_LIMIT)
+# Entries queued or running in this process
+_held = set()
+_held_lock = threading.Lock()
+
+class PipelineFull(Exception):
+    """Raised when the pipeline already holds ENTRY_QUEUE_LIMIT jobs."""
+
+def prepare_audio(audio: AudioBuffer, filename: str) -> tuple:
+    """
+    Replaces a WAV upload with its 16 kHz mono, silence-trimmed version. Other
+    formats (e.g. browser webm/opus) are passed through unchanged.
+    """
+    if not AUDIO_NORMALIZE:
+        return audio, filename
+    # NumPy is only needed once the first recording arrives
+    from audio_processing import normalize_wav_stream, UnsupportedAudio
+    # Streamed block by block from the upload's spool into a new one; 16-bit
+    # mono 16 kHz is at most 4x the smallest input (8-bit 8 kHz)
+    source = audio.source()
+    normalized = AudioBuffer(max_bytes=4 * audio.size + 1024)
+    try:
+        with span("pipeline.normalize"):
+            content_type, extension = normalize_wav_stream(
+                io.BytesIO(source) if isinstance(source, bytes) else source, normalized, codec=AUDIO_STORAGE_CODEC)
+        normalized.finish()
+    except UnsupportedAudio as e:
+        print(f"Skipping audio normalization for {filename}: {e}")
+        normalized.finish().close()
+        return audio, filename
+    except Exception:
+        normalized.finish().close()
+        raise
+    finally:
+        if not isinstance(source, bytes):
+            source.close()
+    normalized.content_type = content_type
+    normalized.extension = extension
+    audio.close()
+    return normalized, os.path.splitext(filename)[0] + extension
+
+def process_entry(entry_id: int, text: Optional[str] = None, audio: Optional[AudioBuffer] = None, filename: Optional[str] = None):
+    """
+    Uploads/transcribes/summarizes a queued entry and records each stage on the
+    row. Audio upload and transcription run concurrently from the same buffer.
+    """
+    try:
+        text_content = text or ""
+        if audio is not None:
+            update_entry_processing(entry_id, 'normalizing')
+            audio, filename = prepare_audio(audio, filename)
+            update_entry_processing(entry_id, 'transcribing')
+            upload = upload_executor.submit(upload_audio_to_supabase, audio, filename)
+            try:
+                text_content = str(summarize_text(audio, is_audio=True))
+            finally:
+                # Always wait for the upload so the buffer is not released under it
+                audio_url = upload.result()
+            update_entry_processing(entry_id, 'summarizing', text=text_content, audio_url=audio_url)
+        else:
+            update_entry_processing(entry_id, 'summarizing', text=text_content)
+
+        summary = str(summarize_text(text_content, summarize=True) or "Summary could not be generated.")
+        update_entry_processing(entry_id, 'completed', summary=summary, processing_error=None)
+    except Exception as e:
+        print(f"Error processing entry {entry_id}: {e}")
+        update_entry_processing(entry_id, 'failed', processing_error=str(e))
+    finally:
+        if audio is not None:
+            audio.close()
+
+def _run(entry_id: int, text: Optional[str], audio: Optional[AudioBuffer], filename: Optional[str], submitted_at: float):
+    stage_seconds.observe(perf_counter() - submitted_at, stage="pipeline.queue_wait")
+    try:
+        with span("pipeline.entry"):
+            process_entry(entry_id, text, audio, filename)
+    finally:
+        with _held_lock:
+            _held.discard(entry_id)
+        _slots.release()
+
+def submit_entry(entry_id: int, text: Optional[str] = None, audio: Optional[AudioBuffer] = None, filename: Optional[str] = None) -> Future:
+    """
+    Queues an entry for background processing; the pipeline takes ownership of
+    `audio` and closes it when done. Raises PipelineFull when saturated.
+    """
+    if not _slots.acquire(blocking=False):
+        raise PipelineFull("Too many entries are being processed. Please retry shortly.")
+    with _held_lock:
+        _held.add(entry_id)
+    try:
+        return executor.submit(_run, entry_id, text, audio, filename, perf_counter())
+    except Exception:
+        with _held_lock:
+            _held.discard(entry_id)
+        _slots.release()
+        raise
+
+def recover_stalled_entries() -> dict:
+    """
+    Requeues entries orphaned by a crash or deploy and fails the audio ones
+    whose recording is gone (utils.claim_stalled_entries). Runs at startup
+    and then periodically, so entries of a worker that died while others kept
+    running are recovered too. Each run first marks the entries this process
+    holds as alive, so however long they wait here no process claims them.
+    """
+    with _held_lock:
+        held = list(_held)
+    touch_entries(held)
+    claimed = claim_stalled_entries(ENTRY_STALE_SECONDS, exclude=held)
+    requeued = 0
+    for entry in claimed["requeue"]:
+        try:
+            submit_entry(entry["id"], text=entry["text"])
+        except PipelineFull:
+            break  # the rest are claimed again once they are stale
+        requeued += 1
+    if requeued or claimed["failed"]:
+        print(f"Recovered stalled entries: {requeued} requeued, {claimed['failed']} failed.")
+    return {"requeued": requeued, "failed": claimed["failed"]}
+
+def shutdown(wait: bool = True):
+    executor.shutdown(wait=wait)
+    upload_executor.shutdown(wait=wait)
@@ -0,0 +1,148 @@
+import re
+import html
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# --- Report Rendering ---
+# Reports are described as data (a title, an intro, and sections of entries)
+# and rendered by small precompiled templates, one set per output format.
+# Rendering appends pieces to a list or yields them as a stream; nothing is
+# built with repeated string concatenation, and every value is escaped for
+# the target format.
+TEMPLATES: Dict[str, Dict[str, str]] = {
+    "html": {
+        "header": "<h1>{title}</h1>",
+        "intro": "<p>{intro}</p><hr>",
+        "section": "<h2>{heading}</h2>",
+        "divider": "<hr>",
+        "item": "<h3>{name}</h3><blockquote>{summary}</blockquote>",
+        "audio": "<p><a href='{audio_url}'>Listen to audio update</a></p>",
+        "item_end": "",
+        "footer": "",
+    },
+    "text": {
+        "header": "{title}\n\n",
+        "intro": "{intro}\n\n",
+        "section": "== {heading} ==\n\n",
+        "divider": "",
+        "item": "{name}\n{summary}\n",
+        "audio": "Audio: {audio_url}\n",
+        "item_end": "\n",
+        "footer": "",
+    },
+    "slack": {
+        "header": "*{title}*\n",
+        "intro": "_{intro}_\n",
+        "section": "\n*{heading}*\n",
+        "divider": "",
+        "item": "\n*{name}*\n{summary}\n",
+        "audio": "<{audio_url}|Listen to audio update>\n",
+        "item_end": "",
+        "footer": "",
+    },
+}
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+def _escape_slack(value: str) -> str:
+    # Slack mrkdwn only reserves these three characters
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def _html_summary(value: str) -> str:
+    return html.escape(value).replace("\n", "<br>")
+
+def _text_summary(value: str) -> str:
+    return "\n".join(f"  {line}" for line in value.splitlines())
+
+def _slack_summary(value: str) -> str:
+    return "\n".join(f">{line}" for line in _escape_slack(value).splitlines())
+
+# Per format: escaping for ordinary fields, and for multi-line summaries
+ESCAPERS: Dict[str, Tuple[Callable[[str], str], Callable[[str], str]]] = {
+    "html": (lambda value: html.escape(value, quote=True), _html_summary),
+    "text": (lambda value: value, _text_summary),
+    "slack": (_escape_slack, _slack_summary),
+}
+
+class CompiledTemplate:
+    """A template parsed once: its field names, and whether it has any literal text."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fields = tuple(_FIELD.findall(source))
+
+    def render_into(self, out: List[str], values: dict, escape: Callable[[str], str], summary_escape: Callable[[str], str]):
+        if not self.fields:
+            if self.source:
+                out.append(self.source)
+            return
+        escaped = {}
+        for field in self.fields:
+            value = str(values.get(field) or "")
+            escaped[field] = summary_escape(value) if field == "summary" else escape(value)
+        out.append(self.source.format_map(escaped))
+
+@lru_cache(maxsize=None)
+def get_template(fmt: str, part: str) -> CompiledTemplate:
+    if fmt not in TEMPLATES:
+        raise ValueError(f"Unknown report format '{fmt}' (expected one of {', '.join(TEMPLATES)}).")
+    return CompiledTemplate(TEMPLATES[fmt][part])
+
+class Report:
+    """
+    Renderer input: `sections` is a list of (heading or None, items), each
+    item a dict with name, summary and an optional audio_url. `divide` puts
+    a divider after every 'item' or after every 'section'.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        sections: List[Tuple[Optional[str], List[dict]]],
+        intro: Optional[str] = None,
+        show_audio: bool = True,
+        divide: str = "items",
+    ):
+        self.title = title
+        self.intro = intro
+        self.sections = sections
+        self.show_audio = show_audio
+        self.divide = divide
+
+def stream_report(report: Report, fmt: str = "html", chunk_items: int = 50) -> Iterator[str]:
+    """Yields the rendered report in chunks of about `chunk_items` entries."""
+    templates = {part: get_template(fmt, part) for part in ("header", "intro", "section", "divider", "item", "audio", "item_end", "footer")}
+    escape, summary_escape = ESCAPERS[fmt]
+    out: List[str] = []
+
+    def render(part: str, values: dict):
+        templates[part].render_into(out, values, escape, summary_escape)
+
+    render("header", {"title": report.title})
+    if report.intro:
+        render("intro", {"intro": report.intro})
+    rendered = 0
+    for heading, items in report.sections:
+        if heading is not None:
+            render("section", {"heading": heading})
+        for item in items:
+            render("item", item)
+            if report.show_audio and item.get("audio_url"):
+                render("audio", item)
+            render("item_end", item)
+            if report.divide == "items":
+                render("divider", {})
+            rendered += 1
+            if rendered % chunk_items == 0:
+                yield "".join(out)
+                out.clear()
+        if report.divide == "sections":
+            render("divider", {})
+    render("footer", {})
+    yield "".join(out)
+
+def render_report(report: Report, fmt: str = "html") -> str:
+    return "".join(stream_report(report, fmt))
+
+def render_formats(report: Report, formats: Iterable[str] = ("html", "text")) -> Dict[str, str]:
+    return {fmt: render_report(report, fmt) for fmt in formats}
@@ -0,0 +1,284 @@
+import re
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# --- Micro-batching ---
+# Callers submit one item at a time; a dispatcher thread groups whatever
+# arrives within `max_wait` seconds (up to `max_batch_size` items) into a
+# single call of `process_batch`, then routes each result back to the
+# caller's future. Used for LLM summarization so the morning peak turns into
+# a few multi-entry prompts instead of hundreds of single ones.
+class MicroBatcher:
+    def __init__(
+        self,
+        process_batch: Callable[[List], List],
+        max_batch_size: int = 8,
+        max_wait: float = 0.05,
+        max_concurrent_batches: int = 2,
+        name: str = "batcher",
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_concurrent_batches)
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_started(self):
+        if self._dispatcher is None:
+            with self._lock:
+                if self._dispatcher is None:
+                    self._dispatcher = threading.Thread(target=self._dispatch_loop, name=f"{self.name}-dispatch", daemon=True)
+                    self._dispatcher.start()
+
+    def submit(self, item) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout: Optional[float] = None):
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            # Wait for a free batch slot first so items keep accumulating
+            # (and batches grow) while all slots are busy.
+            self._slots.acquire()
+            batch = self._collect()
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list):
+        try:
+            items = [item for item, _ in batch]
+            results = self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: got {len(results)} results for {len(items)} items")
+            with self._lock:
+                self.batches += 1
+                self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+# --- Extractive Summarization ---
+# A local, network-free summarizer used as a tier next to the LLM. Sentences
+# are scored against Completed / In Progress / Blocked cue words with one
+# matrix product over a TF-IDF sentence-term matrix, and the most informative
+# sentences of each category are kept in the LLM's output format.
+SECTIONS = ("Completed", "In Progress", "Blocked")
+SECTION_CUES = {
+    "Completed": "done finished finish completed complete shipped ship merged fixed deployed released resolved closed "
+                 "wrapped implemented delivered landed launched yesterday wrote added built reviewed tested migrated",
+    "In Progress": "working work continuing continue today will plan planning next currently investigating reviewing "
+                   "started starting ongoing progress going writing implementing testing building looking tomorrow",
+    "Blocked": "blocked blocker blockers stuck waiting wait need needs issue issues problem depends dependency unable "
+               "cannot can't cant help pending access broken failing bug approval",
+}
+_CUE_INDEX = {}
+for _column, _section in enumerate(SECTIONS):
+    for _word in SECTION_CUES[_section].split():
+        _CUE_INDEX.setdefault(_word, []).append(_column)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+|\s+-\s+")
+_TOKEN = re.compile(r"[a-z][a-z']*")
+
+class ExtractiveSummarizer:
+    def __init__(self, max_sentences_per_section: int = 2, max_sentence_chars: int = 160):
+        self.max_sentences_per_section = max_sentences_per_section
+        self.max_sentence_chars = max_sentence_chars
+
+    def classify(self, sentences: List[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns (section index, salience) per sentence."""
+        import numpy as np  # imported on first use to keep API startup fast
+        tokens = [_TOKEN.findall(s.lower()) for s in sentences]
+        vocab = {}
+        rows, cols = [], []
+        for row, words in enumerate(tokens):
+            for word in words:
+                rows.append(row)
+                cols.append(vocab.setdefault(word, len(vocab)))
+        counts = np.zeros((len(sentences), max(1, len(vocab))), dtype=np.float32)
+        np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+        df = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+        tfidf = counts * idf
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        tfidf /= np.where(norms == 0, 1.0, norms)
+
+        cues = np.zeros((tfidf.shape[1], len(SECTIONS)), dtype=np.float32)
+        for word, column in vocab.items():
+            for section in _CUE_INDEX.get(word, ()):
+                cues[column, section] = 1.0
+        scores = (counts > 0).astype(np.float32) @ cues + 0.1 * (tfidf @ cues)
+        # Sentences with no cue at all default to In Progress
+        section = np.where(scores.max(axis=1) > 0, scores.argmax(axis=1), 1)
+        salience = tfidf.sum(axis=1) + scores.max(axis=1)
+        return section, salience
+
+    def summarize(self, text: str) -> str:
+        sentences = [s.strip(" -*\t") for s in _SENTENCE_SPLIT.split(text or "")]
+        sentences = [s for s in sentences if _TOKEN.search(s.lower())]
+        if not sentences:
+            return ""
+        import numpy as np
+        section, salience = self.classify(sentences)
+        lines = []
+        for index, name in enumerate(SECTIONS):
+            picked = np.flatnonzero(section == index)
+            # Most salient first, then back into the order they were written
+            picked = np.sort(picked[np.argsort(-salience[picked], kind="stable")][:self.max_sentences_per_section])
+            parts = [self._clip(sentences[i]) for i in picked]
+            lines.append(f"- {name}: {'; '.join(parts) if parts else 'None'}")
+        return "\n".join(lines)
+
+    def _clip(self, sentence: str) -> str:
+        sentence = re.sub(r"^(completed|in progress|blocked|blockers?)\s*:\s*", "", sentence, flags=re.IGNORECASE).rstrip(".;")
+        if len(sentence) <= self.max_sentence_chars:
+            return sentence
+        return sentence[:self.max_sentence_chars].rsplit(" ", 1)[0] + "..."
+
+# --- Tiered Summarization ---
+# The LLM is the preferred tier, but only while it is healthy and fast: each
+# call gets `budget` seconds, after which the extractive tier answers. An LLM
+# call that finishes late still completes in the background (and is cached by
+# the primary callable), so a resubmission gets the LLM summary.
+class ProviderHealth:
+    """A small circuit breaker: `failure_threshold` failures in a row open it for `cooldown` seconds."""
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.latency_ewma: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return monotonic() >= self.open_until
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.available():
+                    print(f"[{self.name}] {self.failures} failures in a row, skipping it for {self.cooldown:.0f}s")
+                self.open_until = monotonic() + self.cooldown
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available(),
+            "consecutive_failures": self.failures,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+        }
+
+class TieredSummarizer:
+    def __init__(
+        self,
+        primary: Callable[[str], str],
+        fallback: Callable[[str], str],
+        budget: float,
+        health: ProviderHealth,
+        max_workers: int = 16,
+        name: str = "summarizer",
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.budget = budget
+        self.health = health
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.served = {"primary": 0, "fallback_unhealthy": 0, "fallback_timeout": 0, "fallback_error": 0}
+        # summarize() runs on many pipeline threads at once
+        self._served_lock = threading.Lock()
+
+    def _serve(self, tier: str):
+        with self._served_lock:
+            self.served[tier] += 1
+
+    def _run_primary(self, text: str) -> str:
+        started = monotonic()
+        try:
+            result = self.primary(text)
+        except Exception:
+            self.health.record_failure()
+            raise
+        if result:
+            self.health.record_success(monotonic() - started)
+        else:
+            self.health.record_failure()
+        return result
+
+    def summarize(self, text: str) -> str:
+        if not self.health.available():
+            self._serve("fallback_unhealthy")
+            return self.fallback(text)
+        future = self._executor.submit(self._run_primary, text)
+        try:
+            result = future.result(timeout=self.budget)
+        except FutureTimeout:
+            self.health.record_failure()
+            self._serve("fallback_timeout")
+            return self.fallback(text)
+        except Exception as e:
+            print(f"Primary summarizer failed: {e}")
+            self._serve("fallback_error")
+            return self.fallback(text)
+        if not result:
+            self._serve("fallback_error")
+            return self.fallback(text)
+        self._serve("primary")
+        return result
+
+    def stats(self) -> dict:
+        with self._served_lock:
+            served = dict(self.served)
+        return {"budget_ms": round(self.budget * 1000), "served": served, "health": self.health.stats()}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# utils reads its settings at import time, so point it at a throwaway SQLite
+# database before any test module imports it
+_db_dir = tempfile.mkdtemp(prefix="remotesync-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
+os.environ.setdefault("CLERK_SECRET_KEY", "sk_test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+utils.Base.metadata.create_all(utils.engine)
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    yield
+    with utils.engine.begin() as conn:
+        for table in reversed(utils.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+@pytest.fixture
+def team():
+    """A team with one member ('user_1'); returns its id."""
+    with utils.SessionLocal() as session:
+        new_team = utils.Team(name="Platform", owner_id="user_1", settings={}, report_recipients=["lead@example.com"])
+        session.add(new_team)
+        session.flush()
+        session.add(utils.TeamMember(user_id="user_1", team_id=new_team.id, role="owner"))
+        session.commit()
+        return new_team.id
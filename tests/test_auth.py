@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import auth
+
+@pytest.fixture
+def tokens(monkeypatch):
+    """Records the Authorization values that reach authentication."""
+    seen = []
+
+    async def authenticate(authorization):
+        seen.append(authorization)
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authorization header missing")
+        return authorization
+    monkeypatch.setattr(auth, "authenticate", authenticate)
+    return seen
+
+def test_stream_user_accepts_a_query_token(tokens):
+    assert asyncio.run(auth.get_stream_user(authorization=None, token="abc")) == "Bearer abc"
+
+def test_stream_user_prefers_the_header(tokens):
+    asyncio.run(auth.get_stream_user(authorization="Bearer header", token="query"))
+    assert tokens == ["Bearer header"]
+
+def test_stream_user_without_a_token_is_refused(tokens):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(auth.get_stream_user(authorization=None, token=None))
+    assert e.value.status_code == 401
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils
+
+@pytest.fixture(autouse=True)
+def no_clerk(monkeypatch):
+    monkeypatch.setattr(utils, "get_user_profiles", lambda user_ids: {})
+
+def add_entries(team_id, created_at):
+    """Adds one completed entry per timestamp; returns their ids."""
+    with utils.SessionLocal() as session:
+        entries = [
+            utils.StandupEntry(user_id="user_1", team_id=team_id, text=f"update {i}", summary=f"summary {i}",
+                               processing_status="completed", created_at=when)
+            for i, when in enumerate(created_at)
+        ]
+        session.add_all(entries)
+        session.commit()
+        return [entry.id for entry in entries]
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 9, 30, 15, 123456)
+    cursor = utils.encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert utils.decode_cursor(cursor) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", utils.encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        utils.decode_cursor(cursor)
+
+def test_pages_cover_the_feed_once_in_order(team):
+    now = datetime.utcnow()
+    # Several entries share a timestamp, so the id has to break ties
+    ids = add_entries(team, [now - timedelta(hours=1)] * 3 + [now - timedelta(minutes=m) for m in (50, 40, 30)])
+    expected = sorted(ids[3:], reverse=True) + sorted(ids[:3], reverse=True)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = utils.get_dashboard_data("user_1", team_id=team, cursor=cursor, limit=2)
+        seen += [entry["id"] for entry in page["entries"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 3
+
+def test_new_entries_do_not_shift_later_pages(team):
+    now = datetime.utcnow()
+    ids = add_entries(team, [now - timedelta(minutes=m) for m in (30, 20, 10)])
+    first = utils.get_dashboard_data("user_1", team_id=team, limit=2)
+    add_entries(team, [now])
+    second = utils.get_dashboard_data("user_1", team_id=team, cursor=first["next_cursor"], limit=2)
+    assert [entry["id"] for entry in second["entries"]] == [ids[0]]
+    assert second["next_cursor"] is None
+
+def test_entries_outside_the_window_are_not_listed(team):
+    now = datetime.utcnow()
+    old, recent = add_entries(team, [now - timedelta(days=utils.DASHBOARD_WINDOW_DAYS + 1), now])
+    page = utils.get_dashboard_data("user_1", team_id=team)
+    assert [entry["id"] for entry in page["entries"]] == [recent]
+
+def test_other_teams_are_forbidden(team):
+    with pytest.raises(PermissionError):
+        utils.get_dashboard_data("user_2", team_id=team)
+
+def test_etag_changes_only_when_an_entry_is_created_or_settles(team):
+    etag = utils.dashboard_etag("user_1", team_id=team)
+    entry = utils.log_to_db("user_1", "", "", None, team, processing_status="queued")
+    queued = utils.dashboard_etag("user_1", team_id=team)
+    assert queued != etag
+    utils.update_entry_processing(entry.id, "transcribing")
+    utils.update_entry_processing(entry.id, "summarizing", text="done")
+    assert utils.dashboard_etag("user_1", team_id=team) == queued
+    utils.update_entry_processing(entry.id, "completed", summary="Done.")
+    assert utils.dashboard_etag("user_1", team_id=team) != queued
+
+def test_etag_changes_when_the_window_moves(team, monkeypatch):
+    cutoff = utils._dashboard_cutoff()
+    assert cutoff.minute == cutoff.second == cutoff.microsecond == 0
+    etag = utils.dashboard_etag("user_1", team_id=team)
+    monkeypatch.setattr(utils, "_dashboard_cutoff", lambda: cutoff + timedelta(hours=1))
+    assert utils.dashboard_etag("user_1", team_id=team) != etag
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils
+
+@pytest.fixture(autouse=True)
+def no_clerk(monkeypatch):
+    profiles = {"user_1": {"first_name": "Ada", "last_name": "Lovelace", "image_url": None}}
+    monkeypatch.setattr(utils, "get_user_profiles", lambda user_ids: profiles)
+
+def get_digests(team_id):
+    with utils.SessionLocal() as session:
+        return session.query(utils.TeamDailyDigest).filter_by(team_id=team_id).order_by(utils.TeamDailyDigest.day).all()
+
+def test_completed_entries_are_added_to_the_day_digest(team):
+    first = utils.log_to_db("user_1", "fixed the build", "Fixed the build.", None, team)
+    second = utils.log_to_db("user_2", "reviewed PRs", "Reviewed PRs.", "https://cdn/a.wav", team)
+    [digest] = get_digests(team)
+    assert digest.day == first.created_at.date()
+    assert digest.entry_count == 2
+    assert digest.participants == ["user_1", "user_2"]
+    assert [f["entry_id"] for f in digest.fragments] == [first.id, second.id]
+    assert digest.fragments[1]["summary"] == "Reviewed PRs."
+    assert digest.fragments[1]["audio_url"] == "https://cdn/a.wav"
+
+def test_queued_entries_join_the_digest_when_completed(team):
+    entry = utils.log_to_db("user_1", "", "", None, team, processing_status="queued")
+    assert get_digests(team) == []
+    utils.update_entry_processing(entry.id, "summarizing", text="shipped it")
+    assert get_digests(team) == []
+    utils.update_entry_processing(entry.id, "completed", summary="Shipped it.")
+    [digest] = get_digests(team)
+    assert [f["summary"] for f in digest.fragments] == ["Shipped it."]
+
+def test_completing_again_replaces_the_fragment(team):
+    entry = utils.log_to_db("user_1", "", "", None, team, processing_status="queued")
+    utils.update_entry_processing(entry.id, "completed", summary="First try.")
+    utils.update_entry_processing(entry.id, "completed", summary="Second try.")
+    [digest] = get_digests(team)
+    assert digest.entry_count == 1
+    assert [f["summary"] for f in digest.fragments] == ["Second try."]
+
+def test_bulk_inserts_update_digests(team):
+    created = utils.log_entries_bulk([
+        {"user_id": "user_1", "team_id": team, "text": "a", "summary": "A.", "audio_url": None},
+        {"user_id": "user_1", "team_id": team, "text": "b", "summary": "B.", "audio_url": None},
+    ])
+    assert created == 2
+    [digest] = get_digests(team)
+    assert digest.entry_count == 2
+    assert digest.participants == ["user_1"]
+
+def test_daily_report_reads_the_last_day_of_digests(team):
+    old = utils.log_to_db("user_1", "old", "Old news.", None, team)
+    with utils.SessionLocal() as session:
+        session.query(utils.StandupEntry).filter_by(id=old.id).update({"created_at": datetime.utcnow() - timedelta(days=2)})
+        session.commit()
+    # Re-file the backdated entry under its new day
+    with utils.SessionLocal() as session:
+        session.query(utils.TeamDailyDigest).delete()
+        for entry in session.query(utils.StandupEntry).all():
+            utils.record_in_digest(session, entry)
+        session.commit()
+    utils.log_to_db("user_1", "new", "Fresh update.", None, team)
+
+    report = utils.build_daily_report(team)
+    [(heading, items)] = report.sections
+    assert heading is None
+    assert items == [{"name": "Ada Lovelace", "summary": "Fresh update.", "audio_url": None}]
+
+def test_weekly_report_groups_by_day(team):
+    utils.log_to_db("user_1", "a", "Wrote the migration.", None, team)
+    report = utils.build_weekly_report(team)
+    [(heading, items)] = report.sections
+    assert heading == datetime.utcnow().strftime("%Y-%m-%d %A")
+    assert [item["summary"] for item in items] == ["Wrote the migration."]
+
+def test_reports_are_skipped_without_entries(team):
+    assert utils.build_daily_report(team) is None
+    assert utils.build_weekly_report(team) is None
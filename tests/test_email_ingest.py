@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+
+UID_VALIDITY = 7
+
+class FakeMailbox:
+    """Just enough of imap_tools' MailBox for ingest_mailbox: UID-range fetches and flags."""
+
+    def __init__(self, count: int):
+        self.messages = [SimpleNamespace(uid=str(i), text=f"update {i}", html="", from_=f"user{i}@example.com")
+                         for i in range(1, count + 1)]
+        self.flags = {}
+        self.folder = SimpleNamespace(status=lambda folder, items: {"UIDVALIDITY": UID_VALIDITY})
+
+    def fetch(self, criteria, limit, mark_seen, bulk):
+        assert not mark_seen
+        query = str(criteria)
+        first = int(query.split("UID ")[1].split(":")[0])
+        unseen_only = "UNSEEN" in query
+        matched = [m for m in self.messages if int(m.uid) >= first and not (unseen_only and m.uid in self.seen)]
+        # Like a real server, "N:*" always matches the newest message
+        return (matched or self.messages[-1:])[:limit]
+
+    @property
+    def seen(self) -> set:
+        return self.flags.get("\\Seen", set())
+
+    @property
+    def dead(self) -> set:
+        return self.flags.get("\\Flagged", set())
+
+    def flag(self, uids, flag, value):
+        self.flags.setdefault(flag, set()).update(uids)
+
+@pytest.fixture(autouse=True)
+def senders(team, monkeypatch):
+    """Every sender is user_1 (a member of `team`), except stranger@example.com."""
+    monkeypatch.setattr(utils, "lookup_users_by_email",
+                        lambda addresses: {a: "user_1" for a in addresses if a != "stranger@example.com"})
+    monkeypatch.setattr(utils, "_reply_failures", {})
+    return team
+
+@pytest.fixture
+def failing(monkeypatch):
+    """Texts whose summary raises; summaries are otherwise echoed back."""
+    texts = set()
+
+    def summarize(text, **kwargs):
+        if text in texts:
+            raise RuntimeError("LLM unavailable")
+        return f"Summary: {text}"
+    monkeypatch.setattr(utils, "summarize_text", summarize)
+    return texts
+
+def checkpoint():
+    return utils.get_ingest_checkpoint(utils.imap_checkpoint_name())
+
+def stored_texts():
+    with utils.SessionLocal() as session:
+        return [row.text for row in session.query(utils.StandupEntry.text).order_by(utils.StandupEntry.id)]
+
+def test_ingests_everything_and_marks_it_read(failing):
+    mailbox = FakeMailbox(3)
+    assert utils.ingest_mailbox(mailbox) == 3
+    assert checkpoint() == {"uid_validity": UID_VALIDITY, "last_uid": 3}
+    assert mailbox.seen == {"1", "2", "3"}
+    # Nothing new: the newest message is fetched again but skipped
+    assert utils.ingest_mailbox(mailbox) == 0
+
+def test_checkpoint_stops_before_a_failed_summary(failing):
+    mailbox = FakeMailbox(5)
+    failing.add("update 3")
+    assert utils.ingest_mailbox(mailbox) == 2
+    assert checkpoint()["last_uid"] == 2
+    assert mailbox.seen == {"1", "2"}
+
+    failing.clear()
+    assert utils.ingest_mailbox(mailbox) == 3
+    assert checkpoint()["last_uid"] == 5
+    assert stored_texts() == [f"update {i}" for i in range(1, 6)]
+
+def test_stale_worker_does_not_store_a_batch_twice(failing, monkeypatch):
+    mailbox = FakeMailbox(2)
+    utils.ingest_mailbox(mailbox)
+    mailbox.messages.append(SimpleNamespace(uid="3", text="update 3", html="", from_="user3@example.com"))
+    utils.ingest_mailbox(mailbox)
+
+    # A second process read the checkpoint before the first one moved it
+    monkeypatch.setattr(utils, "get_ingest_checkpoint", lambda name: {"uid_validity": UID_VALIDITY, "last_uid": 2})
+    assert utils.ingest_mailbox(mailbox) == 0
+    assert stored_texts() == ["update 1", "update 2", "update 3"]
+
+def test_checkpoint_is_created_only_once():
+    name = utils.imap_checkpoint_name()
+    with utils.SessionLocal() as session:
+        utils.save_ingest_checkpoint(session, name, UID_VALIDITY, 1, expected=None)
+        session.commit()
+    with utils.SessionLocal() as session:
+        with pytest.raises(utils.CheckpointConflict):
+            utils.save_ingest_checkpoint(session, name, UID_VALIDITY, 2, expected=None)
+
+def stored_teams():
+    with utils.SessionLocal() as session:
+        return {row.team_id for row in session.query(utils.StandupEntry.team_id)}
+
+def test_replies_are_filed_under_the_senders_team(failing, senders):
+    utils.ingest_mailbox(FakeMailbox(2))
+    assert stored_teams() == {senders}
+
+def test_unknown_senders_are_dead_lettered(failing):
+    mailbox = FakeMailbox(3)
+    mailbox.messages[1].from_ = "Stranger@Example.com"
+    assert utils.ingest_mailbox(mailbox) == 2
+    assert checkpoint()["last_uid"] == 3
+    assert mailbox.seen == {"1", "3"}
+    assert mailbox.dead == {"2"}
+
+def test_a_reply_that_keeps_failing_is_dead_lettered(failing, monkeypatch):
+    monkeypatch.setattr(utils, "EMAIL_INGEST_MAX_ATTEMPTS", 2)
+    mailbox = FakeMailbox(3)
+    failing.add("update 2")
+    assert utils.ingest_mailbox(mailbox) == 1
+    assert checkpoint()["last_uid"] == 1
+    assert utils.ingest_mailbox(mailbox) == 1
+    assert checkpoint()["last_uid"] == 3
+    assert mailbox.dead == {"2"}
+    assert stored_texts() == ["update 1", "update 3"]
+
+def test_a_reply_for_a_deleted_team_does_not_block_the_batch(failing, senders, monkeypatch):
+    # The sender's team was deleted after it was resolved
+    resolve = utils.resolve_reply_senders
+    monkeypatch.setattr(utils, "resolve_reply_senders", lambda addresses: {
+        address: {**sender, "team_id": "team_gone"} if address == "user2@example.com" else sender
+        for address, sender in resolve(addresses).items()
+    })
+    assert utils.ingest_mailbox(FakeMailbox(3)) == 2
+    assert checkpoint()["last_uid"] == 3
+    assert stored_texts() == ["update 1", "update 3"]
+
+def test_only_the_lease_holder_ingests(failing):
+    name = utils.imap_checkpoint_name()
+    assert utils.acquire_ingest_lease(name, owner="other-process", seconds=60)
+    mailbox = FakeMailbox(2)
+    mailbox.fetch = lambda *args, **kwargs: pytest.fail("fetched without the lease")
+    assert utils.ingest_mailbox(mailbox) == 0
+
+    utils.release_ingest_lease(name, owner="other-process")
+    mailbox = FakeMailbox(2)
+    assert utils.ingest_mailbox(mailbox) == 2
+    assert checkpoint() == {"uid_validity": UID_VALIDITY, "last_uid": 2}
+
+def test_an_expired_lease_is_taken_over():
+    name = utils.imap_checkpoint_name()
+    assert utils.acquire_ingest_lease(name, owner="crashed-process", seconds=-1)
+    assert utils.acquire_ingest_lease(name, owner="me", seconds=60)
+    assert not utils.acquire_ingest_lease(name, owner="crashed-process", seconds=60)
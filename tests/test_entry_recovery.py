@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import pipeline
+import utils
+
+def stale_entry(team_id, text="shipped the export"):
+    entry = utils.log_to_db("user_1", text, "", None, team_id, processing_status="queued")
+    with utils.SessionLocal() as session:
+        session.query(utils.StandupEntry).filter_by(id=entry.id).update(
+            {"processing_updated_at": datetime.utcnow() - timedelta(seconds=pipeline.ENTRY_STALE_SECONDS + 60)})
+        session.commit()
+    return entry.id
+
+def get_entry(entry_id):
+    with utils.SessionLocal() as session:
+        return session.get(utils.StandupEntry, entry_id)
+
+@pytest.fixture
+def submitted(monkeypatch):
+    ids = []
+    monkeypatch.setattr(pipeline, "submit_entry", lambda entry_id, text=None: ids.append(entry_id))
+    return ids
+
+def test_orphaned_entries_are_requeued_and_lost_audio_failed(team, submitted):
+    text_id = stale_entry(team)
+    audio_id = stale_entry(team, text="")
+    assert pipeline.recover_stalled_entries() == {"requeued": 1, "failed": 1}
+    assert submitted == [text_id]
+    assert get_entry(audio_id).processing_status == "failed"
+    # Claimed entries are fresh again, so the next run leaves them alone
+    assert pipeline.recover_stalled_entries() == {"requeued": 0, "failed": 0}
+
+def test_entries_held_by_this_process_are_kept_alive(team, submitted, monkeypatch):
+    entry_id = stale_entry(team, text="")
+    monkeypatch.setattr(pipeline, "_held", {entry_id})
+    assert pipeline.recover_stalled_entries() == {"requeued": 0, "failed": 0}
+    entry = get_entry(entry_id)
+    assert entry.processing_status == "queued"
+    assert entry.processing_updated_at > datetime.utcnow() - timedelta(minutes=1)
+
+def test_touched_entries_are_not_claimed_by_other_processes(team):
+    entry_id = stale_entry(team)
+    assert utils.touch_entries([entry_id]) == 1
+    assert utils.claim_stalled_entries(pipeline.ENTRY_STALE_SECONDS) == {"requeue": [], "failed": 0}
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils
+
+def add_entries(team_id, count, start=datetime(2026, 10, 1, 9, 0)):
+    with utils.SessionLocal() as session:
+        entries = [
+            # Pairs of entries share a timestamp, so resuming has to compare ids too
+            utils.StandupEntry(user_id="user_1", team_id=team_id, text=f"update {i}", summary=f"Summary, \"{i}\"",
+                               processing_status="completed", created_at=start + timedelta(minutes=i // 2))
+            for i in range(count)
+        ]
+        session.add_all(entries)
+        session.commit()
+        return [entry.id for entry in entries]
+
+def ndjson_rows(export) -> list:
+    return [json.loads(line) for line in "".join(export).splitlines()]
+
+def test_ndjson_streams_oldest_first_in_batches(team, monkeypatch):
+    monkeypatch.setattr(utils, "EXPORT_BATCH_SIZE", 3)
+    ids = add_entries(team, 7)
+    chunks = list(utils.EntryExport(team, "ndjson"))
+    assert len(chunks) == 3
+    rows = ndjson_rows(chunks)
+    assert [row["id"] for row in rows] == ids
+    assert rows[0]["summary"] == "Summary, \"0\""
+    assert utils.decode_cursor(rows[-1]["cursor"]) == (datetime.fromisoformat(rows[-1]["created_at"]), ids[-1])
+
+def test_resuming_from_any_row_returns_exactly_the_rest(team):
+    ids = add_entries(team, 6)
+    rows = ndjson_rows(utils.EntryExport(team, "ndjson"))
+    for i, row in enumerate(rows):
+        resumed = ndjson_rows(utils.EntryExport(team, "ndjson", cursor=row["cursor"]))
+        assert [r["id"] for r in resumed] == ids[i + 1:]
+
+def test_date_range_filters(team):
+    ids = add_entries(team, 6)
+    start = datetime(2026, 10, 1, 9, 1)
+    rows = ndjson_rows(utils.EntryExport(team, "ndjson", since=start, until=start + timedelta(minutes=1)))
+    assert [row["id"] for row in rows] == ids[2:4]
+
+def test_csv_header_is_only_sent_on_the_first_request(team):
+    add_entries(team, 3)
+    rows = list(csv.reader(io.StringIO("".join(utils.EntryExport(team, "csv")))))
+    assert rows[0] == list(utils.EXPORT_COLUMNS) + ["cursor"]
+    assert len(rows) == 4
+    resumed = list(csv.reader(io.StringIO("".join(utils.EntryExport(team, "csv", cursor=rows[1][-1])))))
+    assert [row[0] for row in resumed] == [rows[2][0], rows[3][0]]
+
+def test_invalid_arguments_are_rejected_up_front(team):
+    with pytest.raises(ValueError):
+        utils.EntryExport(team, "xml")
+    with pytest.raises(ValueError):
+        utils.EntryExport(team, since=datetime(2026, 10, 2), until=datetime(2026, 10, 1))
+    with pytest.raises(ValueError):
+        utils.EntryExport(team, cursor="garbage")
+
+def test_concurrent_exports_are_capped(team):
+    exports = [utils.EntryExport(team) for _ in range(utils.EXPORT_MAX_CONCURRENT)]
+    with pytest.raises(utils.ExportBusy):
+        utils.EntryExport(team)
+    list(exports.pop())  # a finished export frees its slot
+    exports.append(utils.EntryExport(team))
+    for export in exports:
+        export.close()
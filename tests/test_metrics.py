@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from metrics import span, stage_errors
+
+def errors(stage: str) -> float:
+    return stage_errors._values.get((stage,), 0)
+
+def test_span_counts_exceptions():
+    with pytest.raises(ValueError):
+        with span("test.failing"):
+            raise ValueError("boom")
+    assert errors("test.failing") == 1
+
+def test_span_does_not_count_a_closed_generator():
+    def rows():
+        with span("test.generator"):
+            yield 1
+            yield 2
+    gen = rows()
+    next(gen)
+    gen.close()  # raises GeneratorExit inside the span
+    assert errors("test.generator") == 0
+
+def test_span_does_not_count_cancellation():
+    async def main():
+        async def slow():
+            with span("test.cancelled"):
+                await asyncio.sleep(10)
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(main())
+    assert errors("test.cancelled") == 0
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import utils
+
+NOW = datetime(2026, 10, 16, 18, 0)  # a Friday, after the default 17:00 UTC report time
+
+def set_schedule(team_id, **values):
+    with utils.SessionLocal() as session:
+        session.query(utils.Team).filter_by(id=team_id).update(values)
+        session.commit()
+
+def get_team(team_id):
+    with utils.SessionLocal() as session:
+        return session.get(utils.Team, team_id)
+
+def test_next_report_time_uses_team_timezone():
+    settings = {"summaryTime": "09:00", "timezone": "America/New_York"}
+    # 09:00 EDT is 13:00 UTC
+    assert utils.next_report_time(settings, datetime(2026, 10, 16, 12, 0)) == datetime(2026, 10, 16, 13, 0)
+    assert utils.next_report_time(settings, datetime(2026, 10, 16, 13, 0)) == datetime(2026, 10, 17, 13, 0)
+    assert utils.next_report_time(settings, datetime(2026, 10, 16, 13, 0), weekday="Monday") == datetime(2026, 10, 19, 13, 0)
+
+def test_claim_leases_a_due_team_once(team):
+    set_schedule(team, next_daily_report_at=NOW - timedelta(minutes=1))
+    claimed = utils.claim_due_teams("daily", now=NOW)
+    assert [t["id"] for t in claimed] == [team]
+    assert claimed[0]["attempt"] == 1
+    assert claimed[0]["lease"] == NOW + timedelta(seconds=utils.REPORT_LEASE_SECONDS)
+    # Another worker running the same tick finds nothing due
+    assert utils.claim_due_teams("daily", now=NOW) == []
+    assert get_team(team).next_daily_report_at == claimed[0]["lease"]
+
+def test_claim_skips_teams_not_yet_due(team):
+    set_schedule(team, next_daily_report_at=NOW + timedelta(minutes=1))
+    assert utils.claim_due_teams("daily", now=NOW) == []
+
+def test_expired_lease_is_claimed_again(team):
+    set_schedule(team, next_daily_report_at=NOW - timedelta(minutes=1))
+    first = utils.claim_due_teams("daily", now=NOW)[0]
+    # The worker died mid-send; once the lease runs out the team is due again
+    retry = utils.claim_due_teams("daily", now=first["lease"])
+    assert [t["id"] for t in retry] == [team]
+    assert retry[0]["attempt"] == 2
+
+def test_failed_send_backs_off_then_success_reschedules(team):
+    set_schedule(team, next_daily_report_at=NOW - timedelta(minutes=1))
+    claimed = utils.claim_due_teams("daily", now=NOW)[0]
+    utils.finish_team_report("daily", claimed, succeeded=False, now=NOW)
+    assert get_team(team).next_daily_report_at == NOW + timedelta(seconds=utils.REPORT_RETRY_SECONDS)
+
+    retry_at = NOW + timedelta(seconds=utils.REPORT_RETRY_SECONDS)
+    claimed = utils.claim_due_teams("daily", now=retry_at)[0]
+    assert claimed["attempt"] == 2
+    utils.finish_team_report("daily", claimed, succeeded=False, now=retry_at)
+    assert get_team(team).next_daily_report_at == retry_at + timedelta(seconds=2 * utils.REPORT_RETRY_SECONDS)
+
+    sent_at = retry_at + timedelta(seconds=2 * utils.REPORT_RETRY_SECONDS)
+    claimed = utils.claim_due_teams("daily", now=sent_at)[0]
+    utils.finish_team_report("daily", claimed, succeeded=True, now=sent_at)
+    saved = get_team(team)
+    assert saved.next_daily_report_at == utils.next_report_time({}, sent_at)
+    assert saved.daily_report_attempts == 0
+
+def test_gives_up_after_max_attempts(team, monkeypatch):
+    monkeypatch.setattr(utils, "REPORT_MAX_ATTEMPTS", 1)
+    set_schedule(team, next_weekly_report_at=NOW - timedelta(minutes=1))
+    claimed = utils.claim_due_teams("weekly", now=NOW)[0]
+    utils.finish_team_report("weekly", claimed, succeeded=False, now=NOW)
+    saved = get_team(team)
+    assert saved.next_weekly_report_at == utils.next_report_time({}, NOW, weekday="Friday")
+    assert saved.weekly_report_attempts == 0
+
+def test_finish_leaves_a_rescheduled_team_alone(team):
+    set_schedule(team, next_daily_report_at=NOW - timedelta(minutes=1))
+    claimed = utils.claim_due_teams("daily", now=NOW)[0]
+    # A settings edit moved the schedule while the report was being sent
+    edited = NOW + timedelta(hours=3)
+    set_schedule(team, next_daily_report_at=edited)
+    utils.finish_team_report("daily", claimed, succeeded=True, now=NOW)
+    assert get_team(team).next_daily_report_at == edited
@@ -0,0 +1,57 @@
+import pytest
+
+from reports import Report, render_formats, render_report, stream_report
+
+def sample_report(**options) -> Report:
+    items = [
+        {"name": "Ada <admin>", "summary": "Fixed <script>alert(1)</script>\nShipped \"v2\" & more", "audio_url": "https://cdn/a.wav?x=1&y='2'"},
+        {"name": "Grace", "summary": "Reviewed PRs", "audio_url": None},
+    ]
+    return Report("Daily <Summary>", [(None, items)], **options)
+
+def test_html_escapes_every_field():
+    html = render_report(sample_report(), "html")
+    assert "<h1>Daily &lt;Summary&gt;</h1>" in html
+    assert "<h3>Ada &lt;admin&gt;</h3>" in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;<br>Shipped &quot;v2&quot; &amp; more" in html
+    assert "<script>" not in html
+    # The single-quoted href cannot be broken out of
+    assert "href='https://cdn/a.wav?x=1&amp;y=&#x27;2&#x27;'" in html
+
+def test_text_is_left_unescaped_and_indented():
+    text = render_report(sample_report(), "text")
+    assert text.startswith("Daily <Summary>\n\n")
+    assert "Ada <admin>\n  Fixed <script>alert(1)</script>\n  Shipped \"v2\" & more\n" in text
+    assert "Audio: https://cdn/a.wav?x=1&y='2'\n" in text
+
+def test_slack_escapes_its_control_characters():
+    slack = render_report(sample_report(), "slack")
+    assert slack.startswith("*Daily &lt;Summary&gt;*\n")
+    assert ">Fixed &lt;script&gt;alert(1)&lt;/script&gt;\n>Shipped \"v2\" &amp; more\n" in slack
+    assert "<https://cdn/a.wav?x=1&amp;y='2'|Listen to audio update>" in slack
+
+def test_audio_links_can_be_hidden():
+    assert "Listen to audio update" not in render_report(sample_report(show_audio=False), "html")
+
+def test_sections_and_dividers():
+    report = Report("Weekly", [("Mon", [{"name": "A", "summary": "a"}]), ("Tue", [{"name": "B", "summary": "b"}])],
+                    intro="The week.", divide="sections")
+    html = render_report(report, "html")
+    assert html == (
+        "<h1>Weekly</h1><p>The week.</p><hr>"
+        "<h2>Mon</h2><h3>A</h3><blockquote>a</blockquote><hr>"
+        "<h2>Tue</h2><h3>B</h3><blockquote>b</blockquote><hr>"
+    )
+
+def test_stream_yields_the_same_report_in_chunks():
+    items = [{"name": f"user {i}", "summary": f"update {i}"} for i in range(7)]
+    report = Report("Big", [(None, items)])
+    chunks = list(stream_report(report, "text", chunk_items=3))
+    assert len(chunks) == 3
+    assert "".join(chunks) == render_report(report, "text")
+
+def test_render_formats_and_unknown_format():
+    rendered = render_formats(sample_report(), ("html", "text"))
+    assert set(rendered) == {"html", "text"}
+    with pytest.raises(ValueError):
+        render_report(sample_report(), "pdf")
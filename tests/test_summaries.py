@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import utils
+
+def test_parse_batch_summaries_reads_the_json_array():
+    output = 'Sure! Here you go:\n[{"id": 2, "summary": " - Completed: B "}, {"id": 1, "summary": "- Completed: A"}]\nDone.'
+    assert utils.parse_batch_summaries(output, 2) == ["- Completed: A", "- Completed: B"]
+
+@pytest.mark.parametrize("output", [
+    "",
+    "not json at all",
+    '[{"id": 1, "summary": "unterminated',
+    '{"id": 1, "summary": "an object, not an array"}',
+    '[{"id": "1", "summary": "string id"}, {"id": 9, "summary": "out of range"}, {"id": 2}]',
+])
+def test_parse_batch_summaries_ignores_what_it_cannot_use(output):
+    assert utils.parse_batch_summaries(output, 2) == ["", ""]
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Records each prompt sent; batch prompts get an answer covering only update 1."""
+    sent = []
+
+    def generate(prompt, max_new_tokens):
+        sent.append(prompt)
+        if prompt.startswith(utils.BATCH_SUMMARY_PROMPT[:40]) and "Update 1:" in prompt:
+            return json.dumps([{"id": 1, "summary": "- Completed: batched"}])
+        return "- Completed: single"
+    monkeypatch.setattr(utils, "_generate", generate)
+    return sent
+
+def test_batch_is_one_prompt_with_per_entry_fallback(prompts):
+    assert utils.generate_summaries(["first update", "second update"]) == ["- Completed: batched", "- Completed: single"]
+    assert len(prompts) == 2
+    assert "Update 1:\nfirst update" in prompts[0] and "Update 2:\nsecond update" in prompts[0]
+    assert prompts[1] == utils.SUMMARY_PROMPT.format(input="second update")
+
+def test_single_update_uses_the_plain_prompt(prompts):
+    assert utils.generate_summaries(["only update"]) == ["- Completed: single"]
+    assert prompts == [utils.SUMMARY_PROMPT.format(input="only update")]
+
+def test_tiered_summarizer_counts_every_call_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from summarizer import ProviderHealth, TieredSummarizer
+
+    router = TieredSummarizer(lambda text: f"- {text}", lambda text: text, budget=5.0,
+                              health=ProviderHealth("test"), max_workers=8)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(router.summarize, [str(i) for i in range(400)]))
+    router.shutdown()
+    assert router.stats()["served"]["primary"] == 400
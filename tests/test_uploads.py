@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from audio_io import AudioTooLarge, InvalidForm, read_entry_form
+
+BOUNDARY = "remotesync"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+def form_body(fields: dict, audio: bytes = None) -> bytes:
+    parts = [f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    if audio is not None:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="audio"; filename="standup.wav"\r\n'
+                     f'Content-Type: audio/wav\r\n\r\n'.encode() + audio + b"\r\n")
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+def read(body: bytes, chunk: int = 7, **kwargs):
+    async def chunks():
+        for i in range(0, len(body), chunk):
+            yield body[i:i + chunk]
+    return asyncio.run(read_entry_form(chunks(), CONTENT_TYPE, **kwargs))
+
+def test_fields_and_audio_stream_into_one_buffer():
+    audio_bytes = bytes(range(256)) * 20
+    fields, audio = read(form_body({"team_id": "t1", "text": "héllo"}, audio_bytes), spool_bytes=1024)
+    assert fields == {"team_id": "t1", "text": "héllo"}
+    assert audio.size == len(audio_bytes) and audio.path is not None
+    assert audio.read() == audio_bytes
+    audio.close()
+
+def test_empty_file_part_counts_as_no_audio():
+    fields, audio = read(form_body({"team_id": "t1", "text": "typed"}, b""))
+    assert audio is None and fields["text"] == "typed"
+
+def test_oversized_audio_is_refused_while_streaming():
+    with pytest.raises(AudioTooLarge):
+        read(form_body({"team_id": "t1"}, b"x" * 5000), max_bytes=1000)
+
+def test_content_length_is_checked_before_reading():
+    async def never():
+        raise AssertionError("body was read")
+        yield b""
+    with pytest.raises(AudioTooLarge):
+        asyncio.run(read_entry_form(never(), CONTENT_TYPE, content_length=str(10 ** 12)))
+
+@pytest.mark.parametrize("body", [b"", form_body({"team_id": "t1"}, b"abc")[:-20]])
+def test_truncated_body_is_invalid(body):
+    with pytest.raises(InvalidForm):
+        read(body)
+
+async def iter_nothing():
+    return
+    yield b""
+
+def test_non_multipart_is_invalid():
+    with pytest.raises(InvalidForm):
+        asyncio.run(read_entry_form(iter_nothing(), "application/json"))
+
+def test_urlencoded_text_entries_are_accepted():
+    async def body():
+        yield b"team_id=t1&text=caf%C3%A9+done"
+    fields, audio = asyncio.run(read_entry_form(body(), "application/x-www-form-urlencoded"))
+    assert fields == {"team_id": "t1", "text": "café done"} and audio is None
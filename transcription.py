@@ -0,0 +1,144 @@
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+from audio_io import AudioBuffer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# --- Transcription Backends ---
+# summarize_text() talks to a TranscriptionBackend rather than a fixed URL.
+# 'remote' posts the recording to the hosted Whisper model; 'local' runs
+# faster-whisper on this machine, splitting long recordings at silences and
+# decoding the segments in parallel worker processes. Pick one per deployment
+# with TRANSCRIPTION_BACKEND.
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "remote")
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "base")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_WORKERS = int(os.getenv("LOCAL_WHISPER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+LOCAL_WHISPER_SEGMENT_SECONDS = float(os.getenv("LOCAL_WHISPER_SEGMENT_SECONDS", "30"))
+LOCAL_WHISPER_LANGUAGE = os.getenv("LOCAL_WHISPER_LANGUAGE") or None
+
+class TranscriptionBackend:
+    """Turns an AudioBuffer into text. `model_id` is part of the inference cache key."""
+    model_id = ""
+
+    def transcribe(self, audio: AudioBuffer) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class RemoteWhisperBackend(TranscriptionBackend):
+    """The hosted Hugging Face Whisper endpoint; the whole file goes up in one request."""
+
+    def __init__(self, client, url: str):
+        self.client = client
+        self.url = url
+        self.model_id = url
+
+    def transcribe(self, audio: AudioBuffer) -> str:
+        source = audio.source()
+        try:
+            resp = self.client.post(
+                self.url,
+                files={"file": (f"audio{audio.extension}", source, audio.content_type)}
+            )
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+        return resp.json().get("text", "")
+
+# Worker-process state: each process loads the model once, in its initializer
+_worker_model = None
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    global _worker_model
+    from faster_whisper import WhisperModel  # type: ignore
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+def _transcribe_segment(segment: "np.ndarray", language: Optional[str]) -> str:
+    segments, _ = _worker_model.transcribe(segment, language=language, beam_size=1, vad_filter=False)
+    return " ".join(s.text.strip() for s in segments).strip()
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    CPU transcription with faster-whisper (optional dependency). Recordings are
+    decoded to 16 kHz mono, cut at the quietest point before every
+    `segment_seconds`, decoded concurrently in a process pool and joined in
+    their original order.
+    """
+
+    def __init__(
+        self,
+        model_size: str = LOCAL_WHISPER_MODEL,
+        workers: int = LOCAL_WHISPER_WORKERS,
+        segment_seconds: float = LOCAL_WHISPER_SEGMENT_SECONDS,
+        compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE,
+        language: Optional[str] = LOCAL_WHISPER_LANGUAGE,
+    ):
+        self.model_size = model_size
+        self.workers = workers
+        self.segment_seconds = segment_seconds
+        self.compute_type = compute_type
+        self.language = language
+        self.model_id = f"faster-whisper/{model_size}/{compute_type}"
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn, not fork: the API process is multi-threaded
+                    threads = max(1, (os.cpu_count() or 1) // self.workers)
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.model_size, self.compute_type, threads),
+                    )
+        return self._pool
+
+    def decode(self, audio: AudioBuffer) -> "np.ndarray":
+        """16 kHz mono float32 samples; non-WAV formats are decoded by faster-whisper (PyAV)."""
+        from audio_processing import TARGET_SAMPLE_RATE, UnsupportedAudio, decode_wav, resample, to_mono
+        try:
+            samples, rate = decode_wav(audio.read())
+            return resample(to_mono(samples), rate, TARGET_SAMPLE_RATE)
+        except UnsupportedAudio:
+            from faster_whisper import decode_audio  # type: ignore
+            source = audio.source()
+            try:
+                return decode_audio(source if hasattr(source, "read") else io.BytesIO(source), sampling_rate=TARGET_SAMPLE_RATE)
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+
+    def segments(self, audio: AudioBuffer) -> List["np.ndarray"]:
+        from audio_processing import TARGET_SAMPLE_RATE, split_on_silence
+        return split_on_silence(self.decode(audio), TARGET_SAMPLE_RATE, max_seconds=self.segment_seconds)
+
+    def transcribe(self, audio: AudioBuffer) -> str:
+        segments = self.segments(audio)
+        # map() yields results in submission order, so the text stitches back in sequence
+        texts = self.pool.map(_transcribe_segment, segments, [self.language] * len(segments))
+        return " ".join(text for text in texts if text)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def create_transcription_backend(name: str, client=None, url: str = "") -> TranscriptionBackend:
+    """Builds the backend named by TRANSCRIPTION_BACKEND ('remote' or 'local')."""
+    if name == "remote":
+        return RemoteWhisperBackend(client, url)
+    if name == "local":
+        return LocalWhisperBackend()
+    raise ValueError(f"Unknown TRANSCRIPTION_BACKEND '{name}' (expected 'remote' or 'local').")
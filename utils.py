@@ -1,16 +1,33 @@
 import os
-import requests
-from datetime import datetime, date, timedelta, time
+from datetime import datetime, date, timedelta, time, timezone, tzinfo
+from zoneinfo import ZoneInfo
+import re
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, ForeignKey, func, Boolean
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
-from supabase import create_client, Client
-from typing import List, Optional
+from sqlalchemy import create_engine, event, Column, Integer, BigInteger, String, Date, DateTime, JSON, ForeignKey, Index, func, Boolean, or_, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker, relationship
+from typing import Dict, Iterable, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from time import perf_counter
 import secrets
-from imap_tools.mailbox import MailBox
-from imap_tools.query import A
+import socket
+import functools
+import threading
+import json
+import base64
+import csv
+import io
+import hashlib
 from models import TeamCreate, TeamSettingsUpdate
-from clerk import Clerk  # type: ignore
+from cache import TTLCache
+from http_client import ProviderClient
+from metrics import histogram, span, stage_seconds
+import feed
+from reports import Report, render_formats, render_report
+from summarizer import MicroBatcher, ExtractiveSummarizer, ProviderHealth, TieredSummarizer
+from audio_io import AudioBuffer
+from transcription import TRANSCRIPTION_BACKEND, create_transcription_backend
 
 load_dotenv()
 
@@ -26,15 +43,169 @@ IMAP_SERVER = os.getenv("IMAP_SERVER")
 IMAP_USERNAME = os.getenv("IMAP_USERNAME")
 IMAP_PASSWORD = os.getenv("IMAP_PASSWORD")
 CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
+HF_TIMEOUT = float(os.getenv("HF_TIMEOUT", "120"))
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", "4"))
+HF_MAX_RETRIES = int(os.getenv("HF_MAX_RETRIES", "4"))
+RESEND_TIMEOUT = float(os.getenv("RESEND_TIMEOUT", "15"))
+RESEND_MAX_CONCURRENCY = int(os.getenv("RESEND_MAX_CONCURRENCY", "8"))
+RESEND_MAX_RETRIES = int(os.getenv("RESEND_MAX_RETRIES", "3"))
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "8"))
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+SUMMARY_BATCH_WAIT_MS = int(os.getenv("SUMMARY_BATCH_WAIT_MS", "50"))
+SUMMARY_ENGINE = os.getenv("SUMMARY_ENGINE", "tiered") # 'tiered', 'llm' or 'extractive'
+SUMMARY_LATENCY_BUDGET_MS = int(os.getenv("SUMMARY_LATENCY_BUDGET_MS", "10000"))
+SUMMARY_FAILURE_THRESHOLD = int(os.getenv("SUMMARY_FAILURE_THRESHOLD", "3"))
+SUMMARY_COOLDOWN_SECONDS = float(os.getenv("SUMMARY_COOLDOWN_SECONDS", "30"))
+INFERENCE_CACHE_MAX_BYTES = int(os.getenv("INFERENCE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "600"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "5000"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+DATABASE_ASYNC_URL = os.getenv("DATABASE_ASYNC_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "10"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
 if not DATABASE_URL or not SUPABASE_URL or not SUPABASE_SERVICE_KEY or not CLERK_SECRET_KEY:
     raise RuntimeError("One or more required environment variables are not set.")
 
 # --- Database Setup (SQLAlchemy) ---
-engine = create_engine(DATABASE_URL)
+# Two engines share the schema: the sync one serves worker threads (pipeline,
+# scheduler, reports, email ingestion) and the async one serves request
+# handlers, so a handler never holds a thread or blocks the event loop while
+# it waits on the database. Each has its own bounded, tunable pool.
+def _pool_options(url: str, size: int, overflow: int) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite uses a single shared connection
+    return {
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def async_database_url(url: str) -> str:
+    """Maps DATABASE_URL onto an asyncio driver (asyncpg / aiosqlite) unless DATABASE_ASYNC_URL is set."""
+    if DATABASE_ASYNC_URL:
+        return DATABASE_ASYNC_URL
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ("postgresql", "postgres"):
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            # asyncpg spells libpq's sslmode as ssl
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW))
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+_async_engine = None
+_AsyncSessionLocal = None
+_async_lock = threading.Lock()
+
+def get_async_sessionmaker():
+    """Creates the async engine on first use, so processes that never serve requests do not need the driver."""
+    global _async_engine, _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        with _async_lock:
+            if _AsyncSessionLocal is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+                url = async_database_url(DATABASE_URL)
+                _async_engine = create_async_engine(url, **_pool_options(url, DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW))
+                track_pool(_async_engine.sync_engine, "async")
+                _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+def db_function(fn):
+    """
+    Turns `fn(session, ...)` into `fn(...)`, run in its own SessionLocal, and
+    adds an awaitable `fn.aio(...)` that runs the same code on the async
+    engine via AsyncSession.run_sync. Handlers await `.aio`; threads call
+    the function directly.
+    """
+    stage = f"db.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        with span(stage), SessionLocal() as session:
+            return fn(session, *args, **kwargs)
+
+    async def run_async(*args, **kwargs):
+        with span(stage):
+            async with get_async_sessionmaker()() as session:
+                return await session.run_sync(fn, *args, **kwargs)
+
+    run.aio = run_async
+    return run
+
+# Live feed events queued on a session (queue_feed_event) go out only once
+# its transaction commits, on either engine, and are dropped on rollback.
+@event.listens_for(Session, "after_commit")
+def _publish_feed_events(session):
+    events = session.info.pop("feed_events", None)
+    if events:
+        feed.hub.publish(events)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_feed_events(session, previous_transaction):
+    # Only the outermost rollback: a savepoint rolled back (record_in_digest) keeps the rest
+    if previous_transaction.parent is None:
+        session.info.pop("feed_events", None)
+
+# Connection-pool counters per engine, for /api/internal/db-stats
+db_pool_stats: Dict[str, dict] = {}
+
+def track_pool(target_engine, name: str):
+    stats = db_pool_stats.setdefault(name, {"checkouts": 0, "in_use": 0, "peak_in_use": 0, "connects": 0})
+    lock = threading.Lock()
+
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats["connects"] += 1
+
+    @event.listens_for(target_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with lock:
+            stats["checkouts"] += 1
+            stats["in_use"] += 1
+            stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+
+    @event.listens_for(target_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with lock:
+            stats["in_use"] -= 1
+
+def pool_summary() -> dict:
+    summary = {}
+    engines = {"sync": engine, "async": _async_engine.sync_engine if _async_engine is not None else None}
+    for name, target in engines.items():
+        if target is None:
+            continue
+        pool = target.pool
+        summary[name] = {
+            **db_pool_stats.get(name, {}),
+            "pool": pool.status(),
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        }
+    return summary
+
+track_pool(engine, "sync")
+
 class Team(Base):
     __tablename__ = 'teams'
     id = Column(String, primary_key=True, default=lambda: f"team_{secrets.token_hex(16)}")
@@ -43,14 +214,24 @@ class Team(Base):
     settings = Column(JSON, default=dict)
     report_recipients = Column(JSON, default=list)
     invite_token = Column(String, unique=True, default=lambda: secrets.token_urlsafe(16))
+    # Next due report times in naive UTC, derived from settings (see schedule_team_reports)
+    next_daily_report_at = Column(DateTime, nullable=True, index=True)
+    next_weekly_report_at = Column(DateTime, nullable=True, index=True)
+    # Sends tried for the pending report; reset once it goes out (see finish_team_report)
+    daily_report_attempts = Column(Integer, default=0, nullable=False)
+    weekly_report_attempts = Column(Integer, default=0, nullable=False)
+    # Bumped in the writing transaction; the dashboard/members ETags derive from them (see bump_team_versions)
+    data_version = Column(Integer, default=0, nullable=False)
+    members_version = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan")
     entries = relationship("StandupEntry", back_populates="team", cascade="all, delete-orphan")
+    digests = relationship("TeamDailyDigest", cascade="all, delete-orphan")
 
 class TeamMember(Base):
     __tablename__ = 'team_members'
     team_id = Column(String, ForeignKey('teams.id'), primary_key=True)
-    user_id = Column(String, primary_key=True) # Clerk User ID
+    user_id = Column(String, primary_key=True, index=True) # Clerk User ID
     role = Column(String, default='member')
     created_at = Column(DateTime, default=datetime.utcnow)
     team = relationship("Team", back_populates="members")
@@ -63,76 +244,782 @@ class StandupEntry(Base):
     text = Column(String)
     summary = Column(String)
     audio_url = Column(String, nullable=True)
+    processing_status = Column(String, default='completed', nullable=False) # queued -> normalizing/transcribing/summarizing -> completed|failed
+    processing_error = Column(String, nullable=True)
+    processing_updated_at = Column(DateTime, default=datetime.utcnow) # last state change, for recover_stalled_entries
     created_at = Column(DateTime, default=datetime.utcnow)
     team = relationship("Team", back_populates="entries")
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+    # Dashboard/report/reminder queries filter by team and a created_at range,
+    # optionally narrowed to one user. Schema changes go through migrations/.
+    __table_args__ = (
+        Index('ix_standup_entries_team_created', 'team_id', 'created_at'),
+        Index('ix_standup_entries_team_user_created', 'team_id', 'user_id', 'created_at'),
+        Index('ix_standup_entries_status_updated', 'processing_status', 'processing_updated_at'),
+    )
+
+class TeamDailyDigest(Base):
+    """
+    Rollup of one team's completed entries for one UTC day, kept up to date as
+    entries complete so reports read a few digest rows instead of raw entries.
+    """
+    __tablename__ = 'team_daily_digests'
+    team_id = Column(String, ForeignKey('teams.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    entry_count = Column(Integer, default=0, nullable=False)
+    participants = Column(JSON, default=list) # user ids, in order of first update
+    fragments = Column(JSON, default=list) # [{entry_id, user_id, created_at, summary, audio_url}] by created_at
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class IngestCheckpoint(Base):
+    """How far an inbound source (e.g. the IMAP inbox) has been processed, so restarts resume there."""
+    __tablename__ = 'ingest_checkpoints'
+    name = Column(String, primary_key=True) # e.g. 'imap:standup@example.com/INBOX'
+    uid_validity = Column(BigInteger, nullable=True) # IMAP UIDVALIDITY; UIDs are only comparable within one
+    last_uid = Column(BigInteger, default=0, nullable=False)
+    # Which process is reading the source, until when (see acquire_ingest_lease)
+    lease_owner = Column(String, nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class InferenceCacheEntry(Base):
+    """A stored Whisper/LLM result, addressed by a hash of input + model + prompt version."""
+    __tablename__ = 'inference_cache'
+    key = Column(String, primary_key=True) # sha256 hex
+    kind = Column(String, nullable=False) # 'transcription' | 'summary'
+    value = Column(String, nullable=False)
+    input_size = Column(Integer, nullable=False) # payload bytes a hit avoids sending
+    size = Column(Integer, nullable=False) # stored bytes, for the size bound
+    hits = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+# Fresh development databases can be created directly from the models; existing
+# and production databases are managed with `alembic upgrade head`. Runs from
+# the API startup hook, not at import, so importing this module never
+# touches the database.
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "true").lower() == "true"
+
+def init_schema():
+    if AUTO_CREATE_SCHEMA:
+        Base.metadata.create_all(bind=engine)
 
 # --- Service Clients ---
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-clerk = Clerk(secret_key=CLERK_SECRET_KEY)
+# Supabase and Clerk clients (and their SDK imports) are built on first use,
+# so a cold start neither pays for them nor fails when a service is down.
+_supabase = None
+_clerk = None
+_clients_lock = threading.Lock()
+
+def get_supabase():
+    global _supabase
+    if _supabase is None:
+        with _clients_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    return _supabase
+
+def get_clerk():
+    global _clerk
+    if _clerk is None:
+        with _clients_lock:
+            if _clerk is None:
+                from clerk import Clerk  # type: ignore
+                _clerk = Clerk(secret_key=CLERK_SECRET_KEY)
+    return _clerk
+
+huggingface = ProviderClient(
+    "huggingface",
+    headers={"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {},
+    timeout=HF_TIMEOUT,
+    max_concurrency=HF_MAX_CONCURRENCY,
+    max_retries=HF_MAX_RETRIES,
+    backoff=2.0,
+)
+resend = ProviderClient(
+    "resend",
+    base_url="https://api.resend.com",
+    headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
+    timeout=RESEND_TIMEOUT,
+    max_concurrency=RESEND_MAX_CONCURRENCY,
+    max_retries=RESEND_MAX_RETRIES,
+)
+
+# --- Clerk Profile Resolution ---
+# Every place that needs names/emails for Clerk user ids goes through
+# get_user_profiles(): cached ids cost nothing, the misses are fetched with a
+# single get_user_list call, and concurrent lookups of the same id share one
+# in-flight request.
+CLERK_USER_LIST_LIMIT = 100
+profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL, name="clerk_profiles")
+_inflight_profiles: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def _to_profile(clerk_user) -> dict:
+    primary_email_id = clerk_user.primary_email_address_id
+    primary_email_obj = next((e for e in clerk_user.email_addresses if e.id == primary_email_id), None)
+    return {
+        "id": clerk_user.id,
+        "first_name": clerk_user.first_name,
+        "last_name": clerk_user.last_name,
+        "image_url": clerk_user.image_url,
+        "email": primary_email_obj.email_address if primary_email_obj else None,
+    }
+
+def _fetch_profiles(user_ids: List[str]) -> Dict[str, dict]:
+    profiles = {}
+    for i in range(0, len(user_ids), CLERK_USER_LIST_LIMIT):
+        chunk = user_ids[i:i + CLERK_USER_LIST_LIMIT]
+        with span("clerk.get_user_list"):
+            users = get_clerk().users.get_user_list(user_id=chunk, limit=len(chunk))
+        for user in users:
+            profiles[user.id] = _to_profile(user)
+    return profiles
+
+def lookup_users_by_email(addresses: List[str]) -> Dict[str, str]:
+    """Maps lower-cased email addresses to the Clerk user owning them; unknown addresses are left out."""
+    wanted = set(addresses)
+    found = {}
+    for i in range(0, len(addresses), CLERK_USER_LIST_LIMIT):
+        chunk = addresses[i:i + CLERK_USER_LIST_LIMIT]
+        with span("clerk.get_user_list"):
+            users = get_clerk().users.get_user_list(email_address=chunk, limit=len(chunk))
+        for user in users:
+            profile_cache.set(user.id, _to_profile(user))
+            for email in user.email_addresses:
+                if email.email_address.lower() in wanted:
+                    found[email.email_address.lower()] = user.id
+    return found
+
+def get_user_profiles(user_ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    Resolves Clerk user ids to profile dicts (id, first_name, last_name,
+    image_url, email). Ids unknown to Clerk are left out of the result.
+    """
+    result = {}
+    misses = []
+    for user_id in dict.fromkeys(user_ids):
+        profile = profile_cache.get(user_id)
+        if profile is not None:
+            result[user_id] = profile
+        else:
+            misses.append(user_id)
+    if not misses:
+        return result
+
+    owned, waiting = {}, {}
+    with _inflight_lock:
+        for user_id in misses:
+            future = _inflight_profiles.get(user_id)
+            if future is None:
+                future = owned[user_id] = _inflight_profiles[user_id] = Future()
+            else:
+                waiting[user_id] = future
+
+    if owned:
+        try:
+            fetched = _fetch_profiles(list(owned))
+        except Exception as e:
+            for future in owned.values():
+                future.set_exception(e)
+            raise
+        else:
+            for user_id, future in owned.items():
+                profile = fetched.get(user_id)
+                if profile is not None:
+                    profile_cache.set(user_id, profile)
+                    result[user_id] = profile
+                future.set_result(profile)
+        finally:
+            with _inflight_lock:
+                for user_id in owned:
+                    _inflight_profiles.pop(user_id, None)
+
+    for user_id, future in waiting.items():
+        profile = future.result()
+        if profile is not None:
+            result[user_id] = profile
+    return result
+
+def get_user_profile(user_id: str) -> Optional[dict]:
+    return get_user_profiles([user_id]).get(user_id)
+
+def display_name(profile: Optional[dict]) -> str:
+    if not profile:
+        return "Unknown User"
+    return f"{profile['first_name'] or ''} {profile['last_name'] or ''}".strip() or "Unknown User"
 
 # --- Database Functions ---
-def create_team_in_db(team_data: TeamCreate, owner_id: str) -> Team:
-    with SessionLocal() as session:
-        new_team = Team(
-            name=team_data.name,
-            owner_id=owner_id,
-            settings=team_data.settings
-        )
-        session.add(new_team)
-        session.flush() # Use flush to get the ID before commit
-        
-        # Add the owner as the first member
-        first_member = TeamMember(user_id=owner_id, team_id=new_team.id, role='owner')
-        session.add(first_member)
-        
-        session.commit()
-        session.refresh(new_team)
-        return new_team
+def bump_team_versions(session, team_ids: Iterable[str], members: bool = False):
+    """
+    Invalidates cached dashboards (and, with members=True, member lists) of
+    the given teams. Call it inside the transaction that makes the change.
+    """
+    values = {Team.data_version: Team.data_version + 1}
+    if members:
+        values[Team.members_version] = Team.members_version + 1
+    session.query(Team).filter(Team.id.in_(list(dict.fromkeys(team_ids)))).update(values, synchronize_session=False)
+
+def feed_entry(entry: StandupEntry) -> dict:
+    """An entry as the dashboard feed lists it (user_info is added per client)."""
+    return {
+        "id": entry.id,
+        "user_id": entry.user_id,
+        "team_id": entry.team_id,
+        "summary": entry.summary,
+        "audio_url": entry.audio_url,
+        "processing_status": entry.processing_status,
+        "created_at": entry.created_at.isoformat(),
+    }
+
+def with_user_info(event: dict) -> dict:
+    """Adds the author's user_info to a feed event, from the shared Clerk profile cache."""
+    entry = event.get("entry")
+    if entry is None:
+        return event
+    try:
+        profile = get_user_profile(entry["user_id"])
+    except Exception as e:
+        print(f"Error fetching user data from Clerk for the feed: {e}")
+        profile = None
+    return {**event, "entry": {**entry, "user_info": _user_info(profile)}}
+
+def queue_feed_event(session, entry: StandupEntry, kind: str):
+    """Sends `entry.<kind>` to the team's live feed when the session commits; the entry must be flushed."""
+    session.info.setdefault("feed_events", []).append(
+        {"type": f"entry.{kind}", "team_id": entry.team_id, "entry": feed_entry(entry)}
+    )
+
+@db_function
+def create_team_in_db(session, team_data: TeamCreate, owner_id: str) -> Team:
+    new_team = Team(
+        name=team_data.name,
+        owner_id=owner_id,
+        settings=team_data.settings
+    )
+    schedule_team_reports(new_team, datetime.utcnow())
+    session.add(new_team)
+    session.flush() # Use flush to get the ID before commit
+    
+    # Add the owner as the first member
+    first_member = TeamMember(user_id=owner_id, team_id=new_team.id, role='owner')
+    session.add(first_member)
+    
+    session.commit()
+    session.refresh(new_team)
+    return new_team
+
+@db_function
+def log_to_db(session, user_id: str, text: str, summary: str, audio_url: Optional[str], team_id: str, processing_status: str = 'completed') -> StandupEntry:
+    new_entry = StandupEntry(
+        user_id=user_id,
+        team_id=team_id,
+        text=text,
+        summary=summary,
+        audio_url=audio_url,
+        processing_status=processing_status
+    )
+    session.add(new_entry)
+    session.flush()
+    if processing_status == 'completed':
+        record_in_digest(session, new_entry)
+    bump_team_versions(session, [team_id])
+    queue_feed_event(session, new_entry, "created")
+    session.commit()
+    session.refresh(new_entry)
+    return new_entry
+
+@db_function
+def log_entries_bulk(session, entries: List[dict], checkpoint: Optional[dict] = None) -> int:
+    """
+    Inserts several completed entries (dicts of log_to_db's fields) in one
+    transaction, updating their digests and, optionally, an ingest checkpoint
+    (save_ingest_checkpoint's arguments) in the same commit. Returns the
+    number stored: entries for a team that no longer exists are logged and
+    left out, as their foreign key would fail, and endlessly retry, the
+    whole batch.
+    """
+    team_ids = {fields["team_id"] for fields in entries}
+    existing = {team_id for (team_id,) in session.query(Team.id).filter(Team.id.in_(team_ids))} if team_ids else set()
+    new_entries = []
+    for fields in entries:
+        if fields["team_id"] not in existing:
+            print(f"Skipping entry from {fields.get('user_id')}: team {fields['team_id']} does not exist")
+            continue
+        new_entries.append(StandupEntry(processing_status='completed', **fields))
+    session.add_all(new_entries)
+    session.flush()
+    for entry in new_entries:
+        record_in_digest(session, entry)
+        queue_feed_event(session, entry, "created")
+    bump_team_versions(session, (entry.team_id for entry in new_entries))
+    if checkpoint:
+        save_ingest_checkpoint(session, **checkpoint)
+    session.commit()
+    return len(new_entries)
+
+# The pipeline's queue lives in memory, so entries still in one of these
+# states long after their last change were orphaned by a crash or deploy.
+IN_FLIGHT_STATES = ('queued', 'normalizing', 'transcribing', 'summarizing')
+STALLED_ENTRY_ERROR = "Processing was interrupted by a server restart. Please record this update again."
+
+@db_function
+def touch_entries(session, entry_ids: List[int]) -> int:
+    """
+    Refreshes processing_updated_at of in-flight entries a live process still
+    holds (queued in its pipeline or running), so claim_stalled_entries in
+    another process does not take them for orphans.
+    """
+    if not entry_ids:
+        return 0
+    touched = session.query(StandupEntry).filter(
+        StandupEntry.id.in_(list(entry_ids)),
+        StandupEntry.processing_status.in_(IN_FLIGHT_STATES)
+    ).update({StandupEntry.processing_updated_at: datetime.utcnow()}, synchronize_session=False)
+    session.commit()
+    return touched
+
+@db_function
+def claim_stalled_entries(session, stale_after: float, limit: int = 100, exclude: Iterable[int] = ()) -> dict:
+    """
+    Claims entries that have not changed state for `stale_after` seconds with
+    a compare-and-set on processing_updated_at, so with several API workers
+    only one picks each up. Entries whose text is saved (text entries, and
+    audio ones already transcribed) go back to 'queued' and are returned for
+    requeueing; audio that only ever lived in the dead process's memory is
+    marked failed. `exclude` is the ids the calling process holds itself.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    query = session.query(
+        StandupEntry.id, StandupEntry.text, StandupEntry.processing_status, StandupEntry.processing_updated_at
+    ).filter(
+        StandupEntry.processing_status.in_(IN_FLIGHT_STATES),
+        StandupEntry.processing_updated_at < cutoff
+    )
+    exclude = list(exclude)
+    if exclude:
+        query = query.filter(StandupEntry.id.notin_(exclude))
+    rows = query.order_by(StandupEntry.id).limit(limit).all()
+
+    now = datetime.utcnow()
+    requeue, failed = [], []
+    for row in rows:
+        # Audio entries are saved with empty text until their transcript is stored in 'summarizing'
+        has_text = row.processing_status == 'summarizing' or (row.processing_status == 'queued' and bool(row.text))
+        if has_text:
+            values = {StandupEntry.processing_status: 'queued'}
+        else:
+            values = {StandupEntry.processing_status: 'failed', StandupEntry.processing_error: STALLED_ENTRY_ERROR}
+        values[StandupEntry.processing_updated_at] = now
+        claimed = session.query(StandupEntry).filter(
+            StandupEntry.id == row.id,
+            StandupEntry.processing_status == row.processing_status,
+            StandupEntry.processing_updated_at == row.processing_updated_at
+        ).update(values, synchronize_session=False)
+        if claimed:
+            (requeue if has_text else failed).append({"id": row.id, "text": row.text or ""})
+
+    if failed:
+        entries = session.query(StandupEntry).filter(StandupEntry.id.in_([e["id"] for e in failed])).all()
+        for entry in entries:
+            queue_feed_event(session, entry, "updated")
+        bump_team_versions(session, (entry.team_id for entry in entries))
+    session.commit()
+    return {"requeue": requeue, "failed": len(failed)}
 
-def log_to_db(user_id: str, text: str, summary: str, audio_url: Optional[str], team_id: str) -> StandupEntry:
+def get_ingest_checkpoint(name: str) -> Optional[dict]:
     with SessionLocal() as session:
-        new_entry = StandupEntry(
-            user_id=user_id,
-            team_id=team_id,
-            text=text,
-            summary=summary,
-            audio_url=audio_url
-        )
-        session.add(new_entry)
+        row = session.query(IngestCheckpoint).filter_by(name=name).first()
+        return {"uid_validity": row.uid_validity, "last_uid": row.last_uid} if row else None
+
+# Every API process runs an ingest worker. Only the lease holder fetches and
+# summarizes, so replies are not downloaded and summarized once per process;
+# the checkpoint compare-and-set stays as the guard against a lease that
+# ran out mid-batch.
+INGEST_LEASE_SECONDS = int(os.getenv("EMAIL_INGEST_LEASE_SECONDS", "300"))
+INGEST_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+@db_function
+def acquire_ingest_lease(session, name: str, owner: str = INGEST_OWNER, seconds: float = INGEST_LEASE_SECONDS) -> bool:
+    """
+    Takes, or renews, the lease on an ingest source for `seconds` with a
+    compare-and-set; False while another owner holds it. A source with no
+    checkpoint yet gets its row here, with no UIDVALIDITY.
+    """
+    now = datetime.utcnow()
+    until = now + timedelta(seconds=seconds)
+    taken = session.query(IngestCheckpoint).filter(
+        IngestCheckpoint.name == name,
+        or_(IngestCheckpoint.lease_owner == owner, IngestCheckpoint.leased_until.is_(None), IngestCheckpoint.leased_until < now)
+    ).update({IngestCheckpoint.lease_owner: owner, IngestCheckpoint.leased_until: until}, synchronize_session=False)
+    if not taken:
+        if session.query(IngestCheckpoint.name).filter_by(name=name).first() is not None:
+            return False
+        session.add(IngestCheckpoint(name=name, uid_validity=None, last_uid=0, lease_owner=owner, leased_until=until, updated_at=now))
+    try:
         session.commit()
-        session.refresh(new_entry)
-        return new_entry
+    except IntegrityError:
+        # Another process created the row first, holding the lease
+        session.rollback()
+        return False
+    return True
+
+@db_function
+def release_ingest_lease(session, name: str, owner: str = INGEST_OWNER):
+    session.query(IngestCheckpoint).filter_by(name=name, lease_owner=owner).update(
+        {IngestCheckpoint.leased_until: None}, synchronize_session=False
+    )
+    session.commit()
+
+class CheckpointConflict(Exception):
+    """Raised when another worker moved an ingest checkpoint after it was read."""
+
+def save_ingest_checkpoint(session, name: str, uid_validity: Optional[int], last_uid: int, expected: Optional[dict]):
+    """
+    Moves a checkpoint on from `expected` (what get_ingest_checkpoint
+    returned; None if there was none) with a compare-and-set. Every API
+    process runs an ingest worker, so only the one that still holds the
+    current checkpoint commits a batch (normally the lease holder); the
+    others get CheckpointConflict.
+    """
+    now = datetime.utcnow()
+    if expected is None:
+        try:
+            with session.begin_nested():
+                session.add(IngestCheckpoint(name=name, uid_validity=uid_validity, last_uid=last_uid, updated_at=now))
+        except IntegrityError as e:
+            raise CheckpointConflict(name) from e
+        return
+    moved = session.query(IngestCheckpoint).filter(
+        IngestCheckpoint.name == name,
+        IngestCheckpoint.uid_validity == expected["uid_validity"],
+        IngestCheckpoint.last_uid == expected["last_uid"]
+    ).update({
+        IngestCheckpoint.uid_validity: uid_validity,
+        IngestCheckpoint.last_uid: last_uid,
+        IngestCheckpoint.updated_at: now,
+    }, synchronize_session=False)
+    if not moved:
+        raise CheckpointConflict(name)
+
+@db_function
+def update_entry_processing(session, entry_id: int, processing_status: str, **fields) -> Optional[StandupEntry]:
+    """
+    Moves an entry to a new processing state, optionally filling in the
+    text/summary/audio_url/processing_error produced by the background pipeline.
+    """
+    entry = session.query(StandupEntry).filter_by(id=entry_id).first()
+    if not entry:
+        return None
+    entry.processing_status = processing_status
+    entry.processing_updated_at = datetime.utcnow()
+    for name, value in fields.items():
+        setattr(entry, name, value)
+    if processing_status == 'completed':
+        record_in_digest(session, entry)
+    # Intermediate stages reach open dashboards through the live feed; cached
+    # pages are only invalidated when the entry settles
+    if processing_status in ('completed', 'failed'):
+        bump_team_versions(session, [entry.team_id])
+    queue_feed_event(session, entry, "updated")
+    session.commit()
+    session.refresh(entry)
+    return entry
+
+# --- Daily Digests ---
+def render_digest_fragment(entry: StandupEntry) -> dict:
+    return {
+        "entry_id": entry.id,
+        "user_id": entry.user_id,
+        "created_at": entry.created_at.isoformat(),
+        "summary": entry.summary or "",
+        "audio_url": entry.audio_url,
+    }
+
+def record_in_digest(session, entry: StandupEntry):
+    """
+    Adds (or refreshes) a completed entry in its team's digest for that UTC
+    day, inside the caller's transaction. The digest row is locked so
+    concurrent completions for the same team and day do not lose updates.
+    """
+    day = entry.created_at.date()
+    query = session.query(TeamDailyDigest).filter_by(team_id=entry.team_id, day=day).with_for_update()
+    digest = query.first()
+    if digest is None:
+        try:
+            with session.begin_nested():
+                digest = TeamDailyDigest(team_id=entry.team_id, day=day, entry_count=0, participants=[], fragments=[])
+                session.add(digest)
+        except IntegrityError:
+            # Another worker created today's row first; otherwise the team is gone
+            digest = query.first()
+            if digest is None:
+                raise
+
+    fragment = render_digest_fragment(entry)
+    # Assign new lists (rather than mutating) so the JSON columns are marked dirty
+    fragments = [f for f in digest.fragments or [] if f["entry_id"] != entry.id] + [fragment]
+    fragments.sort(key=lambda f: (f["created_at"], f["entry_id"]))
+    digest.fragments = fragments
+    digest.entry_count = len(fragments)
+    if entry.user_id not in (digest.participants or []):
+        digest.participants = (digest.participants or []) + [entry.user_id]
+    digest.updated_at = datetime.utcnow()
+
+def get_digest_fragments(session, team_id: str, since: datetime) -> List[tuple]:
+    """Returns (day, fragment) pairs for a team's completed entries created at or after `since`."""
+    digests = session.query(TeamDailyDigest).filter(
+        TeamDailyDigest.team_id == team_id,
+        TeamDailyDigest.day >= since.date()
+    ).order_by(TeamDailyDigest.day.asc()).all()
+    cutoff = since.isoformat()
+    return [(digest.day, fragment) for digest in digests for fragment in digest.fragments or [] if fragment["created_at"] >= cutoff]
+
+@db_function
+def get_entry_status(session, entry_id: int, user_id: str) -> dict:
+    """Returns the processing state of an entry visible to the given user."""
+    entry = _get_visible_entry(session, entry_id, user_id)
+    return {
+        "id": entry.id,
+        "team_id": entry.team_id,
+        "processing_status": entry.processing_status,
+        "processing_error": entry.processing_error,
+        "summary": entry.summary if entry.processing_status == 'completed' else None,
+        "audio_url": entry.audio_url,
+        "created_at": entry.created_at.isoformat(),
+    }
         
 # ... (rest of the functions like upload_audio, summarize_text, email processing, etc. remain here)
 # Minor fixes will be applied to them in the next step if needed, but the structure is the focus now.
 
-def upload_audio_to_supabase(audio_bytes, filename):
-    # Upload to the 'audio' bucket (create it in Supabase dashboard if not exists)
-    res = supabase.storage.from_('audio').upload(filename, audio_bytes)
+def upload_audio_to_supabase(audio, filename):
+    """Uploads raw bytes or an AudioBuffer (streamed from its own handle) to storage."""
+    source = audio.source() if isinstance(audio, AudioBuffer) else audio
+    try:
+        # Upload to the 'audio' bucket (create it in Supabase dashboard if not exists)
+        content_type = audio.content_type if isinstance(audio, AudioBuffer) else "audio/wav"
+        with span("supabase.upload"):
+            res = get_supabase().storage.from_('audio').upload(filename, source, {"content-type": content_type})
+    finally:
+        if hasattr(source, "close"):
+            source.close()
     if hasattr(res, "error") and res.error:
         raise Exception(res.error.message if hasattr(res.error, "message") else str(res.error))
     public_url = f"{SUPABASE_URL}/storage/v1/object/public/audio/{filename}"
     return public_url
 
+# --- Inference Cache ---
+# Transcriptions and summaries are stored under sha256(model, prompt version,
+# input), so retried submissions, re-sent audio and quoted email replies skip
+# the Hugging Face call entirely. Bump a version when its prompt/params change.
+WHISPER_CACHE_VERSION = "1"
+SUMMARY_PROMPT_VERSION = "2"
+inference_cache_stats = {
+    kind: {"hits": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+    for kind in ("transcription", "summary")
+}
+# Updated from the pipeline and summarizer threads
+_inference_cache_stats_lock = threading.Lock()
+
+def _count_inference(kind: str, **deltas: int):
+    with _inference_cache_stats_lock:
+        stats = inference_cache_stats[kind]
+        for name, delta in deltas.items():
+            stats[name] += delta
+
+def inference_cache_key(model: str, version: str, payload_digest: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (model.encode(), version.encode(), payload_digest):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+# Inserts add to a running size total, so the table is only summed when the
+# total says it is over the limit or every INFERENCE_CACHE_RESYNC_INSERTS
+# inserts (other processes write to it too). Eviction frees down to
+# INFERENCE_CACHE_LOW_WATER of the limit, so it runs in bursts, not per insert.
+INFERENCE_CACHE_RESYNC_INSERTS = 100
+INFERENCE_CACHE_LOW_WATER = 0.9
+_inference_cache_size = {"bytes": None, "inserts": 0}
+_inference_cache_size_lock = threading.Lock()
+
+def _evict_inference_cache(session, added: int):
+    with _inference_cache_size_lock:
+        size = _inference_cache_size
+        size["inserts"] += 1
+        if size["bytes"] is not None and size["inserts"] < INFERENCE_CACHE_RESYNC_INSERTS:
+            size["bytes"] += added
+            if size["bytes"] <= INFERENCE_CACHE_MAX_BYTES:
+                return
+    total = session.query(func.coalesce(func.sum(InferenceCacheEntry.size), 0)).scalar()
+    if total > INFERENCE_CACHE_MAX_BYTES:
+        to_free = total - int(INFERENCE_CACHE_MAX_BYTES * INFERENCE_CACHE_LOW_WATER)
+        victims = []
+        for key, kind, size in session.query(InferenceCacheEntry.key, InferenceCacheEntry.kind, InferenceCacheEntry.size).order_by(InferenceCacheEntry.last_used_at.asc()).yield_per(500):
+            victims.append(key)
+            _count_inference(kind, evictions=1)
+            to_free -= size
+            total -= size
+            if to_free <= 0:
+                break
+        session.query(InferenceCacheEntry).filter(InferenceCacheEntry.key.in_(victims)).delete(synchronize_session=False)
+    with _inference_cache_size_lock:
+        _inference_cache_size.update(bytes=total, inserts=0)
+
+def cached_inference(kind: str, model: str, version: str, payload_digest: bytes, payload_size: int, compute) -> str:
+    """
+    Returns the cached result for an input (identified by its sha256 digest),
+    or calls `compute()` and stores a non-empty result.
+    """
+    key = inference_cache_key(model, version, payload_digest)
+    with span("db.inference_cache_lookup"), SessionLocal() as session:
+        hit = session.query(InferenceCacheEntry).filter_by(key=key).first()
+        if hit is not None:
+            hit.hits += 1
+            hit.last_used_at = datetime.utcnow()
+            value = hit.value
+            session.commit()
+            _count_inference(kind, hits=1, bytes_saved=hit.input_size)
+            return value
+
+    _count_inference(kind, misses=1)
+    value = compute()
+    if not value:
+        return value
+
+    with SessionLocal() as session:
+        size = len(value.encode()) + len(key)
+        session.add(InferenceCacheEntry(key=key, kind=kind, value=value, input_size=payload_size, size=size))
+        try:
+            session.flush()
+            _evict_inference_cache(session, size)
+            session.commit()
+        except IntegrityError:
+            # A concurrent request stored the same result first
+            session.rollback()
+    return value
+
+def inference_cache_summary() -> dict:
+    summary = {}
+    with _inference_cache_stats_lock:
+        snapshot = {kind: dict(stats) for kind, stats in inference_cache_stats.items()}
+    for kind, stats in snapshot.items():
+        lookups = stats["hits"] + stats["misses"]
+        summary[kind] = {**stats, "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0}
+    return summary
+
+SUMMARY_PROMPT = """You are an assistant summarizing team member updates.\nInput: {input}\n\nTask:\n- Summarize into 2-3 bullet points\n- Include what's done, what's in progress, any blockers\n- Be concise and skip filler words\n\nOutput format:\n- Completed: ...\n- In Progress: ...\n- Blocked: ...\n"""
+
+# Remote (hosted Whisper) or local (faster-whisper) per TRANSCRIPTION_BACKEND
+transcriber = create_transcription_backend(TRANSCRIPTION_BACKEND, huggingface, WHISPER_URL)
+
+def transcribe_audio(audio: AudioBuffer) -> str:
+    with span(f"transcribe.{TRANSCRIPTION_BACKEND}"):
+        return transcriber.transcribe(audio)
+
+# The hosted Mixtral endpoint (TGI) takes a single string as `inputs`, so a
+# batch goes out as one prompt listing every update and asking for a JSON
+# array keyed by update number. Updates whose summary is missing from the
+# parsed answer fall back to a request of their own.
+BATCH_SUMMARY_PROMPT = """You are an assistant summarizing team member updates.\nSummarize each numbered update below separately.\n\n{updates}\n\nTask, for every update:\n- Summarize into 2-3 bullet points\n- Include what's done, what's in progress, any blockers\n- Be concise and skip filler words\n- Format: "- Completed: ...\\n- In Progress: ...\\n- Blocked: ..."\n\nRespond with only a JSON array with one object per update, e.g.\n[{{"id": 1, "summary": "- Completed: ...\\n- In Progress: ...\\n- Blocked: ..."}}]\n"""
+
+def _generate(prompt: str, max_new_tokens: int) -> str:
+    """One text-generation request; returns the generated text, or "" if the call failed."""
+    resp = huggingface.post(
+        LLM_URL,
+        json={
+            "inputs": prompt,
+            "parameters": {"max_new_tokens": max_new_tokens, "return_full_text": False},
+        }
+    )
+    try:
+        payload = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else None
+    except ValueError:
+        payload = None
+    # The Inference API wraps the result in a list; TGI's own /generate does not
+    if isinstance(payload, list):
+        payload = payload[0] if payload else None
+    if resp.status_code != 200 or not isinstance(payload, dict):
+        print(f"LLM summary failed: {resp.status_code} {resp.text[:200]}")
+        return ""
+    return (payload.get("generated_text") or "").strip()
+
+def generate_summary(text: str) -> str:
+    return _generate(SUMMARY_PROMPT.format(input=text), 120)
+
+def parse_batch_summaries(output: str, count: int) -> List[str]:
+    """Reads the JSON array BATCH_SUMMARY_PROMPT asks for; "" for every update it does not cover."""
+    summaries = [""] * count
+    start, end = output.find("["), output.rfind("]")
+    try:
+        items = json.loads(output[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        items = None
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and isinstance(item.get("summary"), str):
+            index = item.get("id")
+            if isinstance(index, int) and 1 <= index <= count:
+                summaries[index - 1] = item["summary"].strip()
+    return summaries
+
+def generate_summaries(texts: List[str]) -> List[str]:
+    """Summarizes a micro-batch of updates with one multi-update request (see BATCH_SUMMARY_PROMPT)."""
+    if len(texts) == 1:
+        return [generate_summary(texts[0])]
+    updates = "\n\n".join(f"Update {i}:\n{text}" for i, text in enumerate(texts, 1))
+    summaries = parse_batch_summaries(_generate(BATCH_SUMMARY_PROMPT.format(updates=updates), 120 * len(texts)), len(texts))
+    missing = [i for i, summary in enumerate(summaries) if not summary]
+    if missing:
+        print(f"LLM batch answer covered {len(texts) - len(missing)} of {len(texts)} updates; summarizing the rest one by one.")
+        for i in missing:
+            summaries[i] = generate_summary(texts[i])
+    return summaries
+
+summary_batcher = MicroBatcher(
+    generate_summaries,
+    max_batch_size=SUMMARY_BATCH_SIZE,
+    max_wait=SUMMARY_BATCH_WAIT_MS / 1000,
+    max_concurrent_batches=HF_MAX_CONCURRENCY,
+    name="summary-batcher",
+)
+
+def llm_summary(text: str) -> str:
+    encoded = text.encode()
+    return cached_inference(
+        "summary", LLM_URL, SUMMARY_PROMPT_VERSION, hashlib.sha256(encoded).digest(), len(encoded),
+        lambda: summary_batcher(text)
+    )
+
+# Mixtral while it answers within the budget, the local extractive summary
+# otherwise, so every entry gets a summary in bounded time.
+extractive_summarizer = ExtractiveSummarizer()
+summary_router = TieredSummarizer(
+    llm_summary,
+    extractive_summarizer.summarize,
+    budget=SUMMARY_LATENCY_BUDGET_MS / 1000,
+    health=ProviderHealth("mixtral", failure_threshold=SUMMARY_FAILURE_THRESHOLD, cooldown=SUMMARY_COOLDOWN_SECONDS),
+    max_workers=HF_MAX_CONCURRENCY * SUMMARY_BATCH_SIZE,
+    name="summary-router",
+)
+
+def summarize_update(text: str) -> str:
+    with span(f"summarize.{SUMMARY_ENGINE}"):
+        if SUMMARY_ENGINE == "extractive":
+            return extractive_summarizer.summarize(text)
+        if SUMMARY_ENGINE == "llm":
+            return llm_summary(text)
+        return summary_router.summarize(text)
+
 def summarize_text(input_data, is_audio=False, summarize=False, audio_url=None):
     if is_audio:
-        resp = requests.post(
-            WHISPER_URL,
-            headers={"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {},
-            files={"file": ("audio.wav", input_data, "audio/wav")}
+        audio = input_data if isinstance(input_data, AudioBuffer) else AudioBuffer.from_bytes(input_data)
+        return cached_inference(
+            "transcription", transcriber.model_id, WHISPER_CACHE_VERSION, audio.sha256, audio.size,
+            lambda: transcribe_audio(audio)
         )
-        return resp.json().get("text", "")
     elif summarize:
-        prompt = f"""You are an assistant summarizing team member updates.\nInput: {input_data}\n\nTask:\n- Summarize into 2-3 bullet points\n- Include what's done, what's in progress, any blockers\n- Be concise and skip filler words\n\nOutput format:\n- Completed: ...\n- In Progress: ...\n- Blocked: ...\n"""
-        resp = requests.post(
-            LLM_URL,
-            headers={"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {},
-            json={"inputs": prompt, "parameters": {"max_new_tokens": 120}}
-        )
-        return resp.json().get("generated_text", "")
+        return summarize_update(str(input_data))
     else:
         return input_data
 
@@ -145,12 +1032,8 @@ def fetch_today_entries():
 def send_email():
     entries = fetch_today_entries()
     body = "\n\n".join([f"{e.name}:\n{e.summary}" for e in entries])
-    resp = requests.post(
-        "https://api.resend.com/emails",
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json"
-        },
+    resp = resend.post(
+        "/emails",
         json={
             "from": os.getenv("FROM_EMAIL"),
             "to": [os.getenv("REPORT_EMAIL")],
@@ -161,147 +1044,409 @@ def send_email():
     return {"status": resp.status_code, "body": body}
 
 # --- Email Reply Processing ---
+# Replies are read by UID from a stored checkpoint, summarized on a bounded
+# pool and inserted in bulk. email_ingest.EmailIngestWorker runs this on
+# every IMAP IDLE wake-up; in 'poll' mode the hourly job calls it instead.
+# A reply that can never be stored (unknown sender, no team, or a summary
+# that failed EMAIL_INGEST_MAX_ATTEMPTS runs in a row) is dead-lettered:
+# left unread and flagged in the mailbox, and the checkpoint moves past it.
+EMAIL_INGEST_MODE = os.getenv("EMAIL_INGEST_MODE", "idle") # 'idle' (push worker) or 'poll' (hourly)
+EMAIL_INGEST_WORKERS = int(os.getenv("EMAIL_INGEST_WORKERS", "8"))
+EMAIL_INGEST_BATCH = int(os.getenv("EMAIL_INGEST_BATCH", "50"))
+EMAIL_INGEST_MAX_ATTEMPTS = int(os.getenv("EMAIL_INGEST_MAX_ATTEMPTS", "3"))
+IMAP_FOLDER = "INBOX"
+email_executor = ThreadPoolExecutor(max_workers=EMAIL_INGEST_WORKERS, thread_name_prefix="email-ingest")
+
+def imap_checkpoint_name() -> str:
+    return f"imap:{IMAP_USERNAME}@{IMAP_SERVER}/{IMAP_FOLDER}"
+
+# Failed summaries per (UIDVALIDITY, UID), counted across runs of this process
+_reply_failures: Dict[tuple, int] = {}
+
+def reply_sender(msg) -> str:
+    return (msg.from_ or "").strip().lower()
+
+def resolve_reply_senders(addresses: Iterable[str]) -> Dict[str, dict]:
+    """
+    Maps reply sender addresses (lower-cased) to the {"user_id", "team_id"}
+    their entry is filed under. A member of several teams gets the team they
+    last posted to, else the one they joined first. Addresses of unknown
+    users, or of users in no team, are left out.
+    """
+    users = lookup_users_by_email(sorted({address for address in addresses if address}))
+    if not users:
+        return {}
+    with SessionLocal() as session:
+        memberships = session.query(TeamMember.user_id, TeamMember.team_id).filter(
+            TeamMember.user_id.in_(set(users.values()))
+        ).order_by(TeamMember.created_at, TeamMember.team_id).all()
+        teams: Dict[str, List[str]] = {}
+        for user_id, team_id in memberships:
+            teams.setdefault(user_id, []).append(team_id)
+        chosen = {}
+        for user_id, team_ids in teams.items():
+            latest = None
+            if len(team_ids) > 1:
+                latest = session.query(StandupEntry.team_id).filter(
+                    StandupEntry.user_id == user_id,
+                    StandupEntry.team_id.in_(team_ids)
+                ).order_by(StandupEntry.created_at.desc()).limit(1).scalar()
+            chosen[user_id] = latest or team_ids[0]
+    return {address: {"user_id": user_id, "team_id": chosen[user_id]} for address, user_id in users.items() if user_id in chosen}
+
+def _reply_to_entry(msg, sender: dict) -> Optional[dict]:
+    standup_text = msg.text or msg.html
+    if not standup_text:
+        return None
+    summary = summarize_text(standup_text, is_audio=False, summarize=True) or "No summary available."
+    return {**sender, "text": standup_text, "summary": summary, "audio_url": None}
+
+def ingest_mailbox(mailbox) -> int:
+    """
+    Logs every reply newer than the stored UID checkpoint, EMAIL_INGEST_BATCH
+    messages at a time; each batch and its checkpoint commit together.
+    Returns the number of entries created.
+
+    The checkpoint only moves past replies that were stored or
+    dead-lettered: one that fails to summarize ends the run and is retried,
+    with the rest after it, on the next wake-up. Replies are marked read
+    only once committed. Returns 0 without fetching anything while another
+    process holds the ingest lease.
+    """
+    name = imap_checkpoint_name()
+    if not acquire_ingest_lease(name):
+        return 0
+    try:
+        return _ingest_leased_mailbox(mailbox, name)
+    finally:
+        release_ingest_lease(name)
+
+def _ingest_leased_mailbox(mailbox, name: str) -> int:
+    from imap_tools import MailMessageFlags
+    from imap_tools.query import A, U
+    uid_validity = mailbox.folder.status(IMAP_FOLDER, ["UIDVALIDITY"])["UIDVALIDITY"]
+    checkpoint = get_ingest_checkpoint(name)
+    if checkpoint is None or checkpoint["uid_validity"] != uid_validity:
+        # First run, or the server renumbered the mailbox: only unread mail is new
+        last_uid, unread_only = 0, True
+    else:
+        last_uid, unread_only = checkpoint["last_uid"], False
+
+    created, renew = 0, False
+    while True:
+        # Each later batch renews the lease, so a long catch-up keeps it
+        if renew and not acquire_ingest_lease(name):
+            print("Lost the email ingest lease; stopping this run.")
+            return created
+        renew = True
+        uids = U(str(last_uid + 1), "*")
+        criteria = A(seen=False, uid=uids) if unread_only else A(uid=uids)
+        fetched = list(mailbox.fetch(criteria, limit=EMAIL_INGEST_BATCH, mark_seen=False, bulk=True))
+        # "N:*" always matches the newest message, even when its UID is below N
+        messages = sorted((msg for msg in fetched if int(msg.uid) > last_uid), key=lambda msg: int(msg.uid))
+        if not messages:
+            return created
+        print(f"Processing {len(messages)} email replies...")
+        senders = resolve_reply_senders(reply_sender(msg) for msg in messages)
+        futures = []
+        for msg in messages:
+            sender = senders.get(reply_sender(msg))
+            futures.append(email_executor.submit(_reply_to_entry, msg, sender) if sender else None)
+        entries, handled, dead, failed = [], [], [], False
+        for msg, future in zip(messages, futures):
+            if future is None:
+                print(f"Dead-lettering reply {msg.uid} from {msg.from_}: not a member of any team")
+                dead.append(msg.uid)
+                handled.append(msg.uid)
+                continue
+            key = (uid_validity, msg.uid)
+            try:
+                entry = future.result()
+            except Exception as e:
+                attempts = _reply_failures[key] = _reply_failures.get(key, 0) + 1
+                if attempts < EMAIL_INGEST_MAX_ATTEMPTS:
+                    print(f"Could not summarize reply {msg.uid} from {msg.from_} (attempt {attempts}): {e}")
+                    failed = True
+                    break
+                print(f"Dead-lettering reply {msg.uid} from {msg.from_} after {attempts} failed summaries: {e}")
+                _reply_failures.pop(key, None)
+                dead.append(msg.uid)
+                handled.append(msg.uid)
+                continue
+            _reply_failures.pop(key, None)
+            if entry:
+                entries.append(entry)
+            handled.append(msg.uid)
+        for future in futures:
+            if future is not None:
+                future.cancel()
+
+        if handled:
+            saved = {"uid_validity": uid_validity, "last_uid": int(handled[-1])}
+            try:
+                created += log_entries_bulk(entries, checkpoint={"name": name, **saved, "expected": checkpoint})
+            except CheckpointConflict:
+                print("Email replies were ingested by another worker; stopping this run.")
+                return created
+            checkpoint, last_uid = saved, saved["last_uid"]
+            stored = [uid for uid in handled if uid not in dead]
+            if stored:
+                mailbox.flag(stored, MailMessageFlags.SEEN, True)
+            if dead:
+                mailbox.flag(dead, MailMessageFlags.FLAGGED, True)
+        if failed or len(fetched) < EMAIL_INGEST_BATCH:
+            return created
+
 def process_email_replies():
-    """Connects to an IMAP inbox, processes unread standup replies, and logs them."""
+    """Connects to the IMAP inbox once and logs any replies received since the last checkpoint."""
     print("Checking for email replies...")
     if not IMAP_SERVER or not IMAP_USERNAME or not IMAP_PASSWORD:
         print("IMAP credentials are not set. Skipping email processing.")
         return
+    from imap_tools.mailbox import MailBox
     try:
-        with MailBox(IMAP_SERVER).login(IMAP_USERNAME, IMAP_PASSWORD, 'INBOX') as mailbox:
-            for msg in mailbox.fetch(A(seen=False)): # Fetch unread messages
-                sender_email = msg.from_
-                standup_text = msg.text or msg.html
-
-                if not standup_text:
-                    continue
-
-                # Find the user by their email
-                with SessionLocal() as session:
-                    # This requires a 'users' table or a way to resolve email to user_id
-                    # For now, we'll assume the email is the identifier
-                    # In a real app, you'd look up the user in your Clerk/Supabase user table
-                    user_id = sender_email # Placeholder
-                    # You might also need to determine the team, perhaps from the subject or a default team
-                    team_id = "default-team-id" # Placeholder
-                    print(f"Processing standup from {sender_email}...")
-                    summary = summarize_text(standup_text, is_audio=False, summarize=True) or "No summary available."
-                    log_to_db(user_id, standup_text, summary, None, team_id)
+        with MailBox(IMAP_SERVER).login(IMAP_USERNAME, IMAP_PASSWORD, IMAP_FOLDER) as mailbox:
+            ingest_mailbox(mailbox)
     except Exception as e:
         print(f"Error processing email replies: {e}")
 
+RESEND_BATCH_SIZE = 100  # Resend's /emails/batch limit
+
+def _reminder_payload(user_email: str) -> dict:
+    # Simplified reminder that just asks the user to reply
+    return {
+        "from": f"RemoteSync <{IMAP_USERNAME}>",
+        "to": [user_email],
+        "subject": "👋 Time for your daily standup!",
+        "html": "<p>Hey! Just reply to this email with your update for today. We'll take care of the rest.</p>",
+    }
+
 def send_reminder_email(user_email: str):
     """Sends a daily standup reminder email."""
-    # Simplified reminder that just asks the user to reply
-    return requests.post(
-        "https://api.resend.com/emails",
-        headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
-        json={
-            "from": f"RemoteSync <{IMAP_USERNAME}>",
-            "to": [user_email],
-            "subject": "👋 Time for your daily standup!",
-            "html": "<p>Hey! Just reply to this email with your update for today. We'll take care of the rest.</p>",
-        }
-    )
+    return resend.post("/emails", json=_reminder_payload(user_email))
+
+def send_reminder_emails(user_emails: List[str]) -> dict:
+    """
+    Sends reminders through Resend's batch endpoint, RESEND_BATCH_SIZE per
+    request, with the batches going out concurrently.
+    """
+    chunks = [user_emails[i:i + RESEND_BATCH_SIZE] for i in range(0, len(user_emails), RESEND_BATCH_SIZE)]
+
+    def send_chunk(chunk):
+        try:
+            resp = resend.post("/emails/batch", json=[_reminder_payload(email) for email in chunk])
+            if resp.status_code == 200:
+                return len(chunk), 0
+            print(f"Resend batch of {len(chunk)} reminders failed: {resp.status_code} {resp.text}")
+        except Exception as e:
+            print(f"Error sending batch of {len(chunk)} reminders: {e}")
+        return 0, len(chunk)
+
+    sent = failed = 0
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(RESEND_MAX_CONCURRENCY, len(chunks))) as pool:
+            for ok, bad in pool.map(send_chunk, chunks):
+                sent += ok
+                failed += bad
+    return {"sent": sent, "failed": failed, "batches": len(chunks)}
+
+def find_missing_submitters(since: datetime) -> Dict[str, List[str]]:
+    """
+    Returns {user_id: [team names]} for every team member without an entry in
+    that team since `since`, computed with a single anti-join.
+    """
+    with SessionLocal() as session:
+        submitted = session.query(StandupEntry.id).filter(
+            StandupEntry.team_id == TeamMember.team_id,
+            StandupEntry.user_id == TeamMember.user_id,
+            StandupEntry.created_at >= since
+        ).exists()
+        rows = session.query(TeamMember.user_id, Team.name).join(
+            Team, Team.id == TeamMember.team_id
+        ).filter(~submitted).all()
+
+    missing: Dict[str, List[str]] = {}
+    for user_id, team_name in rows:
+        missing.setdefault(user_id, []).append(team_name)
+    return missing
 
 def process_daily_reminders():
     """
-    Checks for email replies first, then sends reminders to users who have not
-    submitted an update today.
+    Checks for email replies first (in 'poll' mode), then sends one reminder to
+    every user who has not submitted an update today in at least one of their teams.
     """
-    process_email_replies()  # Check for replies first
+    if EMAIL_INGEST_MODE == "poll":
+        process_email_replies()  # Check for replies first
 
     print("Processing daily reminders...")
-    with SessionLocal() as session:
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Get all teams
-        teams = session.query(Team).all()
-        for team in teams:
-            # Get users in the team who have NOT submitted today
-            users_submitted_today = {
-                entry.user_id for entry in session.query(StandupEntry.user_id)
-                .filter(StandupEntry.team_id == team.id, StandupEntry.created_at >= today_start)
-                .distinct()
-            }
-            
-            for member in team.members:
-                if member.user_id not in users_submitted_today:
-                    try:
-                        user_info = clerk.users.get_user(user_id=member.user_id)
-                        # The user object might have multiple emails, we get the primary one
-                        primary_email_id = user_info.primary_email_address_id
-                        user_email_obj = next((e for e in user_info.email_addresses if e.id == primary_email_id), None)
-
-                        if user_email_obj:
-                            user_email = user_email_obj.email_address
-                            print(f"Sending reminder to {user_email} for team {team.name}")
-                            send_reminder_email(user_email)
-                        else:
-                            print(f"Could not find primary email for user {member.user_id}")
-                    except Exception as e:
-                        print(f"Error fetching user {member.user_id} from Clerk or sending email: {e}") 
-
-def get_dashboard_data(user_id: str):
-    """
-    Fetches all necessary data for a user's dashboard.
+    started = perf_counter()
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    missing = find_missing_submitters(today_start)
+    query_done = perf_counter()
+
+    try:
+        profiles = get_user_profiles(missing)
+    except Exception as e:
+        print(f"Error fetching users from Clerk, skipping reminders: {e}")
+        return
+    lookup_done = perf_counter()
+
+    emails, no_email = [], 0
+    for user_id in missing:
+        profile = profiles.get(user_id)
+        if not profile or not profile["email"]:
+            print(f"Could not find primary email for user {user_id}")
+            no_email += 1
+            continue
+        emails.append(profile["email"])
+    # Several Clerk users can share an address; remind each inbox once
+    emails = list(dict.fromkeys(emails))
+
+    result = send_reminder_emails(emails)
+    finished = perf_counter()
+    stage_seconds.observe(query_done - started, stage="reminders.query")
+    stage_seconds.observe(lookup_done - query_done, stage="reminders.lookup")
+    stage_seconds.observe(finished - lookup_done, stage="reminders.send")
+
+    summary = {
+        "missing_memberships": sum(len(teams) for teams in missing.values()),
+        "users": len(missing),
+        "no_email": no_email,
+        **result,
+        "query_seconds": round(query_done - started, 3),
+        "lookup_seconds": round(lookup_done - query_done, 3),
+        "send_seconds": round(finished - lookup_done, 3),
+        "total_seconds": round(finished - started, 3),
+    }
+    print(f"Daily reminders done: {summary}")
+    return summary
+
+DASHBOARD_WINDOW_DAYS = 7
+DASHBOARD_PAGE_SIZE = 20
+DASHBOARD_MAX_PAGE_SIZE = 100
+
+def _dashboard_cutoff() -> datetime:
+    """
+    Oldest created_at the feed shows. It moves once an hour, not continuously,
+    so a page only changes with its teams' versions or on the hour, and
+    dashboard_etag can include it.
+    """
+    return datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=DASHBOARD_WINDOW_DAYS)
+
+# The feed never carries the full transcript; it is served by get_entry_detail()
+FEED_COLUMNS = (
+    StandupEntry.id,
+    StandupEntry.user_id,
+    StandupEntry.team_id,
+    StandupEntry.summary,
+    StandupEntry.audio_url,
+    StandupEntry.processing_status,
+    StandupEntry.created_at,
+)
+
+def encode_cursor(created_at: datetime, entry_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), entry_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+def _user_info(profile: Optional[dict]) -> dict:
+    if not profile:
+        return {}
+    return {"first_name": profile["first_name"], "last_name": profile["last_name"], "image_url": profile["image_url"]}
+
+def get_dashboard_data(user_id: str, team_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = DASHBOARD_PAGE_SIZE):
+    """
+    Fetches one page of a user's dashboard.
     - List of teams the user belongs to.
-    - Recent standup entries for those teams (last 7 days).
+    - Recent standup entries (last 7 days), newest first, optionally for one
+      team only. Pages are keyed on (created_at, id); pass back `next_cursor`
+      to get the next page.
     """
+    return _load_dashboard(user_id, team_id, cursor, limit)[0]
+
+def _load_dashboard(user_id: str, team_id: Optional[str], cursor: Optional[str], limit: int) -> tuple:
+    """Returns (page, complete); complete is False if the Clerk lookup failed, so the page must not be cached."""
+    limit = max(1, min(limit, DASHBOARD_MAX_PAGE_SIZE))
     with SessionLocal() as session:
         # Find all teams the user is a member of
-        team_memberships = session.query(TeamMember).filter(TeamMember.user_id == user_id).all()
-        team_ids = [tm.team_id for tm in team_memberships]
+        teams = session.query(Team.id, Team.name, Team.settings).join(
+            TeamMember, TeamMember.team_id == Team.id
+        ).filter(TeamMember.user_id == user_id).all()
+        team_ids = [t.id for t in teams]
+        teams_payload = [{"id": t.id, "name": t.name, "settings": t.settings} for t in teams]
 
-        if not team_ids:
-            return {"teams": [], "entries": []}
+        if team_id is not None:
+            if team_id not in team_ids:
+                raise PermissionError("You are not a member of this team.")
+            team_ids = [team_id]
 
-        # Get team details
-        teams = session.query(Team).filter(Team.id.in_(team_ids)).all()
+        if not team_ids:
+            return {"teams": teams_payload, "entries": [], "next_cursor": None}, True
 
-        # Get recent standup entries for these teams (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        entries = session.query(StandupEntry).filter(
+        query = session.query(*FEED_COLUMNS).filter(
             StandupEntry.team_id.in_(team_ids),
-            StandupEntry.created_at >= seven_days_ago
-        ).order_by(StandupEntry.created_at.desc()).all()
-
-        # To enrich entries with user details, we'll fetch them from Clerk
-        # This is more efficient than calling Clerk inside a loop
-        user_ids_from_entries = {e.user_id for e in entries}
-        users_info = {}
-        if user_ids_from_entries:
-            try:
-                clerk_users = clerk.users.get_user_list(user_id=list(user_ids_from_entries))
-                for user in clerk_users:
-                    users_info[user.id] = {
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                        "image_url": user.image_url,
-                    }
-            except Exception as e:
-                print(f"Error fetching batch user data from Clerk: {e}")
+            StandupEntry.created_at >= _dashboard_cutoff()
+        )
+        if cursor:
+            query = query.filter(tuple_(StandupEntry.created_at, StandupEntry.id) < decode_cursor(cursor))
+        rows = query.order_by(StandupEntry.created_at.desc(), StandupEntry.id.desc()).limit(limit + 1).all()
 
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-        # Combine entries with user info
-        enriched_entries = []
-        for entry in entries:
-            user_data = users_info.get(entry.user_id, {})
-            enriched_entries.append({
-                "id": entry.id,
-                "user_id": entry.user_id,
-                "team_id": entry.team_id,
-                "text": entry.text,
-                "summary": entry.summary,
-                "audio_url": entry.audio_url,
-                "created_at": entry.created_at.isoformat(),
-                "user_info": user_data
-            })
-
-        return {
-            "teams": [{"id": t.id, "name": t.name, "settings": t.settings} for t in teams],
-            "entries": enriched_entries
-        } 
+    # Enrich entries with user details from the shared Clerk profile cache
+    complete = True
+    try:
+        profiles = get_user_profiles(row.user_id for row in rows)
+    except Exception as e:
+        print(f"Error fetching batch user data from Clerk: {e}")
+        profiles, complete = {}, False
+
+    entries = [{
+        "id": row.id,
+        "user_id": row.user_id,
+        "team_id": row.team_id,
+        "summary": row.summary,
+        "audio_url": row.audio_url,
+        "processing_status": row.processing_status,
+        "created_at": row.created_at.isoformat(),
+        "user_info": _user_info(profiles.get(row.user_id))
+    } for row in rows]
+
+    return {
+        "teams": teams_payload,
+        "entries": entries,
+        "next_cursor": encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    }, complete
+
+def _get_visible_entry(session, entry_id: int, user_id: str) -> StandupEntry:
+    entry = session.query(StandupEntry).filter_by(id=entry_id).first()
+    if not entry:
+        raise ValueError("Entry not found.")
+    is_member = session.query(TeamMember).filter_by(team_id=entry.team_id, user_id=user_id).first()
+    if entry.user_id != user_id and not is_member:
+        raise ValueError("Entry not found.")
+    return entry
+
+def get_entry_detail(entry_id: int, user_id: str) -> dict:
+    """Returns a single entry including its full transcript."""
+    with SessionLocal() as session:
+        entry = _get_visible_entry(session, entry_id, user_id)
+        detail = {c.name: getattr(entry, c.name) for c in entry.__table__.columns}
+    detail["created_at"] = detail["created_at"].isoformat()
+    try:
+        detail["user_info"] = _user_info(get_user_profile(detail["user_id"]))
+    except Exception as e:
+        print(f"Error fetching user data from Clerk: {e}")
+        detail["user_info"] = {}
+    return detail
 
 def invite_users_to_team(team_id: str, emails: List[str]):
     """Creates invites and sends emails via Resend."""
@@ -317,9 +1462,8 @@ def invite_users_to_team(team_id: str, emails: List[str]):
     invite_link = f"{os.getenv('FRONTEND_URL', 'http://localhost:3000')}/accept-invite?token={team.invite_token}"
     html_body = f"<p>You've been invited to join <strong>{team.name}</strong>!</p><p>Click here to accept: <a href='{invite_link}'>{invite_link}</a></p>"
 
-    response = requests.post(
-        "https://api.resend.com/emails",
-        headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
+    response = resend.post(
+        "/emails",
         json={
             "from": f"RemoteSync <invites@{os.getenv('RESEND_DOMAIN', 'yourdomain.com')}>",
             "to": emails,
@@ -337,240 +1481,559 @@ def is_team_owner(session, user_id: str, team_id: str) -> bool:
     team = session.query(Team).filter_by(id=team_id, owner_id=user_id).first()
     return team is not None
 
-def update_team_settings_in_db(team_id: str, settings_data: TeamSettingsUpdate, user_id: str) -> Team:
+@db_function
+def is_team_member(session, team_id: str, user_id: str) -> bool:
+    return session.query(TeamMember.user_id).filter_by(team_id=team_id, user_id=user_id).first() is not None
+
+@db_function
+def update_team_settings_in_db(session, team_id: str, settings_data: TeamSettingsUpdate, user_id: str) -> Team:
     """Updates a team's settings and/or report recipients if the user is the owner."""
-    with SessionLocal() as session:
-        team = session.query(Team).filter_by(id=team_id).first()
-        if not team:
-            raise ValueError("Team not found.")
-        if str(team.owner_id) != str(user_id):
-            raise PermissionError("Only the team owner can update settings.")
-        # Update settings if provided
-        if settings_data.settings is not None:
-            updated_settings = team.settings.copy() if team.settings else {}
-            updated_settings.update(settings_data.settings)
-            team.settings = updated_settings
-        # Update report recipients if provided
-        if settings_data.report_recipients is not None:
-            team.report_recipients = list(settings_data.report_recipients)
-        session.commit()
-        session.refresh(team)
-        return team
+    team = session.query(Team).filter_by(id=team_id).first()
+    if not team:
+        raise ValueError("Team not found.")
+    if str(team.owner_id) != str(user_id):
+        raise PermissionError("Only the team owner can update settings.")
+    previous_settings = dict(team.settings or {})
+    # Update settings if provided
+    if settings_data.settings is not None:
+        updated_settings = team.settings.copy() if team.settings else {}
+        updated_settings.update(settings_data.settings)
+        team.settings = updated_settings
+    # Update report recipients if provided
+    if settings_data.report_recipients is not None:
+        team.report_recipients = list(settings_data.report_recipients)
+    # Only a change of report time moves the schedule; rescheduling from now
+    # on any edit would skip a report that is due or being retried
+    if settings_data.settings is not None:
+        old, new = previous_settings, team.settings or {}
+        time_changed = any(old.get(key) != new.get(key) for key in ("summaryTime", "timezone"))
+        if time_changed or old.get("weeklyReportDay") != new.get("weeklyReportDay"):
+            schedule_team_reports(team, datetime.utcnow(), daily=time_changed, weekly=True)
+    bump_team_versions(session, [team_id])
+    session.commit()
+    session.refresh(team)
+    return team
 
-def accept_invite(token: str, user_id: str) -> Team:
+@db_function
+def accept_invite(session, token: str, user_id: str) -> Team:
     """
     Validates an invite token and adds the user to the team.
     Returns the team information upon successful joining.
     """
-    with SessionLocal() as session:
-        # Find the team associated with the invite token
-        team = session.query(Team).filter(Team.invite_token == token).first()
+    # Find the team associated with the invite token
+    team = session.query(Team).filter(Team.invite_token == token).first()
 
-        if not team:
-            raise ValueError("Invalid or expired invitation token.")
+    if not team:
+        raise ValueError("Invalid or expired invitation token.")
 
-        # Check if the user is already a member
-        existing_member = session.query(TeamMember).filter(
-            TeamMember.team_id == team.id,
-            TeamMember.user_id == user_id
-        ).first()
+    # Check if the user is already a member
+    existing_member = session.query(TeamMember).filter(
+        TeamMember.team_id == team.id,
+        TeamMember.user_id == user_id
+    ).first()
 
-        if existing_member:
-            # User is already in the team, so it's a success in a way.
-            return team
+    if existing_member:
+        # User is already in the team, so it's a success in a way.
+        return team
 
-        # Add the new member to the team
-        new_member = TeamMember(team_id=team.id, user_id=user_id, role='member')
-        session.add(new_member)
-        session.commit()
-        session.refresh(team)
+    # Add the new member to the team
+    new_member = TeamMember(team_id=team.id, user_id=user_id, role='member')
+    session.add(new_member)
+    bump_team_versions(session, [team.id], members=True)
+    session.commit()
+    session.refresh(team)
 
-        return team 
+    return team 
 
-def generate_daily_report(team_id: str) -> Optional[str]:
+def _report_items(fragments: List[tuple]) -> List[tuple]:
+    """Pairs each digest fragment's day with a renderer item, resolving names in one batch."""
+    users_info = get_user_profiles(fragment["user_id"] for _, fragment in fragments)
+    return [
+        (day, {
+            "name": display_name(users_info.get(fragment["user_id"])),
+            "summary": fragment["summary"],
+            "audio_url": fragment.get("audio_url"),
+        })
+        for day, fragment in fragments
+    ]
+
+def build_daily_report(team_id: str) -> Optional[Report]:
+    """Collects a team's entries from the last 24 hours (via its daily digests); None if there are none."""
+    with SessionLocal() as session:
+        fragments = get_digest_fragments(session, team_id, datetime.utcnow() - timedelta(days=1))
+    if not fragments:
+        return None
+    items = [item for _, item in _report_items(fragments)]
+    return Report("Daily Standup Summary", [(None, items)], divide="items")
+
+def generate_daily_report(team_id: str, fmt: str = "html") -> Optional[str]:
     """
-    Generates an HTML report for a team's standup entries over the last 24 hours.
-    Returns the HTML string or None if no entries are found.
+    Renders the daily report as 'html', 'text' or 'slack' markdown.
+    Returns None if there are no entries.
     """
-    with SessionLocal() as session:
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        entries = session.query(StandupEntry).filter(
-            StandupEntry.team_id == team_id,
-            StandupEntry.created_at >= yesterday
-        ).order_by(StandupEntry.created_at.asc()).all()
-        if not entries:
-            return None
-        # Fetch user info for all participants in a single batch
-        user_ids = list(set(entry.user_id for entry in entries))
-        users_info = {user.id: user for user in clerk.users.get_user_list(user_id=user_ids)}
-        html_content = "<h1>Daily Standup Summary</h1>"
-        for entry in entries:
-            user = users_info.get(entry.user_id)
-            user_name = f"{user.first_name} {user.last_name}" if user else "Unknown User"
-            html_content += f"<h3>{user_name}</h3>"
-            html_content += f"<blockquote>{entry.summary.replace(chr(10), '<br>')}</blockquote>"
-            if getattr(entry, "audio_url", None):
-                html_content += f"<p><a href='{entry.audio_url}'>Listen to audio update</a></p>"
-            html_content += "<hr>"
-        return html_content
+    report = build_daily_report(team_id)
+    return render_report(report, fmt) if report else None
 
-def process_daily_reports():
+# --- Report Scheduling ---
+# Each team stores its next daily/weekly report time as an indexed UTC column,
+# so a scheduler tick only touches the teams that are actually due.
+# A claimed team is leased for REPORT_LEASE_SECONDS and only moves on to its
+# next report time once the send succeeded; failed sends are retried with
+# backoff, up to REPORT_MAX_ATTEMPTS.
+REPORT_LEASE_SECONDS = int(os.getenv("REPORT_LEASE_SECONDS", "900"))
+REPORT_RETRY_SECONDS = int(os.getenv("REPORT_RETRY_SECONDS", "300"))
+REPORT_MAX_ATTEMPTS = int(os.getenv("REPORT_MAX_ATTEMPTS", "5"))
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_UTC_OFFSET_RE = re.compile(r"^(?:UTC|GMT)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$", re.IGNORECASE)
+
+def team_timezone(settings: Optional[dict]) -> tzinfo:
+    """Parses settings["timezone"] as an IANA name or a 'GMT-5'/'UTC+05:30' offset; defaults to UTC."""
+    name = ((settings or {}).get("timezone") or "UTC").strip()
+    match = _UTC_OFFSET_RE.match(name)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-offset if sign == "-" else offset)
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return timezone.utc
+
+def _report_time(settings: Optional[dict]) -> time:
+    try:
+        hour, minute = ((settings or {}).get("summaryTime") or "17:00").split(":")[:2]
+        return time(int(hour), int(minute))
+    except ValueError:
+        return time(17, 0)
+
+def next_report_time(settings: Optional[dict], after: datetime, weekday: Optional[str] = None) -> datetime:
     """
-    Iterates through teams, generates daily reports for those who are due,
-    and sends them to the configured recipients.
+    Returns the first report time strictly after `after` (naive UTC) in the
+    team's timezone, optionally restricted to a weekday. Result is naive UTC.
     """
-    print("Processing daily reports...")
+    tz = team_timezone(settings)
+    local_after = after.replace(tzinfo=timezone.utc).astimezone(tz)
+    report_time = _report_time(settings)
+    day = local_after.date()
+    for _ in range(8):
+        candidate = datetime.combine(day, report_time, tzinfo=tz)
+        if candidate > local_after and (weekday is None or WEEKDAYS[day.weekday()] == weekday):
+            return candidate.astimezone(timezone.utc).replace(tzinfo=None)
+        day += timedelta(days=1)
+    raise ValueError(f"Invalid weekly report day: {weekday}")
+
+def _weekly_report_day(settings: Optional[dict]) -> str:
+    day = (settings or {}).get("weeklyReportDay", "Friday")
+    return day if day in WEEKDAYS else "Friday"
+
+def schedule_team_reports(team: Team, now: datetime, daily: bool = True, weekly: bool = True):
+    if daily:
+        team.next_daily_report_at = next_report_time(team.settings, now)
+        team.daily_report_attempts = 0
+    if weekly:
+        team.next_weekly_report_at = next_report_time(team.settings, now, weekday=_weekly_report_day(team.settings))
+        team.weekly_report_attempts = 0
+
+def _schedule_columns(kind: str) -> tuple:
+    if kind == "daily":
+        return Team.next_daily_report_at, Team.daily_report_attempts
+    return Team.next_weekly_report_at, Team.weekly_report_attempts
+
+def schedule_unscheduled_teams(now: Optional[datetime] = None) -> int:
+    """Backfills next report times for teams created before they were tracked."""
+    now = now or datetime.utcnow()
     with SessionLocal() as session:
-        teams = session.query(Team).all()
+        teams = session.query(Team).filter(
+            (Team.next_daily_report_at.is_(None)) | (Team.next_weekly_report_at.is_(None))
+        ).all()
         for team in teams:
-            report_time_str = team.settings.get("summaryTime", "17:00")
-            report_hour = int(report_time_str.split(":")[0])
-            if datetime.utcnow().hour != report_hour:
-                continue
-            recipients = team.report_recipients or []
-            if not recipients:
-                print(f"Skipping report for team {team.name}: No recipients configured.")
-                continue
-            print(f"Generating report for team {team.name}...")
-            report_html = generate_daily_report(team.id)
-            if not report_html:
-                print(f"No entries for team {team.name} in the last 24 hours. Skipping report.")
-                continue
-            subject = f"Daily Standup Report for {team.name} - {date.today().isoformat()}"
-            requests.post(
-                "https://api.resend.com/emails",
-                headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
-                json={
-                    "from": f"RemoteSync Reports <reports@{os.getenv('RESEND_DOMAIN', 'yourdomain.com')}>",
-                    "to": recipients,
-                    "subject": subject,
-                    "html": report_html,
-                }
+            schedule_team_reports(team, now)
+        session.commit()
+        return len(teams)
+
+def claim_due_teams(kind: str, now: Optional[datetime] = None) -> List[dict]:
+    """
+    Returns the teams whose `kind` ('daily' or 'weekly') report is due and
+    leases them: the next run moves REPORT_LEASE_SECONDS ahead. The lease is
+    a compare-and-set on the old value, so with several workers each due
+    team is claimed exactly once, and a worker that dies mid-send leaves the
+    team to be retried when the lease runs out. finish_team_report then sets
+    the real next run.
+    """
+    now = now or datetime.utcnow()
+    column, attempts = _schedule_columns(kind)
+    lease = now + timedelta(seconds=REPORT_LEASE_SECONDS)
+    claimed = []
+    with SessionLocal() as session:
+        due = session.query(Team.id, Team.name, Team.settings, Team.report_recipients, column, attempts).filter(column <= now).all()
+        for team_id, name, settings, recipients, due_at, attempt in due:
+            updated = session.query(Team).filter(Team.id == team_id, column == due_at).update(
+                {column: lease, attempts: attempts + 1}, synchronize_session=False
             )
-            print(f"Sent report for team {team.name} to {', '.join(recipients)}")
+            if updated:
+                claimed.append({
+                    "id": team_id, "name": name, "settings": settings or {}, "report_recipients": recipients or [],
+                    "lease": lease, "attempt": (attempt or 0) + 1,
+                })
+        session.commit()
+    return claimed
 
-def generate_weekly_report(team_id: str) -> Optional[str]:
+def finish_team_report(kind: str, team: dict, succeeded: bool, now: Optional[datetime] = None):
     """
-    Generates an HTML report for a team's standup entries over the last 7 days.
+    Moves a claimed team on after its send: to its next report time after a
+    success (or once REPORT_MAX_ATTEMPTS sends have failed), otherwise to a
+    retry with exponential backoff. Does nothing if the schedule changed
+    meanwhile (a settings edit), as the compare-and-set on the lease fails.
     """
+    now = now or datetime.utcnow()
+    column, attempts = _schedule_columns(kind)
+    if succeeded or team["attempt"] >= REPORT_MAX_ATTEMPTS:
+        if not succeeded:
+            print(f"Giving up on the {kind} report for team {team['id']} after {team['attempt']} attempts.")
+        weekday = _weekly_report_day(team["settings"]) if kind == "weekly" else None
+        values = {column: next_report_time(team["settings"], now, weekday=weekday), attempts: 0}
+    else:
+        values = {column: now + timedelta(seconds=REPORT_RETRY_SECONDS * 2 ** (team["attempt"] - 1))}
     with SessionLocal() as session:
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
-        entries = session.query(StandupEntry).filter(
-            StandupEntry.team_id == team_id,
-            StandupEntry.created_at >= one_week_ago
-        ).order_by(StandupEntry.created_at.asc()).all()
+        session.query(Team).filter(Team.id == team["id"], column == team["lease"]).update(values, synchronize_session=False)
+        session.commit()
 
-        if not entries:
-            return None
+def send_daily_report(team: dict):
+    recipients = team["report_recipients"]
+    if not recipients:
+        print(f"Skipping report for team {team['name']}: No recipients configured.")
+        return
+    print(f"Generating report for team {team['name']}...")
+    report = build_daily_report(team["id"])
+    if not report:
+        print(f"No entries for team {team['name']} in the last 24 hours. Skipping report.")
+        return
+    rendered = render_formats(report, ("html", "text"))
+    subject = f"Daily Standup Report for {team['name']} - {date.today().isoformat()}"
+    response = resend.post(
+        "/emails",
+        json={
+            "from": f"RemoteSync Reports <reports@{os.getenv('RESEND_DOMAIN', 'yourdomain.com')}>",
+            "to": recipients,
+            "subject": subject,
+            "html": rendered["html"],
+            "text": rendered["text"],
+        }
+    )
+    response.raise_for_status()  # a failed send is retried (finish_team_report)
+    print(f"Sent report for team {team['name']} to {', '.join(recipients)}")
 
-        user_ids = list(set(entry.user_id for entry in entries))
-        users_info = {user.id: user for user in clerk.users.get_user_list(user_id=user_ids)}
+# Per-team report work fans out here; kept separate from the scheduler's own
+# pool so a job waiting on its teams can never starve itself of workers.
+report_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+team_report_seconds = histogram("remotesync_team_report_seconds", "Time to build and send one team's report.", ("kind", "status"))
+SLOWEST_TEAMS_REPORTED = 5
 
-        html_content = "<h1>Weekly Standup Summary</h1><p>A summary of all updates from the past week.</p><hr>"
-        
-        # Group entries by day
-        entries_by_day = {}
-        for entry in entries:
-            day = entry.created_at.strftime('%Y-%m-%d %A')
-            if day not in entries_by_day:
-                entries_by_day[day] = []
-            entries_by_day[day].append(entry)
+def _timed_send(kind: str, send, team: dict) -> float:
+    started = perf_counter()
+    status = "error"
+    try:
+        send(team)
+        status = "success"
+    finally:
+        duration = perf_counter() - started
+        team_report_seconds.observe(duration, kind=kind, status=status)
+        finish_team_report(kind, team, succeeded=status == "success")
+    return duration
 
-        for day, day_entries in sorted(entries_by_day.items()):
-            html_content += f"<h2>{day}</h2>"
-            for entry in day_entries:
-                user = users_info.get(entry.user_id)
-                user_name = f"{user.first_name} {user.last_name}" if user else "Unknown User"
-                html_content += f"<h3>{user_name}</h3><blockquote>{entry.summary.replace(chr(10), '<br>')}</blockquote>"
-            html_content += "<hr>"
+def _send_reports(kind: str, send, teams: List[dict]) -> dict:
+    """Sends one report per team on report_executor; returns the run's per-team timings."""
+    futures = {report_executor.submit(_timed_send, kind, send, team): team for team in teams}
+    durations, failed = [], 0
+    for future in as_completed(futures):
+        team = futures[future]
+        try:
+            durations.append((round(future.result(), 3), team["id"]))
+        except Exception as e:
+            failed += 1
+            print(f"Error sending {kind} report for team {team['name']}: {e}")
+    durations.sort(reverse=True)
+    return {
+        "teams": len(teams),
+        "failed": failed,
+        # ids only: this ends up in /api/internal/jobs
+        "slowest": [{"team_id": team_id, "seconds": seconds} for seconds, team_id in durations[:SLOWEST_TEAMS_REPORTED]],
+    }
 
-        return html_content
+def process_daily_reports(now: Optional[datetime] = None):
+    """
+    Sends daily reports for the teams that are due, querying only those teams.
+    """
+    print("Processing daily reports...")
+    return _send_reports("daily", send_daily_report, claim_due_teams("daily", now))
+
+def build_weekly_report(team_id: str) -> Optional[Report]:
+    """Collects a team's entries from the last 7 days, grouped by day, from at most eight digest rows."""
+    with SessionLocal() as session:
+        fragments = get_digest_fragments(session, team_id, datetime.utcnow() - timedelta(days=7))
+    if not fragments:
+        return None
+    sections = []
+    for day, item in _report_items(fragments):
+        heading = day.strftime('%Y-%m-%d %A')
+        if not sections or sections[-1][0] != heading:
+            sections.append((heading, []))
+        sections[-1][1].append(item)
+    return Report(
+        "Weekly Standup Summary", sections,
+        intro="A summary of all updates from the past week.", show_audio=False, divide="sections",
+    )
+
+def generate_weekly_report(team_id: str, fmt: str = "html") -> Optional[str]:
+    """Renders the weekly report as 'html', 'text' or 'slack' markdown; None if there are no entries."""
+    report = build_weekly_report(team_id)
+    return render_report(report, fmt) if report else None
+
+def send_weekly_report(team: dict):
+    recipients = team["report_recipients"]
+    if not recipients:
+        return
+    print(f"Generating weekly report for team {team['name']}...")
+    report = build_weekly_report(team["id"])
+    if not report:
+        return
+    rendered = render_formats(report, ("html", "text"))
+    subject = f"Weekly Standup Report for {team['name']} - Week of {date.today().isoformat()}"
+    response = resend.post(
+        "/emails",
+        json={
+            "from": f"RemoteSync Reports <reports@{os.getenv('RESEND_DOMAIN', 'yourdomain.com')}>",
+            "to": recipients, "subject": subject, "html": rendered["html"], "text": rendered["text"]
+        }
+    )
+    response.raise_for_status()
+    print(f"Sent weekly report for team {team['name']} to {', '.join(recipients)}")
 
-def process_weekly_reports():
+def process_weekly_reports(now: Optional[datetime] = None):
     """
-    Iterates through teams and sends weekly reports if they are due.
+    Sends weekly reports for the teams that are due, querying only those teams.
     """
     print("Processing weekly reports...")
-    with SessionLocal() as session:
-        today_name = datetime.utcnow().strftime('%A') # e.g., "Friday"
-        teams = session.query(Team).all()
-        for team in teams:
-            weekly_report_day = team.settings.get("weeklyReportDay", "Friday")
-            report_time_str = team.settings.get("summaryTime", "17:00")
-            report_hour = int(report_time_str.split(":")[0])
-            if today_name != weekly_report_day or datetime.utcnow().hour != report_hour:
-                continue
-            recipients = team.report_recipients or []
-            if not recipients:
-                continue
-            print(f"Generating weekly report for team {team.name}...")
-            report_html = generate_weekly_report(team.id)
-            if not report_html:
-                continue
-            subject = f"Weekly Standup Report for {team.name} - Week of {date.today().isoformat()}"
-            requests.post(
-                "https://api.resend.com/emails",
-                headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
-                json={
-                    "from": f"RemoteSync Reports <reports@{os.getenv('RESEND_DOMAIN', 'yourdomain.com')}>",
-                    "to": recipients, "subject": subject, "html": report_html
-                }
-            )
-            print(f"Sent weekly report for team {team.name} to {', '.join(recipients)}")
+    return _send_reports("weekly", send_weekly_report, claim_due_teams("weekly", now))
+
+def run_due_reports():
+    """Runs every minute: sends whatever daily/weekly reports are due now."""
+    schedule_unscheduled_teams()
+    return {"daily": process_daily_reports(), "weekly": process_weekly_reports()}
 
 def run_scheduled_jobs():
-    process_daily_reminders()
-    process_daily_reports()
-    process_weekly_reports()
+    return {"reminders": process_daily_reminders(), **run_due_reports()}
 
-def remove_member_from_team(team_id: str, member_id_to_remove: str, requester_id: str):
+@db_function
+def remove_member_from_team(session, team_id: str, member_id_to_remove: str, requester_id: str):
     """Removes a member from a team, checking for owner permissions."""
-    with SessionLocal() as session:
-        team = session.query(Team).filter_by(id=team_id).first()
-        if not team:
-            raise ValueError("Team not found.")
-        # Check if the requester is the owner
-        if str(team.owner_id) != str(requester_id):
-            raise PermissionError("Only the team owner can remove members.")
-        # The owner cannot remove themselves
-        if member_id_to_remove == team.owner_id:
-            raise ValueError("The team owner cannot be removed.")
-        member_to_remove = session.query(TeamMember).filter_by(
-            team_id=team_id, 
-            user_id=member_id_to_remove
-        ).first()
-        if not member_to_remove:
-            raise ValueError("Member not found in this team.")
-        session.delete(member_to_remove)
-        session.commit()
-        return {"status": "success", "message": "Member removed."}
+    team = session.query(Team).filter_by(id=team_id).first()
+    if not team:
+        raise ValueError("Team not found.")
+    # Check if the requester is the owner
+    if str(team.owner_id) != str(requester_id):
+        raise PermissionError("Only the team owner can remove members.")
+    # The owner cannot remove themselves
+    if member_id_to_remove == team.owner_id:
+        raise ValueError("The team owner cannot be removed.")
+    member_to_remove = session.query(TeamMember).filter_by(
+        team_id=team_id, 
+        user_id=member_id_to_remove
+    ).first()
+    if not member_to_remove:
+        raise ValueError("Member not found in this team.")
+    session.delete(member_to_remove)
+    bump_team_versions(session, [team_id], members=True)
+    session.commit()
+    return {"status": "success", "message": "Member removed."}
 
 def get_team_members(team_id: str):
     """Fetches all members of a team and enriches them with Clerk user data."""
+    return _load_team_members(team_id)[0]
+
+def _load_team_members(team_id: str) -> tuple:
+    """Returns (members, complete), like _load_dashboard."""
     with SessionLocal() as session:
         members = session.query(TeamMember).filter_by(team_id=team_id).all()
         if not members:
-            return []
+            return [], True
             
         member_user_ids = [m.user_id for m in members]
         
+        complete = True
         try:
-            clerk_users = clerk.users.get_user_list(user_id=member_user_ids)
-            users_info = {user.id: user for user in clerk_users}
+            users_info = get_user_profiles(member_user_ids)
         except Exception as e:
             print(f"Error fetching batch user data from Clerk: {e}")
-            users_info = {}
+            users_info, complete = {}, False
 
         enriched_members = []
         for member in members:
             user_data = users_info.get(member.user_id)
             if user_data:
                 enriched_members.append({
-                    "id": user_data.id,
-                    "first_name": user_data.first_name,
-                    "last_name": user_data.last_name,
-                    "image_url": user_data.image_url,
+                    "id": user_data["id"],
+                    "first_name": user_data["first_name"],
+                    "last_name": user_data["last_name"],
+                    "image_url": user_data["image_url"],
                     "role": member.role
                 })
         
-        return enriched_members 
\ No newline at end of file
+        return enriched_members, complete 
+
+# --- Response Caching ---
+# The dashboard and member list are re-fetched on every render. Their ETags
+# come from the teams' version counters (bump_team_versions), so checking
+# freshness is one indexed query: a matching If-None-Match gets a 304, and
+# otherwise the payload cached under the same ETag is reused, so only a
+# change re-runs the queries and the Clerk lookup. The UTC date is part of
+# the dashboard ETag so entries still age out of the 7-day window.
+RESPONSE_CACHE_FORMAT = "1"  # bump when a cached payload changes shape
+dashboard_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL, name="dashboard_responses")
+members_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL, name="members_responses")
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha256(json.dumps([RESPONSE_CACHE_FORMAT, *parts], default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def dashboard_etag(user_id: str, team_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = DASHBOARD_PAGE_SIZE) -> str:
+    """The current ETag of a dashboard page; raises PermissionError like get_dashboard_data."""
+    limit = max(1, min(limit, DASHBOARD_MAX_PAGE_SIZE))
+    with SessionLocal() as session:
+        versions = session.query(Team.id, Team.data_version).join(
+            TeamMember, TeamMember.team_id == Team.id
+        ).filter(TeamMember.user_id == user_id).order_by(Team.id).all()
+    if team_id is not None and team_id not in {t for t, _ in versions}:
+        raise PermissionError("You are not a member of this team.")
+    # Entries age out of the window as the cutoff moves, without a version bump
+    return _etag("dashboard", user_id, team_id, cursor, limit, _dashboard_cutoff(), [list(v) for v in versions])
+
+def get_cached_dashboard(etag: str, user_id: str, team_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = DASHBOARD_PAGE_SIZE) -> dict:
+    key = (user_id, team_id, cursor, limit)
+    cached = dashboard_cache.get(key)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+    data, complete = _load_dashboard(user_id, team_id, cursor, limit)
+    if complete:
+        dashboard_cache.set(key, (etag, data))
+    return data
+
+def members_etag(team_id: str) -> str:
+    with SessionLocal() as session:
+        version = session.query(Team.members_version).filter_by(id=team_id).scalar()
+    return _etag("members", team_id, version)
+
+def get_cached_team_members(etag: str, team_id: str) -> list:
+    cached = members_cache.get(team_id)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+    members, complete = _load_team_members(team_id)
+    if complete:
+        members_cache.set(team_id, (etag, members))
+    return members
+
+# --- Bulk Export ---
+# Team history for analytics, for any date range, streamed as NDJSON or CSV.
+# Rows come off a server-side cursor (yield_per: a named cursor on Postgres)
+# and are written out one batch at a time, so memory stays flat however many
+# rows match. Rows go oldest first on (created_at, id), and each carries the
+# cursor that resumes the export after it if the connection drops. An export
+# holds one pooled connection for as long as it streams, hence the cap.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "4"))
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_COLUMNS = ("id", "user_id", "team_id", "created_at", "processing_status", "text", "summary", "audio_url")
+
+_export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+class ExportBusy(Exception):
+    """Raised when EXPORT_MAX_CONCURRENT exports are already streaming."""
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class EntryExport:
+    """
+    The body of one export, iterated from a worker thread by StreamingResponse.
+    Arguments are checked up front (ValueError), before any response is sent.
+    The export slot is released when the body ends, fails or is dropped.
+    """
+
+    def __init__(self, team_id: str, fmt: str = "ndjson", since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, cursor: Optional[str] = None):
+        self._released = True  # nothing to release until a slot is taken
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)}).")
+        self.team_id = team_id
+        self.fmt = fmt
+        self.since = _naive_utc(since)
+        self.until = _naive_utc(until)
+        if self.since and self.until and self.since >= self.until:
+            raise ValueError("'since' must be before 'until'.")
+        self.after = decode_cursor(cursor) if cursor else None
+        self.resumed = cursor is not None
+        if not _export_slots.acquire(blocking=False):
+            raise ExportBusy(f"{EXPORT_MAX_CONCURRENT} exports are already running. Try again shortly.")
+        self._released = False
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_FORMATS[self.fmt]
+
+    def __iter__(self):
+        try:
+            with span("export.stream"):
+                yield from self._chunks()
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            _export_slots.release()
+
+    def __del__(self):
+        # A client that disconnects before the body starts never iterates it
+        self.close()
+
+    def _chunks(self):
+        if self.fmt == "csv" and not self.resumed:
+            yield self._csv([EXPORT_COLUMNS + ("cursor",)])
+        with SessionLocal() as session:
+            query = session.query(*(getattr(StandupEntry, name) for name in EXPORT_COLUMNS)).filter(
+                StandupEntry.team_id == self.team_id
+            )
+            if self.since:
+                query = query.filter(StandupEntry.created_at >= self.since)
+            if self.until:
+                query = query.filter(StandupEntry.created_at < self.until)
+            if self.after:
+                query = query.filter(tuple_(StandupEntry.created_at, StandupEntry.id) > self.after)
+            query = query.order_by(StandupEntry.created_at.asc(), StandupEntry.id.asc()).yield_per(EXPORT_BATCH_SIZE)
+            batch = []
+            for row in query:
+                batch.append(row)
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    yield self._format(batch)
+                    batch = []
+            if batch:
+                yield self._format(batch)
+
+    def _format(self, rows: list) -> str:
+        records = []
+        for row in rows:
+            record = row._asdict()
+            record["created_at"] = row.created_at.isoformat()
+            record["cursor"] = encode_cursor(row.created_at, row.id)
+            records.append(record)
+        if self.fmt == "csv":
+            return self._csv([[record[name] for name in EXPORT_COLUMNS + ("cursor",)] for record in records])
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    @staticmethod
+    def _csv(rows: list) -> str:
+        out = io.StringIO()
+        csv.writer(out).writerows(rows)
+        return out.getvalue()